@@ -1,16 +1,14 @@
 import hashlib
 from flask import jsonify, request
 import mysql.connector
-import psycopg2
 import time
-from main import log_cims_database_change
-from app import get_db_connection
 
 class AddUser:
-    def __init__(self, request, logging, conn):
+    def __init__(self, request, logging, conn, db_connection_func):
         self.request = request
         self.logging = logging
         self.conn = conn
+        self.db_connection_func = db_connection_func
         self.data = request.json
         self.success = True
         self.message = ''
@@ -134,7 +132,7 @@ class AddUser:
 
         try:
             # Connect to G6 database
-            g6_conn = get_db_connection(use_cism=False)
+            g6_conn = self.db_connection_func(use_cism=False)
             g6_cursor = g6_conn.cursor()
 
             # Add user to the appropriate table based on role
@@ -191,9 +189,3 @@ class AddUser:
                 g6_cursor.close()
             if 'g6_conn' in locals():
                 g6_conn.close()
-
-    def __del__(self):
-        try:
-            self.conn.close()
-        except:
-            pass
\ No newline at end of file
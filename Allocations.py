@@ -0,0 +1,157 @@
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from flask import g, request
+
+# ru_maxrss is only available on Unix; elsewhere peak RSS is not reported
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Allocations made by the tracing machinery itself are left out of snapshots
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    # Kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def format_stat(stat):
+    frame = stat.traceback[0]
+    entry = {
+        "site": f"{frame.filename}:{frame.lineno}",
+        "kb": round(stat.size / 1024, 1),
+        "count": stat.count
+    }
+    if isinstance(stat, tracemalloc.StatisticDiff):
+        entry["kb_diff"] = round(stat.size_diff / 1024, 1)
+        entry["count_diff"] = stat.count_diff
+    return entry
+
+class AllocationTracker:
+    """
+    tracemalloc on demand for finding leaks and allocation-heavy routes.
+    While tracing, named snapshots can be taken (the last MEMORY_SNAPSHOTS
+    are kept) and any two compared by allocation site, and each request's
+    net allocation, traced peak and growth of the process's peak RSS are
+    attributed to its route. The traced counters are process-wide, so
+    concurrent requests blur each other's numbers; compare routes under a
+    light, steady load. Tracing slows Python allocation, so it is off
+    until started.
+    """
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        self.snapshots = OrderedDict()
+        self.routes = {}
+        self.started_at = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MEMORY_SNAPSHOTS', 4)
+        app.config.setdefault('MEMORY_TRACE_FRAMES', 1)
+        app.config.setdefault('MEMORY_TOP_SITES', 25)
+        self.config = app.config
+        app.extensions['allocations'] = self
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+
+    def start(self, frames=None):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames or self.config['MEMORY_TRACE_FRAMES'])
+            with self.lock:
+                self.routes = {}
+                self.started_at = time.time()
+        return self.status()
+
+    def stop(self):
+        # Snapshots and route figures survive so they can still be read
+        tracemalloc.stop()
+        return self.status()
+
+    def status(self):
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        with self.lock:
+            snapshots = [{"name": name, "taken_at": taken_at} for name, (taken_at, _) in self.snapshots.items()]
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else None,
+            "started_at": self.started_at,
+            "traced_kb": round(current / 1024, 1),
+            "traced_peak_kb": round(peak / 1024, 1),
+            "tracemalloc_overhead_kb": round(tracemalloc.get_tracemalloc_memory() / 1024, 1),
+            "peak_rss_kb": peak_rss_kb(),
+            "snapshots": snapshots
+        }
+
+    def snapshot(self, name=None):
+        """Take and keep a snapshot, returning its name and top allocation sites"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        name = name or time.strftime('%Y%m%dT%H%M%S')
+        with self.lock:
+            self.snapshots.pop(name, None)
+            self.snapshots[name] = (time.time(), snapshot)
+            while len(self.snapshots) > self.config['MEMORY_SNAPSHOTS']:
+                self.snapshots.popitem(last=False)
+        return {"name": name, "top": self.top(snapshot.statistics('lineno'))}
+
+    def diff(self, old_name, new_name):
+        """Allocation sites that grew most between two kept snapshots"""
+        with self.lock:
+            old, new = self.snapshots.get(old_name), self.snapshots.get(new_name)
+        if old is None or new is None:
+            raise KeyError(old_name if old is None else new_name)
+        stats = new[1].compare_to(old[1], 'lineno')
+        return {"from": old_name, "to": new_name, "top": self.top(stats)}
+
+    def top(self, stats):
+        return [format_stat(stat) for stat in stats[:self.config['MEMORY_TOP_SITES']]]
+
+    def before_request(self):
+        if not tracemalloc.is_tracing():
+            return
+        tracemalloc.reset_peak()
+        g.allocations = (tracemalloc.get_traced_memory()[0], peak_rss_kb())
+
+    def after_request(self, response):
+        started = g.pop('allocations', None)
+        if started is None or not tracemalloc.is_tracing():
+            return response
+        current, peak = tracemalloc.get_traced_memory()
+        allocated = current - started[0]
+        peak_growth = peak - started[0]
+        rss_growth = (peak_rss_kb() - started[1]) if started[1] is not None else 0
+        route = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+        with self.lock:
+            entry = self.routes.setdefault(route, {
+                'count': 0, 'allocated_kb': 0.0, 'max_allocated_kb': 0.0,
+                'max_peak_kb': 0.0, 'rss_growth_kb': 0
+            })
+            entry['count'] += 1
+            entry['allocated_kb'] += allocated / 1024
+            entry['max_allocated_kb'] = max(entry['max_allocated_kb'], allocated / 1024)
+            entry['max_peak_kb'] = max(entry['max_peak_kb'], peak_growth / 1024)
+            entry['rss_growth_kb'] += rss_growth
+        return response
+
+    def route_stats(self):
+        """Per-route figures since tracing started, most memory retained first"""
+        with self.lock:
+            routes = {route: dict(entry) for route, entry in self.routes.items()}
+        for entry in routes.values():
+            entry['avg_allocated_kb'] = round(entry['allocated_kb'] / entry['count'], 1)
+            entry['allocated_kb'] = round(entry['allocated_kb'], 1)
+            entry['max_allocated_kb'] = round(entry['max_allocated_kb'], 1)
+            entry['max_peak_kb'] = round(entry['max_peak_kb'], 1)
+        return dict(sorted(routes.items(), key=lambda item: item[1]['allocated_kb'], reverse=True))
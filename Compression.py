@@ -0,0 +1,179 @@
+import threading
+import time
+import zlib
+from flask import current_app, request
+
+# Optional encoders; gzip is always available through zlib
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/css',
+    'text/html',
+    'text/javascript',
+    'text/plain',
+}
+
+def no_compression(f):
+    """Route decorator that opts a view out of response compression"""
+    f.no_compression = True
+    return f
+
+class Compression:
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        self.stats = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_ENABLED', True)
+        app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        app.config.setdefault('COMPRESS_LEVELS', {'zstd': 3, 'br': 4, 'gzip': 6})
+        app.extensions['compression'] = self
+        app.after_request(self.after_request)
+
+    def available_encodings(self):
+        # Server preference when the client weights several encodings equally
+        encodings = []
+        if zstandard is not None:
+            encodings.append('zstd')
+        if brotli is not None:
+            encodings.append('br')
+        encodings.append('gzip')
+        return encodings
+
+    def negotiate(self):
+        best, best_quality = None, 0
+        for encoding in self.available_encodings():
+            quality = request.accept_encodings.quality(encoding)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compressor(self, encoding):
+        """Return (compress, flush, finish) callables for a new compression stream"""
+        level = current_app.config['COMPRESS_LEVELS'].get(encoding)
+        if encoding == 'zstd':
+            stream = zstandard.ZstdCompressor(level=level or 3).compressobj()
+            return (stream.compress,
+                    lambda: stream.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+                    stream.flush)
+        if encoding == 'br':
+            stream = brotli.Compressor(quality=level or 4)
+            return stream.process, stream.flush, stream.finish
+        # wbits=31 writes a gzip header and trailer
+        stream = zlib.compressobj(level or 6, zlib.DEFLATED, 31)
+        return stream.compress, lambda: stream.flush(zlib.Z_SYNC_FLUSH), stream.flush
+
+    def record(self, encoding, bytes_in, bytes_out, seconds):
+        with self.lock:
+            entry = self.stats.setdefault(encoding, {
+                'responses': 0, 'bytes_in': 0, 'bytes_out': 0, 'seconds': 0.0
+            })
+            entry['responses'] += 1
+            entry['bytes_in'] += bytes_in
+            entry['bytes_out'] += bytes_out
+            entry['seconds'] += seconds
+
+    def snapshot(self):
+        """Per-encoding totals with the resulting ratio and CPU cost per megabyte saved"""
+        with self.lock:
+            stats = {encoding: dict(entry) for encoding, entry in self.stats.items()}
+        for encoding, entry in stats.items():
+            if encoding in ('skipped', 'identity'):
+                continue
+            saved = entry['bytes_in'] - entry['bytes_out']
+            entry['ratio'] = round(entry['bytes_out'] / entry['bytes_in'], 4) if entry['bytes_in'] else None
+            entry['ms_per_mb_saved'] = round(entry['seconds'] * 1000 / (saved / 1048576), 3) if saved > 0 else None
+        return stats
+
+    def after_request(self, response):
+        if not current_app.config['COMPRESS_ENABLED'] or request.method == 'HEAD':
+            return response
+
+        view = current_app.view_functions.get(request.endpoint)
+        if getattr(view, 'no_compression', False):
+            return response
+
+        # File responses (direct passthrough) keep their Range and validator handling
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self.negotiate()
+        if not encoding:
+            return response
+
+        if response.is_streamed:
+            return self.compress_stream(response, encoding)
+
+        data = response.get_data()
+        if len(data) < current_app.config['COMPRESS_MIN_SIZE']:
+            self.record('skipped', len(data), len(data), 0.0)
+            return response
+
+        started = time.perf_counter()
+        compress, _, finish = self.compressor(encoding)
+        compressed = compress(data) + finish()
+        elapsed = time.perf_counter() - started
+
+        if len(compressed) >= len(data):
+            self.record('identity', len(data), len(data), elapsed)
+            return response
+
+        self.record(encoding, len(data), len(compressed), elapsed)
+        response.set_data(compressed)
+        self.mark_encoded(response, encoding)
+        return response
+
+    def compress_stream(self, response, encoding):
+        source = response.response
+        chunks = response.iter_encoded()
+        compress, flush, finish = self.compressor(encoding)
+
+        def generate():
+            bytes_in = bytes_out = 0
+            elapsed = 0.0
+            try:
+                for chunk in chunks:
+                    started = time.perf_counter()
+                    # Flush per chunk so streamed data reaches the client promptly
+                    out = compress(chunk) + flush()
+                    elapsed += time.perf_counter() - started
+                    bytes_in += len(chunk)
+                    bytes_out += len(out)
+                    if out:
+                        yield out
+                tail = finish()
+                bytes_out += len(tail)
+                if tail:
+                    yield tail
+            finally:
+                self.record(encoding, bytes_in, bytes_out, elapsed)
+                if hasattr(source, 'close'):
+                    source.close()
+
+        response.response = generate()
+        response.headers.pop('Content-Length', None)
+        self.mark_encoded(response, encoding)
+        return response
+
+    def mark_encoded(self, response, encoding):
+        response.headers['Content-Encoding'] = encoding
+        # A strong validator must not be shared by different representations
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
@@ -0,0 +1,273 @@
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+class Subscription:
+    def __init__(self, channels, maxsize):
+        self.channels = channels
+        self.queue = queue.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, item):
+        # A client that stops reading must not hold events in memory without bound
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.overflowed = True
+
+class EventBroker:
+    """
+    Publish/subscribe for Server-Sent Events. Each channel keeps its last
+    SSE_HISTORY events so a reconnecting client can resume from its
+    Last-Event-ID. Every open stream has a queue of at most SSE_QUEUE_SIZE
+    events; a stream that falls further behind is closed and replays from
+    the history on reconnect.
+
+    Events are delivered within the process unless SSE_RELAY is set (or the
+    SSE_RELAY environment variable is 1, which gunicorn.conf.py does for
+    several workers). Then published events are written to the event_relay
+    table by a background thread, which also polls it every SSE_RELAY_POLL
+    seconds and delivers new rows to this process's streams, so every
+    worker sees every event under the same ID. Rows older than
+    SSE_RELAY_RETENTION seconds are deleted.
+
+    Each open stream holds a server thread. Beyond SSE_MAX_STREAMS open
+    streams (0 for no limit), a new stream only sends the events the client
+    missed and closes, asking it to reconnect after SSE_BUSY_RETRY seconds.
+    """
+    def __init__(self, app=None, relay_connection_func=None):
+        self.lock = threading.Lock()
+        # Event IDs carry a per-process epoch so IDs from before a restart
+        # are recognised instead of being compared with the new counter
+        self.epoch = f"{int(time.time()):x}{os.getpid():x}"
+        self.ids = itertools.count(1)
+        self.history = {}
+        self.subscribers = {}
+        self.open_streams = 0
+        self.dumps = json.dumps
+        self.relay_connection_func = relay_connection_func
+        self.relay = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SSE_HEARTBEAT', 15)  # seconds
+        app.config.setdefault('SSE_HISTORY', 100)
+        app.config.setdefault('SSE_QUEUE_SIZE', 100)
+        app.config.setdefault('SSE_MAX_STREAMS', int(os.environ.get('SSE_MAX_STREAMS', 0)))
+        app.config.setdefault('SSE_BUSY_RETRY', 30)  # seconds
+        app.config.setdefault('SSE_RELAY', os.environ.get('SSE_RELAY') == '1')
+        app.config.setdefault('SSE_RELAY_POLL', 0.5)  # seconds
+        app.config.setdefault('SSE_RELAY_RETENTION', 3600)  # seconds
+        self.config = app.config
+        self.history_size = app.config['SSE_HISTORY']
+        self.queue_size = app.config['SSE_QUEUE_SIZE']
+        self.heartbeat = app.config['SSE_HEARTBEAT']
+        self.dumps = app.json.dumps
+        app.extensions['events'] = self
+
+    def publish(self, channel, event, data):
+        if self.config['SSE_RELAY'] and self.relay_connection_func is not None and self.start_relay():
+            self.relay.publish(channel, event, self.dumps(data))
+            return
+        with self.lock:
+            event_id = next(self.ids)
+        self.deliver(event_id, channel, event, data)
+
+    def deliver(self, event_id, channel, event, data):
+        """Add an event to the channel's history and the queues of its open streams"""
+        item = (event_id, event, data)
+        with self.lock:
+            self.history.setdefault(channel, deque(maxlen=self.history_size)).append(item)
+            subscribers = list(self.subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(item)
+
+    def start_relay(self):
+        """Start this process's relay thread if needed; False if the relay table is unavailable"""
+        if self.relay is not None and self.relay.thread.is_alive():
+            return True
+        with self.lock:
+            if self.relay is None or not self.relay.thread.is_alive():
+                relay = EventRelay(self, self.relay_connection_func, self.config)
+                try:
+                    relay.start()
+                except Exception as e:
+                    logging.error(f"Event relay unavailable, delivering events in this process only: {str(e)}")
+                    return False
+                self.relay = relay
+                # Relayed IDs come from the shared table, so every worker uses the same epoch
+                self.epoch = 'relay'
+        return True
+
+    def subscribe(self, channels, last_event_id=None):
+        """Register a stream; returns (subscription, missed events, whether the client must resync)"""
+        subscription = Subscription(channels, self.queue_size)
+        backlog, resync = [], False
+        epoch, _, counter = (last_event_id or '').partition('-')
+        with self.lock:
+            for channel in channels:
+                self.subscribers.setdefault(channel, set()).add(subscription)
+            if last_event_id:
+                if epoch != self.epoch or not counter.isdigit():
+                    resync = True
+                else:
+                    last_seen = int(counter)
+                    # Relayed events from before this worker started are not in its history
+                    if self.relay is not None and last_seen + 1 < self.relay.first_id:
+                        resync = True
+                    for channel in channels:
+                        history = self.history.get(channel, ())
+                        # A full history whose oldest event is newer than the
+                        # client's may have dropped events it never saw
+                        if len(history) == self.history_size and history[0][0] > last_seen + 1:
+                            resync = True
+                        backlog.extend(item for item in history if item[0] > last_seen)
+        backlog.sort(key=lambda item: item[0])
+        return subscription, backlog, resync
+
+    def depth(self):
+        """Return (open streams, events queued across them)"""
+        with self.lock:
+            subscriptions = {subscription for subscribers in self.subscribers.values() for subscription in subscribers}
+        return len(subscriptions), sum(subscription.queue.qsize() for subscription in subscriptions)
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                subscribers = self.subscribers.get(channel)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.subscribers[channel]
+
+    def format(self, item):
+        event_id, event, data = item
+        lines = [f"id: {self.epoch}-{event_id}", f"event: {event}"]
+        lines.extend(f"data: {line}" for line in self.dumps(data).splitlines())
+        return '\n'.join(lines) + '\n\n'
+
+    def stream(self, channels, last_event_id=None):
+        """Generator of SSE text for the given channels, with heartbeats while idle"""
+        def generate():
+            if self.config['SSE_RELAY'] and self.relay_connection_func is not None:
+                self.start_relay()
+            # Subscribed on first iteration so an unsent response leaves nothing registered
+            subscription, backlog, resync = self.subscribe(channels, last_event_id)
+            with self.lock:
+                self.open_streams += 1
+                busy = 0 < self.config['SSE_MAX_STREAMS'] < self.open_streams
+            try:
+                if busy:
+                    # Leave the server's threads to other requests and have the client come back later
+                    yield f"retry: {self.config['SSE_BUSY_RETRY'] * 1000}\n\n"
+                else:
+                    yield "retry: 3000\n\n"
+                if resync:
+                    yield "event: resync\ndata: {}\n\n"
+                for item in backlog:
+                    yield self.format(item)
+                while not busy and not subscription.overflowed:
+                    try:
+                        item = subscription.queue.get(timeout=self.heartbeat)
+                    except queue.Empty:
+                        # Comment lines keep proxies from closing an idle stream
+                        yield ": heartbeat\n\n"
+                        continue
+                    yield self.format(item)
+            finally:
+                with self.lock:
+                    self.open_streams -= 1
+                self.unsubscribe(subscription)
+
+        return generate()
+
+class EventRelay:
+    """Shares published events between worker processes through the event_relay table"""
+    def __init__(self, broker, connection_func, config):
+        self.broker = broker
+        self.connection_func = connection_func
+        self.config = config
+        self.outbox = queue.Queue()
+        self.wake = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='event-relay', daemon=True)
+        self.last_id = 0
+        self.first_id = 1
+
+    def start(self):
+        conn = self.connection_func()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS event_relay (
+                    ID BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    Channel VARCHAR(100) NOT NULL,
+                    Event VARCHAR(50) NOT NULL,
+                    Data TEXT NOT NULL,
+                    Created_At TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    INDEX idx_event_relay_created (Created_At)
+                )
+            """)
+            cursor.execute("SELECT COALESCE(MAX(ID), 0) FROM event_relay")
+            self.last_id = cursor.fetchone()[0]
+            self.first_id = self.last_id + 1
+        finally:
+            cursor.close()
+            conn.close()
+        self.thread.start()
+
+    def publish(self, channel, event, data_json):
+        self.outbox.put((channel, event, data_json))
+        self.wake.set()
+
+    def run(self):
+        last_prune = time.monotonic()
+        while True:
+            self.wake.wait(self.config['SSE_RELAY_POLL'])
+            self.wake.clear()
+            try:
+                conn = self.connection_func()
+            except Exception as e:
+                logging.error(f"Event relay could not connect: {str(e)}")
+                time.sleep(self.config['SSE_RELAY_POLL'])
+                continue
+            cursor = conn.cursor()
+            try:
+                pending = []
+                while True:
+                    try:
+                        pending.append(self.outbox.get_nowait())
+                    except queue.Empty:
+                        break
+                if pending:
+                    cursor.executemany("INSERT INTO event_relay (Channel, Event, Data) VALUES (%s, %s, %s)", pending)
+                    conn.commit()
+                    pending = []
+                cursor.execute("""
+                    SELECT ID, Channel, Event, Data FROM event_relay
+                    WHERE ID > %s ORDER BY ID LIMIT 1000
+                """, (self.last_id,))
+                rows = cursor.fetchall()
+                for event_id, channel, event, data_json in rows:
+                    self.broker.deliver(event_id, channel, event, json.loads(data_json))
+                    self.last_id = event_id
+                if len(rows) == 1000:
+                    self.wake.set()
+                if time.monotonic() - last_prune > 60:
+                    cursor.execute("DELETE FROM event_relay WHERE Created_At < NOW() - INTERVAL %s SECOND LIMIT 10000",
+                                   (self.config['SSE_RELAY_RETENTION'],))
+                    conn.commit()
+                    last_prune = time.monotonic()
+            except Exception as e:
+                logging.error(f"Event relay failed: {str(e)}")
+                # Unwritten events are retried on the next round
+                for item in pending:
+                    self.outbox.put(item)
+            finally:
+                cursor.close()
+                conn.close()
@@ -0,0 +1,108 @@
+import importlib.util
+import io
+import os
+import sys
+import threading
+from http.cookies import SimpleCookie
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from urllib.parse import urlsplit
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+BACKEND_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+_backend_app = None
+_backend_lock = threading.Lock()
+
+def load_backend_app():
+    """
+    Import the backend and build it with its create_app() once, so it reads its
+    CS432_ settings, warms up and starts its background work as it would on its own.
+    Loaded by path because the frontend module is also named app.
+    """
+    global _backend_app
+    if _backend_app is None:
+        with _backend_lock:
+            if _backend_app is None:
+                spec = importlib.util.spec_from_file_location('backend_app', BACKEND_PATH)
+                module = importlib.util.module_from_spec(spec)
+                sys.modules['backend_app'] = module
+                spec.loader.exec_module(module)
+                _backend_app = module.create_app()
+    return _backend_app
+
+class StreamingBody:
+    """File-like wrapper over a WSGI app_iter, read by requests for stream=True responses"""
+    def __init__(self, app_iter):
+        self.app_iter = app_iter
+        self.chunks = iter(app_iter)
+
+    def stream(self, chunk_size=None, decode_content=True):
+        for chunk in self.chunks:
+            if chunk:
+                yield chunk
+
+    def read(self, amt=None, decode_content=True):
+        return b''.join(self.stream())
+
+    def close(self):
+        if hasattr(self.app_iter, 'close'):
+            self.app_iter.close()
+
+class InProcessAdapter(BaseAdapter):
+    """
+    requests transport adapter that hands requests straight to a WSGI app in
+    the same process, skipping the socket, HTTP parsing and the server thread.
+    Sessions mount it on the backend's base URL.
+    """
+    def __init__(self, wsgi_app):
+        super().__init__()
+        self.wsgi_app = wsgi_app
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        url = urlsplit(request.url)
+        headers = dict(request.headers)
+        # Compressing a body only to decompress it in the same process is wasted work
+        headers['Accept-Encoding'] = 'identity'
+
+        builder = EnvironBuilder(
+            path=url.path,
+            query_string=url.query,
+            method=request.method,
+            headers=headers,
+            data=request.body,
+            base_url=f"{url.scheme}://{url.netloc}"
+        )
+        try:
+            environ = builder.get_environ()
+        finally:
+            builder.close()
+
+        # Streams (e.g. Server-Sent Events) are passed through as they are produced
+        app_iter, status, response_headers = run_wsgi_app(self.wsgi_app, environ, buffered=not stream)
+
+        response = Response()
+        response.status_code = int(status.split(' ', 1)[0])
+        response.reason = status.split(' ', 1)[1] if ' ' in status else ''
+        response.headers = CaseInsensitiveDict(response_headers.items())
+        if stream:
+            response.raw = StreamingBody(app_iter)
+        else:
+            try:
+                body = b''.join(app_iter)
+            finally:
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+            response.raw = io.BytesIO(body)
+            response._content = body
+        response.encoding = response_headers.get('Content-Type', '').partition('charset=')[2] or None
+        response.url = request.url
+        response.request = request
+        for header in response_headers.getlist('Set-Cookie'):
+            for name, morsel in SimpleCookie(header).items():
+                response.cookies.set(name, morsel.value)
+        return response
+
+    def close(self):
+        pass
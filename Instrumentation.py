@@ -0,0 +1,291 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from SlowQueries import normalize
+
+# Upper bounds of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+# Queries kept per request for the per-query breakdown
+MAX_QUERIES_PER_REQUEST = 200
+# Schema setup runs once per process, so it is not charged against query budgets
+SETUP_STATEMENTS = ('create', 'alter', 'describe', 'show')
+
+class QueryBudgetExceeded(Exception):
+    """Raised after a request that broke its query budget when QUERY_BUDGET_MODE is 'raise'"""
+
+def query_budget(queries):
+    """Route decorator declaring the most queries one request to the view may run"""
+    def decorator(f):
+        f.query_budget = queries
+        return f
+    return decorator
+
+class RequestStats:
+    """Timings of one request, collected on flask.g"""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.connect_seconds = 0.0
+        self.connections = 0
+        self.db_seconds = 0.0
+        self.query_count = 0
+        self.rows = 0
+        self.setup_count = 0
+        self.queries = []
+
+    def record_query(self, statement, seconds, rows):
+        self.query_count += 1
+        if statement.lstrip().split(None, 1)[0].lower() in SETUP_STATEMENTS:
+            self.setup_count += 1
+        self.db_seconds += seconds
+        self.rows += rows
+        if len(self.queries) < MAX_QUERIES_PER_REQUEST:
+            self.queries.append((statement, seconds, rows))
+
+class CursorProxy:
+    """Cursor wrapper that times execute and fetch calls and counts fetched rows"""
+    def __init__(self, cursor, instrumentation, database=None):
+        self._cursor = cursor
+        self._instrumentation = instrumentation
+        self._database = database
+        self._statement = None
+        self._params = None
+        self._many = False
+        self._seconds = 0.0
+        self._rows = 0
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def _finish(self):
+        # A statement is recorded once its results are read or the next one runs
+        if self._statement is not None:
+            self._instrumentation.record_query(self._statement, self._params, self._seconds, self._rows,
+                                               self._database, many=self._many)
+            self._statement = None
+
+    def _timed(self, func, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._seconds += time.perf_counter() - started
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._finish()
+        self._statement, self._params, self._seconds, self._rows = operation, params, 0.0, 0
+        self._many = False
+        result = self._timed(self._cursor.execute, operation, params, *args, **kwargs)
+        if not self._cursor.with_rows:
+            self._rows = max(self._cursor.rowcount, 0)
+            self._finish()
+        return result
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        self._finish()
+        self._statement, self._params, self._seconds, self._rows = operation, seq_params, 0.0, 0
+        self._many = True
+        result = self._timed(self._cursor.executemany, operation, seq_params, *args, **kwargs)
+        self._rows = max(self._cursor.rowcount, 0)
+        self._finish()
+        return result
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None:
+            self._rows += 1
+        else:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._timed(self._cursor.fetchmany, size)
+        self._rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self._rows += len(rows)
+        self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+class ConnectionProxy:
+    """Connection wrapper whose cursors are instrumented"""
+    def __init__(self, connection, instrumentation, database=None):
+        self._connection = connection
+        self._instrumentation = instrumentation
+        self._database = database
+        self._closed = False
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        return CursorProxy(self._connection.cursor(*args, **kwargs), self._instrumentation, self._database)
+
+    def close(self):
+        # A pooled connection closed twice would be put back in the pool twice
+        if self._closed:
+            return
+        self._closed = True
+        self._instrumentation.connection_closed()
+        return self._connection.close()
+
+class Instrumentation:
+    """
+    Per-request timing for the backend: wall time, time spent acquiring
+    database connections, query count, rows fetched and per-query time.
+    Each response carries a Server-Timing header, and per-route histograms
+    are kept for the admin stats endpoint. Query listeners, called with
+    statement, params, seconds, rows, database and whether it was an
+    executemany, can be added for further analysis.
+
+    With QUERY_BUDGET_MODE set to 'warn' or 'raise' (for tests and staging),
+    each request is also checked against the budget its view declares with
+    @query_budget, and a statement shape repeated more than QUERY_REPEAT_LIMIT
+    times in one request is reported as a likely N+1. 'warn' logs and adds an
+    X-Query-Budget header; 'raise' raises QueryBudgetExceeded.
+    """
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        self.routes = {}
+        self.query_listeners = []
+        # Connections being opened and open, across all threads of this process
+        self.connecting = 0
+        self.connections_open = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SERVER_TIMING', True)
+        app.config.setdefault('QUERY_BUDGET_MODE', os.environ.get('QUERY_BUDGET_MODE', 'off'))
+        app.config.setdefault('QUERY_REPEAT_LIMIT', 3)
+        app.extensions['instrumentation'] = self
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+
+    def current(self):
+        if has_request_context():
+            return g.get('request_stats')
+        return None
+
+    def connect(self, connect_func, *args, **kwargs):
+        """Open a connection through connect_func, timing it and instrumenting its cursors"""
+        with self.lock:
+            self.connecting += 1
+        started = time.perf_counter()
+        try:
+            connection = connect_func(*args, **kwargs)
+        finally:
+            with self.lock:
+                self.connecting -= 1
+        with self.lock:
+            self.connections_open += 1
+        stats = self.current()
+        if stats is not None:
+            stats.connect_seconds += time.perf_counter() - started
+            stats.connections += 1
+        return ConnectionProxy(connection, self, kwargs.get('database'))
+
+    def connection_closed(self):
+        with self.lock:
+            self.connections_open -= 1
+
+    def record_query(self, statement, params, seconds, rows, database=None, many=False):
+        stats = self.current()
+        if stats is not None:
+            stats.record_query(statement, seconds, rows)
+        for listener in self.query_listeners:
+            listener(statement, params, seconds, rows, database, many)
+
+    def before_request(self):
+        g.request_stats = RequestStats()
+
+    def after_request(self, response):
+        stats = self.current()
+        if stats is None:
+            return response
+
+        wall_ms = (time.perf_counter() - stats.started) * 1000
+        db_ms = stats.db_seconds * 1000
+        connect_ms = stats.connect_seconds * 1000
+        route = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+        self.record_request(route, wall_ms, db_ms, connect_ms, stats)
+
+        if current_app.config['SERVER_TIMING']:
+            response.headers.add('Server-Timing', ', '.join([
+                f'connect;dur={connect_ms:.2f};desc="{stats.connections} connections"',
+                f'db;dur={db_ms:.2f};desc="{stats.query_count} queries, {stats.rows} rows"',
+                f'total;dur={wall_ms:.2f}',
+            ]))
+        if current_app.config['QUERY_BUDGET_MODE'] in ('warn', 'raise'):
+            self.check_budget(route, stats, response)
+        return response
+
+    def check_budget(self, route, stats, response):
+        problems = []
+        view = current_app.view_functions.get(request.endpoint)
+        budget = getattr(view, 'query_budget', None)
+        charged = stats.query_count - stats.setup_count
+        if budget is not None and charged > budget:
+            problems.append(f"{charged} queries over a budget of {budget}")
+        shapes = Counter(normalize(statement) for statement, _, _ in stats.queries)
+        for shape, count in shapes.most_common():
+            if count <= current_app.config['QUERY_REPEAT_LIMIT']:
+                break
+            problems.append(f"{count} x {shape[:120]}")
+        if not problems:
+            return
+
+        message = f"{route}: " + '; '.join(problems)
+        if current_app.config['QUERY_BUDGET_MODE'] == 'raise':
+            raise QueryBudgetExceeded(message)
+        logging.warning(f"Query budget: {message}")
+        response.headers['X-Query-Budget'] = '; '.join(problems)[:500]
+
+    def record_request(self, route, wall_ms, db_ms, connect_ms, stats):
+        with self.lock:
+            entry = self.routes.setdefault(route, {
+                'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'db_ms': 0.0, 'connect_ms': 0.0,
+                'queries': 0, 'rows': 0, 'max_queries': 0,
+                'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                'db_buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            })
+            entry['count'] += 1
+            entry['total_ms'] += wall_ms
+            entry['max_ms'] = max(entry['max_ms'], wall_ms)
+            entry['db_ms'] += db_ms
+            entry['connect_ms'] += connect_ms
+            entry['queries'] += stats.query_count
+            entry['rows'] += stats.rows
+            entry['max_queries'] = max(entry['max_queries'], stats.query_count)
+            entry['buckets'][bucket_index(wall_ms)] += 1
+            entry['db_buckets'][bucket_index(db_ms)] += 1
+            # The slowest request's queries show where its time went
+            if wall_ms >= entry['max_ms']:
+                entry['slowest_queries'] = [
+                    {"statement": " ".join(statement.split())[:200], "ms": round(seconds * 1000, 3), "rows": rows}
+                    for statement, seconds, rows in stats.queries
+                ]
+
+    def route_stats(self):
+        with self.lock:
+            routes = {route: dict(entry, buckets=list(entry['buckets']), db_buckets=list(entry['db_buckets']))
+                      for route, entry in self.routes.items()}
+        for entry in routes.values():
+            entry['avg_ms'] = round(entry['total_ms'] / entry['count'], 3)
+            entry['avg_db_ms'] = round(entry['db_ms'] / entry['count'], 3)
+            entry['avg_queries'] = round(entry['queries'] / entry['count'], 2)
+        return routes
+
+def bucket_index(elapsed_ms):
+    return next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= bound), len(LATENCY_BUCKETS_MS))
@@ -0,0 +1,64 @@
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+from flask.json.provider import DefaultJSONProvider
+
+# orjson is a C-accelerated encoder; the stdlib encoder is used when it is missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(o):
+    """Encode the types returned by dictionary cursors that JSON has no native form for"""
+    if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, datetime.timedelta):
+        # MySQL TIME columns come back as timedelta
+        return str(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        # Decimal is kept as a string so DECIMAL columns never lose precision
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider for both apps: datetimes and dates as ISO 8601, Decimal as a
+    string, and no key sorting. Uses orjson when installed.
+    """
+    sort_keys = False
+    ensure_ascii = False
+    default = staticmethod(_default)
+
+    def _orjson_option(self):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=_default, option=self._orjson_option()).decode()
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is None:
+            return super().response(obj)
+        # Skip the bytes -> str -> bytes round trip of the base implementation
+        data = orjson.dumps(obj, default=_default, option=self._orjson_option() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(data, mimetype=self.mimetype)
@@ -81,6 +81,7 @@ class Login:
                 'session_token': token,
                 'max_age': 3600, 
                 'username': self.username, 
+                'session_id': self.member_id,
                 'group': self.group,
                 'role': user['Role']
             }))
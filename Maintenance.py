@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+
+class MaintenanceJobs:
+    """
+    Runs registered database maintenance jobs in small committed batches.
+    A job is a function (cursor, batch_size) -> rows reclaimed that handles
+    one batch; it is called until it returns 0 or MAINTENANCE_MAX_BATCHES
+    is reached, with MAINTENANCE_BATCH_PAUSE seconds between batches so
+    other writers can take the locks in between. A MySQL named lock keeps
+    runs in different processes from overlapping.
+
+    Jobs archive and delete rows in shared tables, so nothing runs unless
+    MAINTENANCE_ENABLED is set, and the scheduler only starts with
+    MAINTENANCE_AUTOSTART as well.
+    """
+    def __init__(self, app=None, db_connection_func=None):
+        self.jobs = {}
+        self.connection_jobs = set()
+        self.reports = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.db_connection_func = db_connection_func
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MAINTENANCE_ENABLED', False)
+        app.config.setdefault('MAINTENANCE_AUTOSTART', False)
+        app.config.setdefault('MAINTENANCE_INTERVAL', 6 * 3600)  # seconds; 0 disables the scheduler
+        app.config.setdefault('MAINTENANCE_BATCH_SIZE', 500)
+        app.config.setdefault('MAINTENANCE_BATCH_PAUSE', 0.2)  # seconds
+        app.config.setdefault('MAINTENANCE_MAX_BATCHES', 1000)
+        # Maintenance gives up on a row lock quickly instead of queueing behind requests
+        app.config.setdefault('MAINTENANCE_LOCK_WAIT', 5)  # seconds
+        self.config = app.config
+        app.extensions['maintenance'] = self
+
+    def job(self, name, commits=False):
+        """
+        Decorator registering a batch function under name. With commits, the
+        job commits part of its batch itself and is called as
+        f(conn, cursor, batch_size).
+        """
+        def decorator(f):
+            self.jobs[name] = f
+            if commits:
+                self.connection_jobs.add(name)
+            return f
+        return decorator
+
+    def run(self, names=None):
+        """Run the given jobs (all by default) and return their reports, or None if another run holds the lock"""
+        if not self.config['MAINTENANCE_ENABLED']:
+            raise RuntimeError("Maintenance jobs are disabled; set MAINTENANCE_ENABLED to run them")
+        names = names or list(self.jobs)
+        conn = self.db_connection_func()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT GET_LOCK('cs432g6_maintenance', 0)")
+            if not cursor.fetchone()[0]:
+                logging.info("Maintenance run skipped, another run is in progress")
+                return None
+            cursor.execute("SET SESSION innodb_lock_wait_timeout = %s", (self.config['MAINTENANCE_LOCK_WAIT'],))
+            try:
+                return [self.run_job(name, conn, cursor) for name in names]
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK('cs432g6_maintenance')")
+                cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def run_job(self, name, conn, cursor):
+        batch_size = self.config['MAINTENANCE_BATCH_SIZE']
+        report = {"job": name, "started_at": time.time(), "rows": 0, "seconds": 0.0, "batches": [], "error": None}
+        started = time.perf_counter()
+        for _ in range(self.config['MAINTENANCE_MAX_BATCHES']):
+            batch_started = time.perf_counter()
+            try:
+                if name in self.connection_jobs:
+                    rows = self.jobs[name](conn, cursor, batch_size)
+                else:
+                    rows = self.jobs[name](cursor, batch_size)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logging.error(f"Maintenance job {name} stopped: {str(e)}")
+                report['error'] = str(e)
+                break
+            seconds = time.perf_counter() - batch_started
+            if not rows:
+                break
+            report['rows'] += rows
+            report['batches'].append({"rows": rows, "seconds": round(seconds, 4)})
+            logging.info(f"Maintenance job {name}: {rows} rows in {seconds:.3f}s")
+            time.sleep(self.config['MAINTENANCE_BATCH_PAUSE'])
+        report['seconds'] = round(time.perf_counter() - started, 4)
+        with self.lock:
+            self.reports[name] = report
+        return report
+
+    def start(self):
+        """Run all jobs every MAINTENANCE_INTERVAL seconds on a daemon thread, if enabled"""
+        interval = self.config['MAINTENANCE_INTERVAL']
+        if not self.config['MAINTENANCE_ENABLED'] or not self.config['MAINTENANCE_AUTOSTART']:
+            return
+        if not interval or self.thread is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.run()
+                except Exception as e:
+                    logging.error(f"Scheduled maintenance run failed: {str(e)}")
+
+        self.thread = threading.Thread(target=loop, name='maintenance', daemon=True)
+        self.thread.start()
@@ -0,0 +1,111 @@
+import os
+import time
+from flask import Response, g, request
+
+# prometheus_client is optional; without it every metric is a no-op and /metrics answers 501
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
+
+# Seconds; request and backend call latencies
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class NoopMetric:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, value):
+        pass
+
+class Metrics:
+    """
+    Prometheus metrics for a Flask app, served at /metrics in the text format.
+    Requests are counted and timed by method, route template and status code,
+    so label values stay bounded by the app's routes. When the
+    PROMETHEUS_MULTIPROC_DIR environment variable is set (required with
+    several worker processes), values are kept in per-process files and
+    /metrics aggregates them. Gauges sum over live processes.
+    Samplers registered with add_sampler set gauges from in-process state;
+    they run after each request and on every scrape.
+    """
+    def __init__(self, app=None, prefix='app'):
+        self.prefix = prefix
+        self.samplers = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_ENABLED', True)
+        app.extensions['metrics'] = self
+        self.requests = self.counter('http_requests_total', 'HTTP requests', ['method', 'route', 'status'])
+        self.latency = self.histogram('http_request_duration_seconds', 'HTTP request latency', ['method', 'route'])
+        if not app.config['METRICS_ENABLED']:
+            return
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.add_url_rule('/metrics', 'metrics', self.export)
+
+    def name(self, name):
+        return f"{self.prefix}_{name}"
+
+    def counter(self, name, documentation, labels=()):
+        if prometheus_client is None:
+            return NoopMetric()
+        return prometheus_client.Counter(self.name(name), documentation, labels)
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        if prometheus_client is None:
+            return NoopMetric()
+        return prometheus_client.Histogram(self.name(name), documentation, labels, buckets=buckets)
+
+    def gauge(self, name, documentation, labels=()):
+        if prometheus_client is None:
+            return NoopMetric()
+        return prometheus_client.Gauge(self.name(name), documentation, labels, multiprocess_mode='livesum')
+
+    def add_sampler(self, sampler):
+        self.samplers.append(sampler)
+
+    def sample(self):
+        for sampler in self.samplers:
+            sampler()
+
+    def before_request(self):
+        g.metrics_started = time.perf_counter()
+
+    def after_request(self, response):
+        started = g.get('metrics_started')
+        if started is None or request.endpoint == 'metrics':
+            return response
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        self.requests.labels(request.method, route, str(response.status_code)).inc()
+        self.latency.labels(request.method, route).observe(time.perf_counter() - started)
+        self.sample()
+        return response
+
+    def export(self):
+        if prometheus_client is None:
+            return Response("prometheus_client is not installed\n", status=501, mimetype='text/plain')
+        self.sample()
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            registry = prometheus_client.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = prometheus_client.REGISTRY
+        return Response(prometheus_client.generate_latest(registry), mimetype=prometheus_client.CONTENT_TYPE_LATEST)
+
+def mark_process_dead(pid):
+    """Drop a finished worker's live gauges; call from the process manager's child-exit hook"""
+    if prometheus_client is not None and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
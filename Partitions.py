@@ -0,0 +1,163 @@
+import datetime
+import logging
+
+def month_start(day):
+    return datetime.date(day.year, day.month, 1)
+
+def add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+class MonthlyPartitions:
+    """
+    Monthly RANGE partitions of a table on a date column. Partition pYYYYMM
+    holds that month and pmax catches rows past the last month, so inserts
+    never fail. Adding a month splits the empty pmax and expiring a month
+    drops its partition; neither touches rows in other partitions.
+    """
+    def __init__(self, table, column):
+        self.table = table
+        self.schema, self.name = table.split('.')
+        self.column = column
+
+    def exists(self, cursor):
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+        """, (self.schema, self.name))
+        return bool(self._first(cursor.fetchone()))
+
+    def column_type(self, cursor):
+        cursor.execute("""
+            SELECT DATA_TYPE FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """, (self.schema, self.name, self.column))
+        return self._first(cursor.fetchone()).lower()
+
+    def partitions(self, cursor):
+        """Names of the table's partitions in order, empty if it is not partitioned"""
+        cursor.execute("""
+            SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+            ORDER BY PARTITION_ORDINAL_POSITION
+        """, (self.schema, self.name))
+        return [self._first(row) for row in cursor.fetchall()]
+
+    def months(self, cursor):
+        """First day of each month that has a partition"""
+        return [datetime.date(int(name[1:5]), int(name[5:7]), 1)
+                for name in self.partitions(cursor) if name != 'pmax']
+
+    def definition(self, month, column_type):
+        # TIMESTAMP columns can only be range partitioned through UNIX_TIMESTAMP()
+        bound = f"'{add_months(month, 1).isoformat()} 00:00:00'"
+        if column_type == 'timestamp':
+            bound = f"UNIX_TIMESTAMP({bound})"
+        return f"PARTITION p{month:%Y%m} VALUES LESS THAN ({bound})"
+
+    def primary_key(self, cursor):
+        cursor.execute("""
+            SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND CONSTRAINT_NAME = 'PRIMARY'
+            ORDER BY ORDINAL_POSITION
+        """, (self.schema, self.name))
+        return [self._first(row) for row in cursor.fetchall()]
+
+    def foreign_keys(self, cursor):
+        """Foreign keys on or referencing the table; InnoDB cannot partition a table with either"""
+        cursor.execute("""
+            SELECT CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS
+            WHERE (CONSTRAINT_SCHEMA = %s AND TABLE_NAME = %s)
+               OR (UNIQUE_CONSTRAINT_SCHEMA = %s AND REFERENCED_TABLE_NAME = %s)
+        """, (self.schema, self.name, self.schema, self.name))
+        return [self._first(row) for row in cursor.fetchall()]
+
+    def extend_primary_key(self, cursor):
+        """
+        One-off migration: add the partitioning column to the primary key, which
+        MySQL requires of every unique key on a partitioned table. The old key is
+        no longer enforced unique afterwards, so this is never run implicitly;
+        call it only on tables whose schema you own. Returns False if the key
+        already includes the column.
+        """
+        primary_key = self.primary_key(cursor)
+        if not primary_key or self.column in primary_key:
+            return False
+        columns = ', '.join(primary_key + [self.column])
+        logging.warning(f"Changing the primary key of {self.table} to ({columns})")
+        cursor.execute(f"ALTER TABLE {self.table} DROP PRIMARY KEY, ADD PRIMARY KEY ({columns})")
+        return True
+
+    def partition_table(self, cursor, months_ahead):
+        """
+        Convert the table to monthly partitions from its oldest row to months_ahead
+        months from now. This rebuilds the table, so it is meant to run once
+        off-peak. Returns False if the table is already partitioned, and raises
+        ValueError if it has foreign keys or a primary key without the column.
+        """
+        if self.partitions(cursor):
+            return False
+
+        foreign_keys = self.foreign_keys(cursor)
+        if foreign_keys:
+            raise ValueError(f"{self.table} has foreign keys ({', '.join(foreign_keys)}), which partitioned tables cannot have")
+        primary_key = self.primary_key(cursor)
+        if primary_key and self.column not in primary_key:
+            raise ValueError(
+                f"the primary key of {self.table} ({', '.join(primary_key)}) must include {self.column}; "
+                f"see MonthlyPartitions.extend_primary_key"
+            )
+
+        column_type = self.column_type(cursor)
+        cursor.execute(f"SELECT MIN({self.column}) FROM {self.table}")
+        oldest = self._first(cursor.fetchone())
+        this_month = month_start(datetime.date.today())
+        month = month_start(oldest) if oldest else this_month
+        definitions = []
+        while month <= add_months(this_month, months_ahead):
+            definitions.append(self.definition(month, column_type))
+            month = add_months(month, 1)
+        definitions.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+
+        if column_type == 'timestamp':
+            scheme = f"RANGE (UNIX_TIMESTAMP({self.column}))"
+        else:
+            scheme = f"RANGE COLUMNS({self.column})"
+        cursor.execute(f"ALTER TABLE {self.table} PARTITION BY {scheme} ({', '.join(definitions)})")
+        return True
+
+    def add_future(self, cursor, months_ahead):
+        """Create partitions up to months_ahead months from now; returns the number added"""
+        months = self.months(cursor)
+        last = months[-1] if months else add_months(month_start(datetime.date.today()), -1)
+        target = add_months(month_start(datetime.date.today()), months_ahead)
+        column_type = self.column_type(cursor)
+        definitions = []
+        while last < target:
+            last = add_months(last, 1)
+            definitions.append(self.definition(last, column_type))
+        if not definitions:
+            return 0
+
+        # pmax is empty while future months exist, so splitting it moves no rows
+        cursor.execute(f"""
+            ALTER TABLE {self.table} REORGANIZE PARTITION pmax INTO (
+                {', '.join(definitions)}, PARTITION pmax VALUES LESS THAN (MAXVALUE)
+            )
+        """)
+        return len(definitions)
+
+    def expired(self, cursor, cutoff):
+        """Partitions whose whole month is before cutoff (a date)"""
+        return [f"p{month:%Y%m}" for month in self.months(cursor) if add_months(month, 1) <= cutoff]
+
+    def drop(self, cursor, names):
+        if names:
+            cursor.execute(f"ALTER TABLE {self.table} DROP PARTITION {', '.join(names)}")
+        return len(names)
+
+    @staticmethod
+    def _first(row):
+        if row is None:
+            return None
+        return next(iter(row.values())) if isinstance(row, dict) else row[0]
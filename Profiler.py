@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from flask import g, request
+
+PROFILE_FORMATS = {'collapsed': '.collapsed.txt', 'speedscope': '.speedscope.json'}
+_PROFILE_ID = re.compile(r'^[0-9a-f]{32}$')
+
+class StackSampler:
+    """Samples one thread's Python stack every interval seconds from a background thread"""
+    def __init__(self, thread_id, interval, max_seconds):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        self.seconds = time.perf_counter() - self.started
+
+    def run(self):
+        deadline = time.perf_counter() + self.max_seconds
+        while not self.stopped.wait(self.interval) and time.perf_counter() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def collapsed(self):
+        """Brendan Gregg's collapsed format: one 'outer;...;inner count' line per stack"""
+        lines = []
+        for stack, count in self.stacks.most_common():
+            names = ';'.join(f"{name} ({os.path.basename(filename)}:{line})" for name, filename, line in stack)
+            lines.append(f"{names} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def speedscope(self, name):
+        frames, indexes, samples, weights = [], {}, [], []
+        for stack, count in self.stacks.most_common():
+            sample = []
+            for frame in stack:
+                if frame not in indexes:
+                    indexes[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                sample.append(indexes[frame])
+            samples.append(sample)
+            weights.append(count * self.interval)
+        return json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled", "name": name, "unit": "seconds",
+                "startValue": 0, "endValue": sum(weights),
+                "samples": samples, "weights": weights
+            }],
+            "name": name,
+            "exporter": "cs432-profiler"
+        })
+
+class RequestProfiler:
+    """
+    Runs single requests under a sampling profiler on demand. A request with
+    the X-Profile header or the _profile query parameter ('collapsed' or
+    'speedscope'), sent by a caller the authorize function accepts, has its
+    thread's stack sampled every PROFILE_INTERVAL seconds. The capture is
+    written to PROFILE_DIR, keeping at most PROFILE_MAX_CAPTURES captures
+    and PROFILE_MAX_BYTES bytes, and its ID is returned in X-Profile-Id.
+    Other requests only pay for the header and argument lookup.
+    """
+    def __init__(self, app=None, authorize=None):
+        self.lock = threading.Lock()
+        self.authorize = authorize
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PROFILE_DIR', os.path.join(app.root_path, 'profiles'))
+        app.config.setdefault('PROFILE_INTERVAL', 0.005)  # seconds between samples
+        app.config.setdefault('PROFILE_MAX_SECONDS', 30)
+        app.config.setdefault('PROFILE_MAX_CAPTURES', 50)
+        app.config.setdefault('PROFILE_MAX_BYTES', 50 * 1024 * 1024)
+        self.config = app.config
+        app.extensions['profiler'] = self
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.teardown_request(self.teardown_request)
+
+    def before_request(self):
+        requested = request.headers.get('X-Profile') or request.args.get('_profile')
+        if not requested:
+            return
+        if self.authorize is None or not self.authorize():
+            return
+        profile_format = requested if requested in PROFILE_FORMATS else 'collapsed'
+        sampler = StackSampler(threading.get_ident(), self.config['PROFILE_INTERVAL'], self.config['PROFILE_MAX_SECONDS'])
+        g.profile = (uuid.uuid4().hex, profile_format, sampler)
+        sampler.start()
+
+    def after_request(self, response):
+        profile = g.get('profile')
+        if profile is not None:
+            response.headers['X-Profile-Id'] = profile[0]
+        return response
+
+    def teardown_request(self, exception=None):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return
+        profile_id, profile_format, sampler = profile
+        sampler.stop()
+        route = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+        try:
+            self.save(profile_id, profile_format, sampler, route)
+        except OSError as e:
+            # A full or read-only disk must not fail the profiled request
+            logging.error(f"Could not save profile {profile_id}: {str(e)}")
+
+    def path(self, profile_id, suffix):
+        return os.path.join(self.config['PROFILE_DIR'], profile_id + suffix)
+
+    def save(self, profile_id, profile_format, sampler, route):
+        os.makedirs(self.config['PROFILE_DIR'], exist_ok=True)
+        if profile_format == 'speedscope':
+            body = sampler.speedscope(route)
+        else:
+            body = sampler.collapsed()
+        with open(self.path(profile_id, PROFILE_FORMATS[profile_format]), 'w') as f:
+            f.write(body)
+        with open(self.path(profile_id, '.meta.json'), 'w') as f:
+            json.dump({
+                "id": profile_id,
+                "route": route,
+                "path": request.full_path.rstrip('?'),
+                "format": profile_format,
+                "seconds": round(sampler.seconds, 4),
+                "samples": sampler.samples,
+                "created_at": time.time()
+            }, f)
+        self.prune()
+
+    def captures(self):
+        """Metadata of the stored captures, newest first"""
+        directory = self.config['PROFILE_DIR']
+        if not os.path.isdir(directory):
+            return []
+        captures = []
+        for name in os.listdir(directory):
+            if not name.endswith('.meta.json'):
+                continue
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    meta = json.load(f)
+                meta['bytes'] = os.path.getsize(self.path(meta['id'], PROFILE_FORMATS[meta['format']]))
+            except (OSError, ValueError, KeyError):
+                continue
+            captures.append(meta)
+        captures.sort(key=lambda meta: meta['created_at'], reverse=True)
+        return captures
+
+    def prune(self):
+        with self.lock:
+            kept, total = 0, 0
+            for meta in self.captures():
+                kept += 1
+                total += meta['bytes']
+                if kept > self.config['PROFILE_MAX_CAPTURES'] or total > self.config['PROFILE_MAX_BYTES']:
+                    self.delete(meta['id'])
+
+    def delete(self, profile_id):
+        for suffix in list(PROFILE_FORMATS.values()) + ['.meta.json']:
+            try:
+                os.remove(self.path(profile_id, suffix))
+            except FileNotFoundError:
+                pass
+
+    def find(self, profile_id):
+        """(path, format) of a stored capture, or None"""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        for profile_format, suffix in PROFILE_FORMATS.items():
+            path = self.path(profile_id, suffix)
+            if os.path.exists(path):
+                return path, profile_format
+        return None
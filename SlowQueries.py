@@ -0,0 +1,152 @@
+import hashlib
+import json
+import logging
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from flask import has_request_context, request
+
+# Literals and placeholders become ?, then lists of them collapse to one
+_NORMALIZE = [
+    (re.compile(r"'(?:[^'\\]|\\.|'')*'"), '?'),
+    (re.compile(r'%\(\w+\)s|%s'), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)'), '(?+)'),
+    (re.compile(r'(\(\?\+\)|\(\?\))(?:\s*,\s*\1)+'), r'\1, ...'),
+]
+EXPLAINABLE = ('select', 'update', 'delete', 'insert', 'replace')
+
+def normalize(statement):
+    normalized = ' '.join(statement.split())
+    for pattern, replacement in _NORMALIZE:
+        normalized = pattern.sub(replacement, normalized)
+    return normalized
+
+def param_shape(params, many=False):
+    """Types of the parameters without their values, e.g. 'int, str' or '500 x (int, str)'"""
+    if many:
+        params = list(params or [])
+        return f"{len(params)} x ({param_shape(params[0])})" if params else "0 rows"
+    if params is None:
+        return ''
+    if isinstance(params, dict):
+        return ', '.join(f"{key}: {type(value).__name__}" for key, value in params.items())
+    return ', '.join(type(value).__name__ for value in params)
+
+class SlowQueryLog:
+    """
+    Records queries slower than SLOW_QUERY_MS, grouped by the fingerprint of
+    their normalized SQL, with the route, parameter shape, duration and row
+    count. EXPLAIN FORMAT=JSON plans are captured on a side connection by a
+    background thread, at most once per fingerprint every
+    SLOW_QUERY_EXPLAIN_INTERVAL seconds. Only the latest SLOW_QUERY_LOG_SIZE
+    records and SLOW_QUERY_FINGERPRINTS statements are kept.
+    """
+    def __init__(self, app=None, instrumentation=None, explain_connection_func=None):
+        self.lock = threading.Lock()
+        self.statements = OrderedDict()
+        self.records = deque()
+        self.explain_queue = queue.Queue(maxsize=20)
+        self.explain_thread = None
+        self.explain_connection_func = explain_connection_func
+        if app is not None:
+            self.init_app(app, instrumentation)
+
+    def init_app(self, app, instrumentation):
+        app.config.setdefault('SLOW_QUERY_MS', 200)
+        app.config.setdefault('SLOW_QUERY_LOG_SIZE', 500)
+        app.config.setdefault('SLOW_QUERY_FINGERPRINTS', 200)
+        app.config.setdefault('SLOW_QUERY_EXPLAIN_INTERVAL', 300)  # seconds
+        self.config = app.config
+        self.records = deque(maxlen=app.config['SLOW_QUERY_LOG_SIZE'])
+        app.extensions['slow_queries'] = self
+        instrumentation.query_listeners.append(self.record)
+
+    def record(self, statement, params, seconds, rows, database=None, many=False):
+        elapsed_ms = seconds * 1000
+        if elapsed_ms < self.config['SLOW_QUERY_MS']:
+            return
+
+        normalized = normalize(statement)
+        fingerprint = hashlib.sha1(normalized.encode()).hexdigest()[:12]
+        route = '<background>'
+        if has_request_context():
+            route = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+        record = {
+            "fingerprint": fingerprint,
+            "route": route,
+            "database": database,
+            "param_shape": param_shape(params, many),
+            "ms": round(elapsed_ms, 3),
+            "rows": rows,
+            "at": time.time()
+        }
+        logging.warning(f"Slow query ({elapsed_ms:.0f} ms, {route}): {normalized[:200]}")
+
+        explain = False
+        with self.lock:
+            self.records.append(record)
+            entry = self.statements.pop(fingerprint, None) or {
+                "fingerprint": fingerprint, "statement": normalized, "count": 0, "total_ms": 0.0,
+                "max_ms": 0.0, "rows": 0, "routes": {}, "plan": None, "explained_at": 0
+            }
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['rows'] += rows
+            entry['routes'][route] = entry['routes'].get(route, 0) + 1
+            entry['param_shape'] = record['param_shape']
+            entry['last_seen'] = record['at']
+            # Re-inserted so the least recently seen statement is evicted first
+            self.statements[fingerprint] = entry
+            while len(self.statements) > self.config['SLOW_QUERY_FINGERPRINTS']:
+                self.statements.popitem(last=False)
+
+            if (not many and self.explain_connection_func is not None
+                    and normalized.split(' ', 1)[0].lower() in EXPLAINABLE
+                    and time.time() - entry['explained_at'] >= self.config['SLOW_QUERY_EXPLAIN_INTERVAL']):
+                entry['explained_at'] = time.time()
+                explain = True
+
+        if explain:
+            self.start_explain_thread()
+            try:
+                # The values are only handed to the EXPLAIN, never stored
+                self.explain_queue.put_nowait((fingerprint, statement, params, database))
+            except queue.Full:
+                pass
+
+    def start_explain_thread(self):
+        with self.lock:
+            if self.explain_thread is None:
+                self.explain_thread = threading.Thread(target=self.explain_worker, name='slow-query-explain', daemon=True)
+                self.explain_thread.start()
+
+    def explain_worker(self):
+        while True:
+            fingerprint, statement, params, database = self.explain_queue.get()
+            try:
+                conn = self.explain_connection_func(database)
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute(f"EXPLAIN FORMAT=JSON {statement}", params)
+                    plan = json.loads(cursor.fetchone()[0])
+                    cursor.close()
+                finally:
+                    conn.close()
+            except Exception as e:
+                plan = f"EXPLAIN failed: {str(e)}"
+            with self.lock:
+                if fingerprint in self.statements:
+                    self.statements[fingerprint]['plan'] = plan
+
+    def report(self):
+        with self.lock:
+            statements = [dict(entry, routes=dict(entry['routes'])) for entry in self.statements.values()]
+            records = list(self.records)
+        for entry in statements:
+            entry['avg_ms'] = round(entry['total_ms'] / entry['count'], 3)
+        statements.sort(key=lambda entry: entry['total_ms'], reverse=True)
+        return {"statements": statements, "recent": records[::-1]}
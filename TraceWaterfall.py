@@ -0,0 +1,65 @@
+"""
+Waterfalls of the slowest traces written by Tracing.py:
+
+    python TraceWaterfall.py [traces.jsonl] [--slowest N] [--width COLUMNS]
+
+Kept apart from Tracing.py so it starts without loading Flask.
+"""
+import argparse
+import json
+import os
+
+DEFAULT_TRACE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traces.jsonl')
+
+def load_traces(path):
+    traces = {}
+    with open(path) as f:
+        for line in f:
+            try:
+                span = json.loads(line)
+            except ValueError:
+                continue
+            traces.setdefault(span['trace_id'], []).append(span)
+    return traces
+
+def render_waterfall(spans, width=60):
+    span_ids = {span['span_id'] for span in spans}
+    children = {}
+    for span in spans:
+        parent = span['parent_id'] if span['parent_id'] in span_ids else None
+        children.setdefault(parent, []).append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda span: span['start'])
+
+    start = min(span['start'] for span in spans)
+    total_ms = max(span['start'] * 1000 + span['duration_ms'] for span in spans) - start * 1000
+    scale = width / total_ms if total_ms else 0
+    lines = []
+
+    def walk(span, depth):
+        offset_ms = (span['start'] - start) * 1000
+        bar = ' ' * int(offset_ms * scale) + '=' * max(1, int(span['duration_ms'] * scale))
+        label = span['attrs']['statement'] if span['name'] == 'sql' else span['name']
+        label = f"{'  ' * depth}{span['service']}: {label}"
+        lines.append(f"{label[:70]:<70} {offset_ms:9.1f} {span['duration_ms']:9.1f}  |{bar:<{width}}|")
+        for child in children.get(span['span_id'], []):
+            walk(child, depth + 1)
+
+    for root in children.get(None, []):
+        walk(root, 0)
+    return total_ms, lines
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Waterfalls of the slowest traces in a JSONL trace file")
+    parser.add_argument('path', nargs='?', default=DEFAULT_TRACE_FILE)
+    parser.add_argument('--slowest', type=int, default=5)
+    parser.add_argument('--width', type=int, default=60)
+    args = parser.parse_args()
+
+    rendered = [(trace_id, *render_waterfall(spans, args.width)) for trace_id, spans in load_traces(args.path).items()]
+    rendered.sort(key=lambda trace: trace[1], reverse=True)
+    for trace_id, total_ms, lines in rendered[:args.slowest]:
+        print(f"trace {trace_id}  {total_ms:.1f} ms")
+        print(f"{'span':<70} {'start ms':>9} {'dur ms':>9}")
+        print('\n'.join(lines))
+        print()
@@ -0,0 +1,183 @@
+"""
+Lightweight request tracing shared by the frontend and the backend.
+
+Trace context travels between the apps in a W3C traceparent header. Spans
+(server requests, backend calls, connection checkouts and SQL statements)
+are appended as JSON lines to TRACE_FILE; TraceWaterfall.py renders them.
+"""
+import contextvars
+import json
+import os
+import queue
+import re
+import threading
+import time
+from flask import g, request
+from SlowQueries import normalize
+
+DEFAULT_TRACE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traces.jsonl')
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$')
+
+# The innermost open span of the current thread (or fan-out task)
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+class Span:
+    def __init__(self, trace_id, parent_id, service, name, kind, attrs):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.service = service
+        self.name = name
+        self.kind = kind
+        self.attrs = attrs
+        self.start = time.time()
+        self.started = time.perf_counter()
+        self.token = None
+
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self, duration_ms):
+        return {
+            "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "service": self.service, "name": self.name, "kind": self.kind,
+            "start": self.start, "duration_ms": round(duration_ms, 3), "attrs": self.attrs
+        }
+
+class Tracer:
+    """
+    Traces requests to a Flask app when TRACING_ENABLED is set (or the
+    TRACING environment variable is 1). Each request is a server span that
+    continues the caller's traceparent or starts a new trace; start_span
+    and end_span add child spans, and inject puts the current span into
+    outgoing headers. Given the backend's Instrumentation, every SQL
+    statement run inside a traced request becomes a span with its
+    normalized text. Spans are written by a background thread and dropped
+    if more than TRACE_QUEUE_SIZE are waiting.
+    """
+    def __init__(self, app=None, service='app', instrumentation=None):
+        self.service = service
+        self.queue = None
+        self.writer = None
+        self.lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, instrumentation)
+
+    def init_app(self, app, instrumentation=None):
+        app.config.setdefault('TRACING_ENABLED', os.environ.get('TRACING') == '1')
+        app.config.setdefault('TRACE_FILE', os.environ.get('TRACE_FILE', DEFAULT_TRACE_FILE))
+        app.config.setdefault('TRACE_QUEUE_SIZE', 10000)
+        self.config = app.config
+        app.extensions['tracer'] = self
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.teardown_request(self.teardown_request)
+        if instrumentation is not None:
+            instrumentation.query_listeners.append(self.record_query)
+
+    def current(self):
+        return _current_span.get()
+
+    def start_span(self, name, kind='internal', **attrs):
+        """Open a child of the current span; returns None when no trace is active"""
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        span = Span(parent.trace_id, parent.span_id, self.service, name, kind, attrs)
+        span.token = _current_span.set(span)
+        return span
+
+    def end_span(self, span, **attrs):
+        if span is None:
+            return
+        try:
+            _current_span.reset(span.token)
+        except ValueError:
+            # Closed from another context, e.g. a streamed response finishing elsewhere
+            _current_span.set(None)
+        span.attrs.update(attrs)
+        self.export(span.to_dict((time.perf_counter() - span.started) * 1000))
+
+    def inject(self, headers):
+        span = _current_span.get()
+        if span is not None:
+            headers['traceparent'] = span.traceparent()
+        return headers
+
+    def wrap(self, func):
+        """Run func, typically on a worker thread, as part of the caller's current span"""
+        parent = _current_span.get()
+        if parent is None:
+            return func
+        def traced(*args, **kwargs):
+            token = _current_span.set(parent)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _current_span.reset(token)
+        return traced
+
+    def record_query(self, statement, params, seconds, rows, database=None, many=False):
+        parent = _current_span.get()
+        if parent is None:
+            return
+        # Listeners run once the statement's results are read, so it started seconds ago
+        span = Span(parent.trace_id, parent.span_id, self.service, 'sql', 'db', {
+            "statement": normalize(statement)[:300], "rows": rows, "database": database, "many": many
+        })
+        span.start -= seconds
+        self.export(span.to_dict(seconds * 1000))
+
+    def before_request(self):
+        if not self.config['TRACING_ENABLED'] or request.endpoint in ('static', 'metrics'):
+            return
+        match = _TRACEPARENT.match(request.headers.get('traceparent', ''))
+        trace_id, parent_id = match.groups() if match else (os.urandom(16).hex(), None)
+        span = Span(trace_id, parent_id, self.service, f"{request.method} {request.path}", 'server', {})
+        span.token = _current_span.set(span)
+        g.trace_span = span
+
+    def after_request(self, response):
+        span = g.get('trace_span')
+        if span is not None:
+            span.attrs['status'] = response.status_code
+            span.attrs['route'] = request.url_rule.rule if request.url_rule else None
+            response.headers['X-Trace-Id'] = span.trace_id
+        return response
+
+    def teardown_request(self, exception=None):
+        span = g.pop('trace_span', None)
+        if span is not None:
+            if exception is not None:
+                span.attrs['error'] = repr(exception)
+            self.end_span(span)
+
+    def export(self, record):
+        if self.writer is None:
+            self.start_writer()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+    def start_writer(self):
+        with self.lock:
+            if self.writer is None:
+                self.queue = queue.Queue(maxsize=self.config['TRACE_QUEUE_SIZE'])
+                self.writer = threading.Thread(target=self.write_spans, name='trace-writer', daemon=True)
+                self.writer.start()
+
+    def write_spans(self):
+        while True:
+            records = [self.queue.get()]
+            while len(records) < 500:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                # One write per batch, appended, so both apps can share the file
+                with open(self.config['TRACE_FILE'], 'a') as f:
+                    f.write(''.join(json.dumps(record, default=str) + '\n' for record in records))
+            except OSError:
+                pass
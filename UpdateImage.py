@@ -1,5 +1,4 @@
 from flask import jsonify
-import psycopg2
 
 class UpdateImage:
     def __init__(self, request, conn, logging):
@@ -23,6 +22,9 @@ class UpdateImage:
 
         image_data = imagefile.read()
 
+        # Only needed here, so it is not loaded with the app
+        import psycopg2
+
         try:
             cursor = self.conn.cursor()
             cursor.execute(
@@ -31,7 +33,6 @@ class UpdateImage:
             )
             self.conn.commit()
             cursor.close()
-            self.conn.close()
             self.logging.info(f"Image for member {member_id} added successfully")
             return jsonify({'message': 'Image uploaded successfully'}), 200
 
@@ -1,20 +1,32 @@
-from flask import Flask, request, jsonify, make_response
+from flask import Flask, request, jsonify, make_response, send_file, g, has_request_context
 from flask_cors import CORS
 from functools import wraps
 import mysql.connector
-import psycopg2
-import bcrypt
+from mysql.connector import pooling
 import jwt
 import datetime
+import os
 import logging
 import hashlib
-import traceback
-import requests
+import threading
+import time
+import uuid
 
 # Import custom modules
 import AddUser
 import Login
 import UpdateImage
+from Compression import Compression
+from Events import EventBroker
+from Instrumentation import Instrumentation, LATENCY_BUCKETS_MS, query_budget
+from Metrics import Metrics
+from SlowQueries import SlowQueryLog
+from Tracing import Tracer
+from Profiler import RequestProfiler
+from Allocations import AllocationTracker
+from Maintenance import MaintenanceJobs
+from Partitions import MonthlyPartitions
+from JsonProvider import FastJSONProvider
 
 # Helper function to hash a password using MD5.
 def hash_password_md5(password):
@@ -23,10 +35,57 @@ def hash_password_md5(password):
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'CS'  # Change this in production
+app.json = FastJSONProvider(app)
 
 # Enable CORS support for cross-origin requests
 CORS(app)
 
+# Negotiated gzip/br/zstd compression for JSON responses above COMPRESS_MIN_SIZE
+compression = Compression(app)
+
+# Live notification and request status events, streamed at /api/events/<user_id>;
+# with SSE_RELAY they are shared between worker processes through the project database
+events = EventBroker(app, lambda: get_db_connection(use_cism=False))
+
+# Wall, connection and query time per request: Server-Timing header and /api/admin/request-stats
+instrumentation = Instrumentation(app)
+
+# Queries slower than SLOW_QUERY_MS with their EXPLAIN plans, at /api/admin/slow-queries.
+# Plans are taken on a plain connection so the EXPLAIN itself is not instrumented
+slow_queries = SlowQueryLog(app, instrumentation, lambda database: mysql.connector.connect(
+    **dict(project_db_config, database=database or project_db_config['database'])
+))
+
+# Spans for requests, connection checkouts and SQL statements, continuing the frontend's traceparent
+tracer = Tracer(app, service='backend', instrumentation=instrumentation)
+
+# Sampling profiles of single requests sent by admins with X-Profile or ?_profile, at /api/admin/profiles
+profiler = RequestProfiler(app, authorize=lambda: (get_bearer_claims() or {}).get('role') == 'admin')
+
+# tracemalloc snapshots and per-route allocations while tracing, at /api/admin/memory
+allocations = AllocationTracker(app)
+
+# Prometheus metrics at /metrics; request rate and latency by route and status are built in
+metrics = Metrics(app, prefix='cs432_backend')
+DB_CONNECTIONS_IN_USE = metrics.gauge('db_connections_in_use', 'Open database connections')
+DB_CONNECTIONS_WAITING = metrics.gauge('db_connections_waiting', 'Database connections being opened')
+EVENT_STREAMS = metrics.gauge('event_streams', 'Open event streams')
+EVENT_QUEUE_DEPTH = metrics.gauge('event_queue_depth', 'Notification and status events waiting to be sent to open streams')
+JWT_FAILURES = metrics.counter('jwt_decode_failures_total', 'Tokens rejected while decoding', ['reason'])
+CONDITIONAL_GETS = metrics.counter('conditional_get_total', 'Validated GET requests by outcome', ['result'])
+
+def sample_gauges():
+    DB_CONNECTIONS_IN_USE.set(instrumentation.connections_open)
+    DB_CONNECTIONS_WAITING.set(instrumentation.connecting)
+    streams, queued = events.depth()
+    EVENT_STREAMS.set(streams)
+    EVENT_QUEUE_DEPTH.set(queued)
+
+metrics.add_sampler(sample_gauges)
+
+# Batched retention jobs, run on a schedule and from /api/admin/maintenance
+maintenance = MaintenanceJobs(app, lambda: get_db_connection(use_cism=False))
+
 # Logging configuration
 logging.basicConfig(
     level=logging.INFO,
@@ -50,12 +109,102 @@ cism_db_config = {
     "database": "cs432cims"
 }
 
+# Connections per database kept open by each process; 0 opens a new connection per use
+app.config.setdefault('DB_POOL_SIZE', 16)
+app.config.setdefault('DB_POOL_TIMEOUT', 5)  # seconds to wait for a free pooled connection
+
+class PoolTimeout(pooling.PoolError):
+    """No pooled connection came free within DB_POOL_TIMEOUT"""
+
+class BoundedConnectionPool(pooling.MySQLConnectionPool):
+    """
+    A pool whose checkouts wait, up to a timeout, on a semaphore sized to the
+    pool instead of failing as soon as it is empty, and are counted so
+    saturation can be read without the pool's internals.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.free = threading.BoundedSemaphore(self.pool_size)
+        self.in_use = 0
+        self.in_use_lock = threading.Lock()
+
+    def checkout(self, timeout):
+        if not self.free.acquire(timeout=timeout):
+            raise PoolTimeout(f"No free connection in pool {self.pool_name} after {timeout}s")
+        try:
+            cnx = self.get_connection()
+        except Exception:
+            self.free.release()
+            raise
+        with self.in_use_lock:
+            self.in_use += 1
+        return cnx
+
+    def add_connection(self, cnx=None):
+        # Called with the connection when a checked-out one is closed, and without while filling the pool
+        try:
+            super().add_connection(cnx)
+        finally:
+            if cnx is not None:
+                with self.in_use_lock:
+                    self.in_use -= 1
+                self.free.release()
+
+_db_pools = {}
+_db_pools_lock = threading.Lock()
+
+def get_db_pool(config):
+    """The pool for a database, opening all of its connections on first use"""
+    pool = _db_pools.get(config['database'])
+    if pool is None:
+        with _db_pools_lock:
+            pool = _db_pools.get(config['database'])
+            if pool is None:
+                # consume_results lets a connection be reset for reuse even if a result was left unread
+                pool = BoundedConnectionPool(pool_name=config['database'], pool_size=app.config['DB_POOL_SIZE'],
+                                             consume_results=True, **config)
+                _db_pools[config['database']] = pool
+    return pool
+
+def connect_pooled(**config):
+    if not app.config['DB_POOL_SIZE']:
+        return mysql.connector.connect(**config)
+    try:
+        return get_db_pool(config).checkout(app.config['DB_POOL_TIMEOUT'])
+    except PoolTimeout:
+        if has_request_context():
+            g.pool_timeout = True
+        raise
+
+def pool_status():
+    """Size and checked-out connections of each pool, read without touching the database"""
+    return {name: {"size": pool.pool_size, "in_use": pool.in_use} for name, pool in list(_db_pools.items())}
+
+@app.errorhandler(PoolTimeout)
+def handle_pool_timeout(error):
+    return pool_busy_response()
+
+@app.after_request
+def pool_timeout_response(response):
+    # Most routes turn any exception into a 500; running out of connections is load, not a fault
+    if g.get('pool_timeout') and response.status_code == 500:
+        return pool_busy_response()
+    return response
+
+def pool_busy_response():
+    response = jsonify({"error": "Server busy, please retry"})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(max(1, int(app.config['DB_POOL_TIMEOUT'])))
+    return response
+
 # Database connection function; default connects to CISM database.
 def get_db_connection(use_cism=True):
-    if use_cism:
-        return mysql.connector.connect(**cism_db_config)
-    else:
-        return mysql.connector.connect(**project_db_config)
+    config = cism_db_config if use_cism else project_db_config
+    span = tracer.start_span('db.connect', kind='db', database=config['database'])
+    try:
+        return instrumentation.connect(connect_pooled, **config)
+    finally:
+        tracer.end_span(span)
 
 def log_cims_database_change(session_token, action, table_name, record_id, details, app_config, db_connection_func):
     """
@@ -107,9 +256,11 @@ def log_cims_database_change(session_token, action, table_name, record_id, detai
             return True
 
         except jwt.ExpiredSignatureError:
+            JWT_FAILURES.labels('expired').inc()
             logging.warning(f"Expired session attempted database change: {log_message}")
             return False
         except jwt.InvalidTokenError:
+            JWT_FAILURES.labels('invalid').inc()
             logging.warning(f"Invalid session attempted database change: {log_message}")
             return False
 
@@ -153,14 +304,185 @@ def role_required(allowed_roles):
                 request.user = decoded  # Add user info to request context
 
             except jwt.ExpiredSignatureError:
+                JWT_FAILURES.labels('expired').inc()
                 return jsonify({"error": "Session expired"}), 401
             except jwt.InvalidTokenError:
+                JWT_FAILURES.labels('invalid').inc()
                 return jsonify({"error": "Invalid token"}), 401
 
             return f(*args, **kwargs)
         return decorated_function
     return decorator
 
+# ----------------------- CONDITIONAL REQUESTS -----------------------
+
+def project_table(name):
+    # Read at call time, so a PROJECT_DB override given to create_app applies
+    return f"{project_db_config['database']}.{name}"
+
+# Per-scope change versions live in the G6 database so every process sees the
+# same validators. Scopes are 'maintenance_requests', 'students',
+# 'student:<id>' and 'notifications:<id>'.
+_change_versions_ready = None
+
+def ensure_change_versions_table():
+    """Create the change_versions table once per process; returns False if it is unavailable"""
+    global _change_versions_ready
+    if _change_versions_ready is not None:
+        return _change_versions_ready
+
+    try:
+        # DDL commits implicitly, so it must never run on a caller's connection
+        conn = get_db_connection(use_cism=False)
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {project_table('change_versions')} (
+                Scope VARCHAR(100) PRIMARY KEY,
+                Version BIGINT NOT NULL DEFAULT 0,
+                Updated_At DATETIME NOT NULL
+            )
+        """)
+        conn.commit()
+        _change_versions_ready = True
+    except Exception as e:
+        logging.error(f"Conditional requests disabled, change_versions unavailable: {str(e)}")
+        _change_versions_ready = False
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+    return _change_versions_ready
+
+def bump_change_versions(cursor, *scopes):
+    """Advance the version of each scope inside the caller's transaction"""
+    if not ensure_change_versions_table():
+        return
+    scopes = sorted(set(scopes))
+    if not scopes:
+        return
+    # One statement, with rows sorted so concurrent writers take the row locks in the same order
+    cursor.execute(f"""
+        INSERT INTO {project_table('change_versions')} (Scope, Version, Updated_At)
+        VALUES {', '.join(['(%s, 1, UTC_TIMESTAMP())'] * len(scopes))}
+        ON DUPLICATE KEY UPDATE Version = Version + 1, Updated_At = UTC_TIMESTAMP()
+    """, tuple(scopes))
+
+def get_change_validators(scopes, variant=''):
+    """Return (etag, last_modified) for the given scopes, or None if they cannot be computed"""
+    if not ensure_change_versions_table():
+        return None
+
+    try:
+        conn = get_db_connection(use_cism=False)
+        cursor = conn.cursor()
+        placeholders = ', '.join(['%s'] * len(scopes))
+        cursor.execute(
+            f"SELECT Scope, Version, Updated_At FROM {project_table('change_versions')} WHERE Scope IN ({placeholders})",
+            tuple(scopes)
+        )
+        rows = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    except Exception as e:
+        logging.warning(f"Could not read change versions for {scopes}: {str(e)}")
+        return None
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+    # Scopes that were never written hash as version 0
+    state = [variant] + [f"{scope}={rows.get(scope, (0, None))[0]}@{rows.get(scope, (0, None))[1]}" for scope in sorted(scopes)]
+    etag = hashlib.sha1('|'.join(state).encode()).hexdigest()[:20]
+
+    timestamps = [updated_at for _, updated_at in rows.values() if updated_at]
+    last_modified = max(timestamps).replace(tzinfo=datetime.timezone.utc) if timestamps else None
+    return etag, last_modified
+
+def conditional_get(scopes_func):
+    """
+    Answer If-None-Match / If-Modified-Since with 304 before the view runs.
+    scopes_func receives the view arguments and returns (scopes, variant), or None
+    when the request cannot be validated; the variant separates bodies that differ
+    per caller (e.g. role) for the same scopes. A third item, when given, is the
+    last time the body changed for reasons the scopes do not track.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            resolved = scopes_func(*args, **kwargs)
+            validators = get_change_validators(*resolved[:2]) if resolved else None
+            if not validators:
+                CONDITIONAL_GETS.labels('unvalidated').inc()
+
+            if validators:
+                etag, last_modified = validators
+                changed_at = resolved[2] if len(resolved) > 2 else None
+                if changed_at and (last_modified is None or changed_at > last_modified):
+                    last_modified = changed_at
+                if request.if_none_match:
+                    # If-None-Match takes precedence over If-Modified-Since
+                    not_modified = request.if_none_match.contains_weak(etag)
+                else:
+                    not_modified = bool(last_modified and request.if_modified_since
+                                        and last_modified.replace(microsecond=0) <= request.if_modified_since)
+                CONDITIONAL_GETS.labels('not_modified' if not_modified else 'full').inc()
+                if not_modified:
+                    response = make_response('', 304)
+                    response.set_etag(etag, weak=True)
+                    return response
+
+            response = make_response(f(*args, **kwargs))
+            if validators and response.status_code == 200:
+                response.set_etag(etag, weak=True)
+                if last_modified:
+                    response.last_modified = last_modified
+                response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
+
+def get_bearer_claims():
+    """Decode the Authorization bearer token, returning None if it is missing or invalid"""
+    auth_header = request.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer '):
+        return None
+    try:
+        return jwt.decode(auth_header[7:], app.config['SECRET_KEY'], algorithms=["HS256"])
+    except jwt.InvalidTokenError:
+        JWT_FAILURES.labels('invalid').inc()
+        return None
+
+def maintenance_requests_scopes():
+    claims = get_bearer_claims()
+    # Date ranges select different rows for the same scopes
+    date_range = f"{request.args.get('from', '')}:{request.args.get('to', '')}"
+    if claims and claims.get('role') in ['admin', 'technician']:
+        return ['maintenance_requests', 'students'], f"{claims['role']}:{date_range}"
+
+    student_id = request.args.get('student_id')
+    if not student_id:
+        return None
+    return [f"student:{student_id}", 'students'], f"student:{student_id}:{date_range}"
+
+def notifications_scopes(user_id):
+    # Only validate requests the view itself would allow
+    if str(user_id) != str(request.user.get('session_id', user_id)) and request.user['role'] != 'admin':
+        return None
+    return with_notification_window([f"notifications:{user_id}"], str(user_id))
+
+def with_notification_window(scopes, variant):
+    """
+    Validators for bodies listing notifications inside the retention window. The
+    window moves at midnight without any write, so its start is part of the variant
+    and the moment it last moved counts as a change.
+    """
+    window_start = notification_window_start()
+    moved_at = None
+    if app.config['MAINTENANCE_ENABLED']:
+        moved_at = datetime.datetime.combine(datetime.date.today(), datetime.time.min).astimezone(datetime.timezone.utc)
+    return scopes, f"{variant}:window={window_start.date().isoformat()}", moved_at
+
 # ----------------------- API ROUTES -----------------------
 
 # Root endpoint
@@ -213,8 +535,13 @@ def api_login():
     response.set_cookie('session_token', token, max_age=3600, httponly=True)
 
     # Update session in database using the Login module.
-    login_instance = Login.Login(request, get_db_connection(), logging, app.config['SECRET_KEY'])
-    login_instance.get_session()
+    conn = get_db_connection()
+    try:
+        login_instance = Login.Login(request, conn, logging, app.config['SECRET_KEY'])
+        login_instance.get_session()
+    finally:
+        # Returns the connection to the pool
+        conn.close()
     if login_instance.response:
         return login_instance.response
 
@@ -223,40 +550,57 @@ def api_login():
 @app.route('/api/auth/status', methods=['GET'])
 def api_auth_status():
     token = request.cookies.get('session_token')
+
+    # Fallback to Authorization header
+    if not token and 'Authorization' in request.headers:
+        auth_header = request.headers['Authorization']
+        if auth_header.startswith('Bearer '):
+            token = auth_header[7:]  # Remove the Bearer prefix
+
     if not token:
         return jsonify({"error": "No session found"}), 401
 
     try:
         decoded = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
     except jwt.ExpiredSignatureError:
+        JWT_FAILURES.labels('expired').inc()
         return jsonify({"error": "Session expired"}), 401
     except jwt.InvalidTokenError:
+        JWT_FAILURES.labels('invalid').inc()
         return jsonify({"error": "Invalid session token"}), 401
 
     return jsonify({
         "message": "User is authenticated",
         "username": decoded["user"],
         "role": decoded["role"],
+        "session_id": decoded.get("session_id"),
         "expiry": decoded["exp"]
     }), 200
 
 # ----------------------- USER MANAGEMENT (ADMIN) -----------------------
 
 # Helper function to check if any users exist
+# Once a user exists the first-user registration path is closed, so only True is cached
+_users_exist = False
+
 def any_users_exist():
+    global _users_exist
+    if _users_exist:
+        return True
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM members")
-        count = cursor.fetchone()[0]
+        cursor.execute("SELECT 1 FROM members LIMIT 1")
+        _users_exist = cursor.fetchone() is not None
         cursor.close()
         conn.close()
-        return count > 0
+        return _users_exist
     except Exception as e:
         logging.error(f"Error checking if users exist: {str(e)}")
         return True  # Assume users exist in case of error
 
 @app.route('/api/admin/add-user', methods=['POST'])
+@query_budget(16)
 def api_add_user():
     session_id = request.json.get('session_id')
 
@@ -284,8 +628,10 @@ def api_add_user():
                 )
                 return jsonify({"error": "Admin privileges required"}), 403
         except jwt.ExpiredSignatureError:
+            JWT_FAILURES.labels('expired').inc()
             return jsonify({"error": "Session expired"}), 401
         except jwt.InvalidTokenError:
+            JWT_FAILURES.labels('invalid').inc()
             return jsonify({"error": "Invalid session token"}), 401
 
     # If this is the first user, force the role to be admin
@@ -295,7 +641,11 @@ def api_add_user():
         request.json = request_data
 
     # Process the user creation
-    out = AddUser.AddUser(request, logging, get_db_connection())
+    conn = get_db_connection()
+    try:
+        out = AddUser.AddUser(request, logging, conn, get_db_connection)
+    finally:
+        conn.close()
 
     # Log the change if successful
     token = request.cookies.get('session_token')
@@ -450,6 +800,9 @@ def delete_from_g6_database(email, role):
                 logging.info(f"Deleted technician with email {email} from G6 database")
                 deleted = True
 
+        if deleted:
+            # Student deletes cascade into maintenance_requests
+            bump_change_versions(g6_cursor, 'students', 'maintenance_requests')
         g6_conn.commit()
         return deleted
 
@@ -564,11 +917,70 @@ def api_db_check_tables():
 
 @app.route('/api/image/update', methods=['POST'])
 def api_update_image():
-    return UpdateImage.UpdateImage(request, get_db_connection(), logging).update_image()
+    conn = get_db_connection()
+    try:
+        return UpdateImage.UpdateImage(request, conn, logging).update_image()
+    finally:
+        conn.close()
 
 # ----------------------- MAINTENANCE REQUESTS -----------------------
 
+def fetch_maintenance_requests(cursor, role, student_id=None, date_from=None, date_to=None):
+    """
+    Requests visible to a role: all for admins, open ones for technicians, a student's own
+    otherwise. An optional Submission_Date range (inclusive dates) that reaches back past
+    the archive horizon also reads maintenance_requests_archive.
+    """
+    conditions, params = [], []
+    if date_from:
+        conditions.append("r.Submission_Date >= %s")
+        params.append(date_from)
+    if date_to:
+        conditions.append("r.Submission_Date < %s")
+        params.append(date_to + datetime.timedelta(days=1))
+
+    source = "maintenance_requests"
+    # Only closed requests are archived, so technicians never need the archive
+    if role != 'technician' and range_reaches_archive(date_from, date_to):
+        ensure_archive_tables()
+        source = "(SELECT * FROM maintenance_requests UNION ALL SELECT * FROM maintenance_requests_archive)"
+
+    if role == 'admin':
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        cursor.execute(f"""
+            SELECT r.*, s.Name as StudentName
+            FROM {source} r
+            JOIN students s ON r.Student_ID = s.Student_ID
+            {where}
+            ORDER BY r.Submission_Date DESC
+        """, tuple(params))
+    elif role == 'technician':
+        conditions.insert(0, "r.Status IN ('submitted', 'in_progress')")
+        cursor.execute(f"""
+            SELECT r.*, s.Name as StudentName
+            FROM {source} r
+            JOIN students s ON r.Student_ID = s.Student_ID
+            WHERE {' AND '.join(conditions)}
+            ORDER BY r.Submission_Date DESC
+        """, tuple(params))
+    else:
+        conditions.insert(0, "r.Student_ID = %s")
+        cursor.execute(f"""
+            SELECT r.* FROM {source} r
+            WHERE {' AND '.join(conditions)}
+            ORDER BY r.Submission_Date DESC
+        """, (student_id, *params))
+    return cursor.fetchall()
+
+def parse_date_range():
+    """Read ?from=YYYY-MM-DD&to=YYYY-MM-DD; raises ValueError on malformed dates"""
+    date_from, date_to = request.args.get('from'), request.args.get('to')
+    return (datetime.date.fromisoformat(date_from) if date_from else None,
+            datetime.date.fromisoformat(date_to) if date_to else None)
+
 @app.route('/api/maintenance/requests', methods=['GET'])
+@query_budget(6)
+@conditional_get(maintenance_requests_scopes)
 def api_get_maintenance_requests():
     try:
         conn = get_db_connection(use_cism=False)  # Use project database
@@ -600,6 +1012,11 @@ def api_get_maintenance_requests():
             conn.commit()
             return jsonify([]), 200  # Return empty list since table was just created
 
+        try:
+            date_from, date_to = parse_date_range()
+        except ValueError:
+            return jsonify({"error": "Dates must be in YYYY-MM-DD format"}), 400
+
         # Check if user is authenticated
         token = None
         if 'Authorization' in request.headers:
@@ -611,29 +1028,11 @@ def api_get_maintenance_requests():
             try:
                 decoded = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
 
-                # For admin users, return all requests with student names
-                if decoded["role"] == 'admin':
-                    cursor.execute("""
-                        SELECT r.*, s.Name as StudentName
-                        FROM maintenance_requests r
-                        JOIN students s ON r.Student_ID = s.Student_ID
-                        ORDER BY r.Submission_Date DESC
-                    """)
-                    requests_data = cursor.fetchall()
-                    return jsonify(requests_data), 200
-
-                # For technician users, return pending requests (submitted or in_progress)
-                elif decoded["role"] == 'technician':
-                    cursor.execute("""
-                        SELECT r.*, s.Name as StudentName
-                        FROM maintenance_requests r
-                        JOIN students s ON r.Student_ID = s.Student_ID
-                        WHERE r.Status IN ('submitted', 'in_progress')
-                        ORDER BY r.Submission_Date DESC
-                    """)
-                    requests_data = cursor.fetchall()
-                    return jsonify(requests_data), 200
+                # Admins see all requests, technicians the pending ones (submitted or in_progress)
+                if decoded["role"] in ['admin', 'technician']:
+                    return jsonify(fetch_maintenance_requests(cursor, decoded["role"], date_from=date_from, date_to=date_to)), 200
             except Exception as e:
+                JWT_FAILURES.labels('expired' if isinstance(e, jwt.ExpiredSignatureError) else 'invalid').inc()
                 logging.warning(f"Error decoding token: {str(e)}")
                 # Continue with normal flow if token is invalid
 
@@ -647,14 +1046,7 @@ def api_get_maintenance_requests():
         if not cursor.fetchone():
             return jsonify([]), 200  # Return empty list if student doesn't exist
 
-        cursor.execute("""
-            SELECT * FROM maintenance_requests
-            WHERE Student_ID = %s
-            ORDER BY Submission_Date DESC
-        """, (student_id,))
-
-        requests_data = cursor.fetchall()
-        return jsonify(requests_data), 200
+        return jsonify(fetch_maintenance_requests(cursor, 'student', student_id, date_from, date_to)), 200
 
     except Exception as e:
         logging.error(f"Error retrieving maintenance requests: {str(e)}")
@@ -664,9 +1056,15 @@ def api_get_maintenance_requests():
         conn.close()
 
 @app.route('/api/maintenance/request', methods=['POST'])
+@query_budget(25)
 def api_create_maintenance_request():
     try:
         data = request.json
+        # Students may leave out their own ID; it is taken from the bearer token
+        claims = get_bearer_claims()
+        if 'student_id' not in data and claims and claims.get('role') == 'student':
+            data['student_id'] = claims.get('session_id')
+
         required_fields = ['student_id', 'issue_description', 'location', 'priority']
         for field in required_fields:
             if field not in data:
@@ -700,7 +1098,13 @@ def api_create_maintenance_request():
 
         # Check if student exists
         cursor_project.execute("SELECT * FROM students WHERE Student_ID = %s", (data['student_id'],))
-        if not cursor_project.fetchone():
+        student_exists = cursor_project.fetchone() is not None
+        own_record = claims and claims.get('role') == 'student' and str(claims.get('session_id')) == str(data['student_id'])
+        if not student_exists and own_record:
+            # The logged-in student gets a record named after their account
+            ensure_role_record(cursor_project, claims)
+            conn_project.commit()
+        elif not student_exists:
             # Create a default student record if it doesn't exist
             cursor_project.execute("""
                 INSERT INTO students
@@ -713,6 +1117,7 @@ def api_create_maintenance_request():
                 "N/A",
                 20
             ))
+            bump_change_versions(cursor_project, 'students', f"student:{data['student_id']}")
             conn_project.commit()
             logging.info(f"Created default student record for ID {data['student_id']}")
 
@@ -753,57 +1158,20 @@ def api_create_maintenance_request():
             data['priority']
         ))
         request_id = cursor_project.lastrowid
+        bump_change_versions(cursor_project, 'maintenance_requests', f"student:{data['student_id']}")
         conn_project.commit()
 
-        # Try to use CIMS database for notifications
-        try:
-            conn_cims = get_db_connection(use_cism=True)
-            cursor_cims = conn_cims.cursor()
-
-            # Check the structure of the G6_notifications table
-            cursor_cims.execute("DESCRIBE G6_notifications")
-            columns = cursor_cims.fetchall()
-            logging.info(f"G6_notifications table structure: {columns}")
-
-            # Check if Notification_ID is auto-increment
-            has_auto_increment = False
-            for col in columns:
-                if col[0] == 'Notification_ID' and 'auto_increment' in col[5].lower():
-                    has_auto_increment = True
-                    break
-
-            if has_auto_increment:
-                # If Notification_ID is auto-increment, we don't need to specify it
-                cursor_cims.execute("""
-                    INSERT INTO G6_notifications
-                    (Student_ID, Message)
-                    VALUES (%s, %s)
-                """, (
-                    data['student_id'],
-                    "Your maintenance request has been submitted successfully."
-                ))
-            else:
-                # If Notification_ID is not auto-increment, we need to generate a unique ID
-                # First, get the maximum Notification_ID
-                cursor_cims.execute("SELECT MAX(Notification_ID) FROM G6_notifications")
-                max_id = cursor_cims.fetchone()[0]
-                new_id = 1 if max_id is None else max_id + 1
-
-                cursor_cims.execute("""
-                    INSERT INTO G6_notifications
-                    (Notification_ID, Student_ID, Message)
-                    VALUES (%s, %s, %s)
-                """, (
-                    new_id,
-                    data['student_id'],
-                    "Your maintenance request has been submitted successfully."
-                ))
-
-            conn_cims.commit()
-            logging.info("Notification created successfully")
-        except Exception as e:
-            logging.error(f"Error creating notification: {str(e)}")
-            # Continue even if notification creation fails
+        events.publish('staff', 'request_created', {
+            "Request_ID": request_id,
+            "Student_ID": data['student_id'],
+            "Location": data['location'],
+            "Priority": data['priority'],
+            "Status": 'submitted'
+        })
+
+        # Notification failures are logged and do not fail the request
+        add_notification(data['student_id'], "Your maintenance request has been submitted successfully.",
+                         request_id=request_id, key=f"request:{request_id}:submitted")
 
         return jsonify({
             "message": "Maintenance request created successfully",
@@ -814,18 +1182,12 @@ def api_create_maintenance_request():
         logging.error(f"Error creating maintenance request: {str(e)}")
         if 'conn_project' in locals():
             conn_project.rollback()
-        if 'conn_cims' in locals():
-            conn_cims.rollback()
         return jsonify({"error": str(e)}), 500
     finally:
         if 'cursor_project' in locals():
             cursor_project.close()
         if 'conn_project' in locals():
             conn_project.close()
-        if 'cursor_cims' in locals():
-            cursor_cims.close()
-        if 'conn_cims' in locals():
-            conn_cims.close()
 
 @app.route('/api/maintenance/request/<int:request_id>', methods=['GET'])
 @role_required(['admin'])
@@ -833,16 +1195,24 @@ def api_get_maintenance_request_detail(request_id):
     try:
         conn = get_db_connection(use_cism=False)
         cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT r.*, s.Name as StudentName, s.Email as StudentEmail, s.Contact_Number as StudentContact
-            FROM maintenance_requests r
-            JOIN students s ON r.Student_ID = s.Student_ID
-            WHERE r.Request_ID = %s
-        """, (request_id,))
-        request_data = cursor.fetchone()
+
+        # Requests not in the live tables may have been moved to the archive tables
+        for suffix in ['', '_archive']:
+            if suffix:
+                ensure_archive_tables()
+            cursor.execute(f"""
+                SELECT r.*, s.Name as StudentName, s.Email as StudentEmail, s.Contact_Number as StudentContact
+                FROM maintenance_requests{suffix} r
+                JOIN students s ON r.Student_ID = s.Student_ID
+                WHERE r.Request_ID = %s
+            """, (request_id,))
+            request_data = cursor.fetchone()
+            if request_data:
+                break
 
         if not request_data:
             return jsonify({"error": "Maintenance request not found"}), 404
+        request_data['Archived'] = bool(suffix)
 
         if request.user['role'] == 'admin' and 'session_id' in request.user:
             if str(request_data['Student_ID']) != str(request.user['session_id']):
@@ -851,9 +1221,9 @@ def api_get_maintenance_request_detail(request_id):
                 )
                 return jsonify({"error": "You can only view your own maintenance requests"}), 403
 
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT ta.*, t.Name as TechnicianName, t.Specialization
-            FROM technician_assignments ta
+            FROM technician_assignments{suffix} ta
             JOIN technicians t ON ta.Technician_ID = t.Technician_ID
             WHERE ta.Request_ID = %s
         """, (request_id,))
@@ -861,18 +1231,25 @@ def api_get_maintenance_request_detail(request_id):
         if assignment:
             request_data['technician'] = assignment
 
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT ml.*, t.Name as TechnicianName
-            FROM maintenance_logs ml
+            FROM maintenance_logs{suffix} ml
             JOIN technicians t ON ml.Technician_ID = t.Technician_ID
             WHERE ml.Request_ID = %s
             ORDER BY ml.Updated_At DESC
         """, (request_id,))
         logs = cursor.fetchall()
+
+        # Entries of closed requests may have been rolled up by the retention job
+        ensure_retention_tables()
+        cursor.execute("SELECT History FROM maintenance_log_rollups WHERE Request_ID = %s", (request_id,))
+        rollup = cursor.fetchone()
+        if rollup:
+            logs.extend(reversed(app.json.loads(rollup['History'])))
         request_data['logs'] = logs
 
-        cursor.execute("""
-            SELECT * FROM feedback
+        cursor.execute(f"""
+            SELECT * FROM feedback{suffix}
             WHERE Request_ID = %s
         """, (request_id,))
         feedback = cursor.fetchone()
@@ -880,48 +1257,11 @@ def api_get_maintenance_request_detail(request_id):
             request_data['feedback'] = feedback
 
         # Add notification if status is completed
-        if request_data['Status'] == 'completed':
-            try:
-                conn_cims = get_db_connection(use_cism=True)
-                cursor_cims = conn_cims.cursor()
-                
-                cursor_cims.execute("DESCRIBE G6_notifications")
-                columns = cursor_cims.fetchall()
-                has_auto_increment = any(col[0] == 'Notification_ID' and 'auto_increment' in col[5].lower() for col in columns)
-
-                if has_auto_increment:
-                    cursor_cims.execute("""
-                        INSERT INTO G6_notifications
-                        (Student_ID, Message)
-                        VALUES (%s, %s)
-                    """, (
-                        request_data['Student_ID'],
-                        "Your maintenance request has been completed."
-                    ))
-                else:
-                    cursor_cims.execute("SELECT MAX(Notification_ID) FROM G6_notifications")
-                    max_id = cursor_cims.fetchone()[0]
-                    new_id = 1 if max_id is None else max_id + 1
-
-                    cursor_cims.execute("""
-                        INSERT INTO G6_notifications
-                        (Notification_ID, Student_ID, Message)
-                        VALUES (%s, %s, %s)
-                    """, (
-                        new_id,
-                        request_data['Student_ID'],
-                        "Your maintenance request has been completed."
-                    ))
-
-                conn_cims.commit()
-                logging.info("Completion notification created successfully")
-            except Exception as e:
-                logging.error(f"Error creating completion notification: {str(e)}")
-            finally:
-                if 'cursor_cims' in locals():
-                    cursor_cims.close()
-                if 'conn_cims' in locals():
-                    conn_cims.close()
+        if request_data['Status'] == 'completed' and not request_data['Archived']:
+            # Keyed like the status update's notification, so viewing never repeats it
+            if not add_notification(request_data['Student_ID'], "Your maintenance request has been completed.",
+                                    request_id=request_id, key=f"request:{request_id}:completed"):
+                logging.error("Error creating completion notification")
 
         return jsonify(request_data), 200
 
@@ -933,6 +1273,7 @@ def api_get_maintenance_request_detail(request_id):
         conn.close()
 
 @app.route('/api/maintenance/request/<int:request_id>', methods=['PUT'])
+@query_budget(16)
 @role_required(['admin', 'technician'])
 def api_update_maintenance_request(request_id):
     try:
@@ -955,9 +1296,11 @@ def api_update_maintenance_request(request_id):
         if cursor_project.rowcount == 0:
             return jsonify({"error": "Maintenance request not found"}), 404
 
-        conn_project.commit()
         cursor_project.execute("SELECT Student_ID FROM maintenance_requests WHERE Request_ID = %s", (request_id,))
         student_id = cursor_project.fetchone()[0]
+        bump_change_versions(cursor_project, 'maintenance_requests', f"student:{student_id}")
+        conn_project.commit()
+        publish_request_status(request_id, student_id, data['status'])
 
         status_message = {
             'in_progress': "Your maintenance request is now in progress.",
@@ -966,7 +1309,8 @@ def api_update_maintenance_request(request_id):
         }
         if data['status'] in status_message:
             # Add notification using the helper function
-            notification_success = add_notification(student_id, status_message[data['status']])
+            notification_success = add_notification(student_id, status_message[data['status']], request_id=request_id,
+                                                    key=f"request:{request_id}:{data['status']}")
             if not notification_success:
                 logging.warning(f"Failed to add notification for student {student_id} about status update to {data['status']}")
 
@@ -986,11 +1330,13 @@ def api_update_maintenance_request(request_id):
 # ----------------------- TECHNICIAN ASSIGNMENT -----------------------
 
 @app.route('/api/maintenance/assign-technician', methods=['POST'])
+@query_budget(24)
 @role_required(['admin', 'technician'])
 def api_assign_technician():
     try:
         data = request.json
-        required_fields = ['request_id', 'technician_id']
+        # Technicians assigning themselves may leave out technician_id
+        required_fields = ['request_id'] if request.user['role'] == 'technician' else ['request_id', 'technician_id']
         for field in required_fields:
             if field not in data:
                 return jsonify({"error": f"Missing required field: {field}"}), 400
@@ -998,6 +1344,10 @@ def api_assign_technician():
         # Use project database for everything except notifications
         conn_project = get_db_connection(use_cism=False)
         cursor_project = conn_project.cursor()
+
+        if 'technician_id' not in data:
+            # Same default record as /api/pages creates for a technician without one
+            data['technician_id'] = ensure_role_record(cursor_project, request.user)[0]
         cursor_project.execute("""
             SELECT Status, Student_ID FROM maintenance_requests
             WHERE Request_ID = %s
@@ -1037,6 +1387,7 @@ def api_assign_technician():
                 SET Status = 'in_progress'
                 WHERE Request_ID = %s
             """, (data['request_id'],))
+            bump_change_versions(cursor_project, 'maintenance_requests', f"student:{student_id}")
 
         cursor_project.execute("""
             SELECT * FROM work_orders
@@ -1050,9 +1401,13 @@ def api_assign_technician():
             """, (data['request_id'], data['technician_id']))
 
         conn_project.commit()
+        if status == 'submitted':
+            publish_request_status(data['request_id'], student_id, 'in_progress')
 
         # Add notification using the helper function
-        notification_success = add_notification(student_id, "A technician has been assigned to your maintenance request.")
+        notification_success = add_notification(student_id, "A technician has been assigned to your maintenance request.",
+                                                request_id=data['request_id'],
+                                                key=f"request:{data['request_id']}:assigned:{data['technician_id']}")
         if not notification_success:
             logging.warning(f"Failed to add notification for student {student_id} about technician assignment")
 
@@ -1184,44 +1539,223 @@ def api_submit_feedback():
             conn.close()
 
 # ----------------------- NOTIFICATIONS -----------------------
-def add_notification(student_id, message, request_id=None, technician_name=None):
-    try:
-        conn = get_db_connection(use_cism=True)
-        cursor = conn.cursor()
 
-        # First check if the G6_notifications table exists in cs432cims database
+# Whether G6_notifications assigns Notification_ID itself; looked up once per process
+_notification_ids_auto = None
+
+def notification_ids_auto_increment():
+    global _notification_ids_auto
+    if _notification_ids_auto is not None:
+        return _notification_ids_auto
+
+    # DDL commits implicitly, so it must never run on a caller's connection
+    conn = get_db_connection(use_cism=True)
+    cursor = conn.cursor()
+    try:
         cursor.execute("""
-            SELECT COUNT(*)
-            FROM information_schema.tables
-            WHERE table_schema = 'cs432cims'
-            AND table_name = 'G6_notifications'
+            CREATE TABLE IF NOT EXISTS cs432cims.G6_notifications (
+                Notification_ID INT AUTO_INCREMENT PRIMARY KEY,
+                Student_ID INT NOT NULL,
+                Message TEXT NOT NULL,
+                Sent_At TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
         """)
+        cursor.execute("DESCRIBE cs432cims.G6_notifications")
+        _notification_ids_auto = any(
+            col[0] == 'Notification_ID' and 'auto_increment' in col[5].lower() for col in cursor.fetchall()
+        )
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    return _notification_ids_auto
 
-        if cursor.fetchone()[0] == 0:
-            # Create G6_notifications table with auto-increment Notification_ID
-            cursor.execute("""
-                CREATE TABLE G6_notifications (
-                    Notification_ID INT AUTO_INCREMENT PRIMARY KEY,
-                    Student_ID INT NOT NULL,
-                    Message TEXT NOT NULL,
-                    Sent_At TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            logging.info("Created G6_notifications table in cs432cims database")
-            conn.commit()
+# Serialises generated Notification_IDs between processes when the table has no auto-increment
+NOTIFICATION_ID_LOCK = 'cs432g6_notification_ids'
+
+def reserve_notification_ids(cursor, count):
+    """
+    The next count Notification_IDs for a G6_notifications without auto-increment.
+    Takes a MySQL named lock that the caller holds until its insert commits and
+    then gives back with release_notification_ids. On errors, closing the
+    connection releases it: returning a pooled connection resets its session.
+    """
+    cursor.execute("SELECT GET_LOCK(%s, %s)", (NOTIFICATION_ID_LOCK, app.config['DB_POOL_TIMEOUT']))
+    if not cursor.fetchone()[0]:
+        raise RuntimeError("Timed out waiting for the notification ID lock")
+    # A locking read sees rows committed after this transaction's snapshot was taken
+    cursor.execute("SELECT MAX(Notification_ID) FROM cs432cims.G6_notifications FOR UPDATE")
+    max_id = cursor.fetchone()[0] or 0
+    return [max_id + 1 + i for i in range(count)]
+
+def release_notification_ids(cursor):
+    cursor.execute("SELECT RELEASE_LOCK(%s)", (NOTIFICATION_ID_LOCK,))
+    cursor.fetchone()
+
+# notification_state: per-student read watermark and unread counter, kept in
+# step with G6_notifications so the unread count is a primary key lookup.
+# notification_threads: latest notification per (student, request), for
+# coalescing. notification_keys: idempotency keys of notifications already sent.
+_notification_tables_ready = False
+
+# Notifications about the same request within this many seconds replace each other
+app.config.setdefault('NOTIFICATION_COALESCE_WINDOW', 300)
+
+def ensure_notification_tables():
+    """Create the notification bookkeeping tables once per process"""
+    global _notification_tables_ready
+    if _notification_tables_ready:
+        return
+
+    # DDL commits implicitly, so it must never run on a caller's connection
+    conn = get_db_connection(use_cism=False)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {project_table('notification_state')} (
+                Student_ID INT PRIMARY KEY,
+                Last_Read_ID INT NOT NULL DEFAULT 0,
+                Unread INT NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {project_table('notification_threads')} (
+                Student_ID INT NOT NULL,
+                Request_ID INT NOT NULL,
+                Notification_ID INT NOT NULL,
+                Updated_At DATETIME NOT NULL,
+                PRIMARY KEY (Student_ID, Request_ID)
+            )
+        """)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {project_table('notification_keys')} (
+                Idempotency_Key VARCHAR(150) PRIMARY KEY,
+                Notification_ID INT,
+                Created_At DATETIME NOT NULL,
+                INDEX (Created_At)
+            )
+        """)
+        conn.commit()
+        _notification_tables_ready = True
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_notification_state(cursor, student_id, for_update=False):
+    """Return (last_read_id, unread), counting the student's notifications once when no row exists yet"""
+    ensure_notification_tables()
+    lock = " FOR UPDATE" if for_update else ""
+    cursor.execute(f"SELECT Last_Read_ID, Unread FROM {project_table('notification_state')} WHERE Student_ID = %s{lock}", (student_id,))
+    row = cursor.fetchone()
+    if row:
+        return tuple(row.values()) if isinstance(row, dict) else tuple(row)
+
+    cursor.execute(f"""
+        INSERT IGNORE INTO {project_table('notification_state')} (Student_ID, Last_Read_ID, Unread)
+        SELECT %s, 0, COUNT(*) FROM cs432cims.G6_notifications WHERE Student_ID = %s
+    """, (student_id, student_id))
+    cursor.execute(f"SELECT Last_Read_ID, Unread FROM {project_table('notification_state')} WHERE Student_ID = %s{lock}", (student_id,))
+    row = cursor.fetchone()
+    return tuple(row.values()) if isinstance(row, dict) else tuple(row)
+
+def add_notification(student_id, message, request_id=None, technician_name=None, key=None):
+    """
+    Insert a notification for a student and push it to their event stream.
+    With request_id, a notification about the same request still unread and
+    less than NOTIFICATION_COALESCE_WINDOW seconds old is replaced: it is
+    deleted and the new one takes a new ID, so ?since= readers see it.
+    A key already used for an earlier notification makes this a no-op.
+    """
+    try:
+        conn = get_db_connection(use_cism=True)
+        cursor = conn.cursor()
 
         # If technician name and request ID are provided, format the specific message
         if request_id and technician_name:
             message = f"Your Maintenance request {request_id} is being looked by Technician {technician_name}."
 
-        # Insert notification with auto-increment ID
-        cursor.execute("""
-            INSERT INTO cs432cims.G6_notifications
-            (Student_ID, Message)
-            VALUES (%s, %s)
-        """, (student_id, message))
+        auto_increment = notification_ids_auto_increment()
+        ensure_notification_tables()
+        if key:
+            # The key row is locked until commit, so a concurrent duplicate waits and then sees it
+            cursor.execute(f"""
+                INSERT IGNORE INTO {project_table('notification_keys')} (Idempotency_Key, Created_At)
+                VALUES (%s, NOW())
+            """, (key,))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                logging.info(f"Skipped duplicate notification {key} for student {student_id}")
+                return True
+
+        # Counted before the insert so the new row is not counted twice
+        last_read_id, _ = get_notification_state(cursor, student_id)
+
+        replaced_id = None
+        reserved_ids = False
+        window = app.config['NOTIFICATION_COALESCE_WINDOW']
+        if request_id and window:
+            cursor.execute(f"""
+                SELECT Notification_ID FROM {project_table('notification_threads')}
+                WHERE Student_ID = %s AND Request_ID = %s AND Updated_At >= NOW() - INTERVAL %s SECOND
+                FOR UPDATE
+            """, (student_id, request_id, window))
+            thread = cursor.fetchone()
+            # A notification the student has already read is left as it was
+            if thread and thread[0] > last_read_id:
+                cursor.execute("""
+                    DELETE FROM cs432cims.G6_notifications
+                    WHERE Notification_ID = %s AND Student_ID = %s
+                """, (thread[0], student_id))
+                if cursor.rowcount:
+                    replaced_id = thread[0]
+
+        if auto_increment:
+            cursor.execute("""
+                INSERT INTO cs432cims.G6_notifications
+                (Student_ID, Message)
+                VALUES (%s, %s)
+            """, (student_id, message))
+            notification_id = cursor.lastrowid
+        else:
+            # The shared table has no auto-increment, so IDs are generated here
+            notification_id = reserve_notification_ids(cursor, 1)[0]
+            reserved_ids = True
+            cursor.execute("""
+                INSERT INTO cs432cims.G6_notifications
+                (Notification_ID, Student_ID, Message)
+                VALUES (%s, %s, %s)
+            """, (notification_id, student_id, message))
+        # The notification replaced was unread too, so the count stays the same
+        if replaced_id is None:
+            cursor.execute(f"UPDATE {project_table('notification_state')} SET Unread = Unread + 1 WHERE Student_ID = %s", (student_id,))
+
+        if request_id:
+            cursor.execute(f"""
+                INSERT INTO {project_table('notification_threads')} (Student_ID, Request_ID, Notification_ID, Updated_At)
+                VALUES (%s, %s, %s, NOW())
+                ON DUPLICATE KEY UPDATE Notification_ID = VALUES(Notification_ID), Updated_At = NOW()
+            """, (student_id, request_id, notification_id))
+        if key:
+            cursor.execute(f"UPDATE {project_table('notification_keys')} SET Notification_ID = %s WHERE Idempotency_Key = %s", (notification_id, key))
+        bump_change_versions(cursor, f"notifications:{student_id}")
         conn.commit()
+        if reserved_ids:
+            release_notification_ids(cursor)
 
+        cursor.execute("""
+            SELECT Sent_At FROM cs432cims.G6_notifications
+            WHERE Notification_ID = %s AND Student_ID = %s
+        """, (notification_id, student_id))
+        sent_at = cursor.fetchone()
+        _, unread = get_notification_state(cursor, student_id)
+        events.publish(f"user:{student_id}", 'notification', {
+            "Notification_ID": notification_id,
+            "Student_ID": student_id,
+            "Message": message,
+            "Sent_At": sent_at[0] if sent_at else None,
+            "Unread": unread,
+            "Replaces": replaced_id
+        })
         return True
     except Exception as e:
         logging.error(f"Error adding notification: {str(e)}")
@@ -1234,8 +1768,28 @@ def add_notification(student_id, message, request_id=None, technician_name=None)
         if 'conn' in locals():
             conn.close()
 
+def notification_window_start():
+    """
+    Oldest Sent_At still within NOTIFICATION_RETENTION_DAYS. Notification queries are
+    bounded by it so MySQL skips expired partitions when the tables are partitioned.
+    It starts at midnight, so the window only moves once a day. Without
+    MAINTENANCE_ENABLED nothing expires, so every notification is in the window.
+    """
+    if not app.config['MAINTENANCE_ENABLED']:
+        return datetime.datetime(1970, 1, 1)
+    first_day = datetime.date.today() - datetime.timedelta(days=app.config['NOTIFICATION_RETENTION_DAYS'])
+    return datetime.datetime.combine(first_day, datetime.time.min)
+
+def publish_request_status(request_id, student_id, status):
+    """Push a status transition to the request's student and to staff streams"""
+    data = {"Request_ID": request_id, "Student_ID": student_id, "Status": status}
+    events.publish(f"user:{student_id}", 'request_status', data)
+    events.publish('staff', 'request_status', data)
+
 @app.route('/api/notifications/<int:user_id>', methods=['GET'])
+@query_budget(4)
 @role_required(['admin', 'student', 'technician'])
+@conditional_get(notifications_scopes)
 def api_get_notifications(user_id):
     try:
         # Check if user is trying to access their own notifications
@@ -1252,9 +1806,9 @@ def api_get_notifications(user_id):
         cursor = conn.cursor(dictionary=True)
         cursor.execute("""
             SELECT * FROM cs432cims.G6_notifications
-            WHERE Student_ID = %s
+            WHERE Student_ID = %s AND Sent_At >= %s
             ORDER BY Sent_At DESC
-        """, (user_id,))
+        """, (user_id, notification_window_start()))
         notifications = cursor.fetchall()
         return jsonify(notifications), 200
 
@@ -1265,6 +1819,476 @@ def api_get_notifications(user_id):
         cursor.close()
         conn.close()
 
+NOTIFICATION_PAGE_LIMIT = 50
+
+def notification_access_error(user_id):
+    """403 response when a non-admin asks for another user's notifications, otherwise None"""
+    if str(user_id) != str(request.user.get('session_id', user_id)) and request.user['role'] != 'admin':
+        return jsonify({"error": "You can only view your own notifications"}), 403
+    return None
+
+def notification_feed_scopes(user_id):
+    resolved = notifications_scopes(user_id)
+    if not resolved:
+        return None
+    # Each cursor position is a different body
+    return with_notification_window(resolved[0], f"feed:{user_id}?{request.query_string.decode()}")
+
+@app.route('/api/notifications/<int:user_id>/feed', methods=['GET'])
+@query_budget(6)
+@role_required(['admin', 'student', 'technician'])
+@conditional_get(notification_feed_scopes)
+def api_get_notification_feed(user_id):
+    """Notifications newest first, paged with ?before=<id>; ?since=<id> returns newer ones oldest first"""
+    denied = notification_access_error(user_id)
+    if denied:
+        return denied
+
+    since = request.args.get('since', type=int)
+    before = request.args.get('before', type=int)
+    limit = max(1, min(request.args.get('limit', 20, type=int), NOTIFICATION_PAGE_LIMIT))
+
+    try:
+        conn = get_db_connection(use_cism=True)
+        cursor = conn.cursor(dictionary=True)
+        last_read_id, unread = get_notification_state(cursor, user_id)
+        conn.commit()
+
+        conditions, params = ["Student_ID = %s", "Sent_At >= %s"], [user_id, notification_window_start()]
+        if since is not None:
+            conditions.append("Notification_ID > %s")
+            params.append(since)
+        if before is not None:
+            conditions.append("Notification_ID < %s")
+            params.append(before)
+        order = "ASC" if since is not None and before is None else "DESC"
+
+        # One extra row tells whether another page exists
+        cursor.execute(f"""
+            SELECT * FROM cs432cims.G6_notifications
+            WHERE {' AND '.join(conditions)}
+            ORDER BY Notification_ID {order}
+            LIMIT %s
+        """, (*params, limit + 1))
+        notifications = cursor.fetchall()
+        has_more = len(notifications) > limit
+        notifications = notifications[:limit]
+        for notification in notifications:
+            notification['Read'] = notification['Notification_ID'] <= last_read_id
+
+        feed = {
+            "notifications": notifications,
+            "unread": unread,
+            "last_read_id": last_read_id,
+            "has_more": has_more
+        }
+        if notifications:
+            cursor_key = 'next_since' if order == "ASC" else 'next_before'
+            feed[cursor_key] = notifications[-1]['Notification_ID']
+        return jsonify(feed), 200
+
+    except Exception as e:
+        logging.error(f"Error retrieving notification feed: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+def unread_count_scopes(user_id):
+    resolved = notifications_scopes(user_id)
+    return (resolved[0], f"unread:{user_id}") if resolved else None
+
+@app.route('/api/notifications/<int:user_id>/unread-count', methods=['GET'])
+@query_budget(5)
+@role_required(['admin', 'student', 'technician'])
+@conditional_get(unread_count_scopes)
+def api_get_unread_count(user_id):
+    """Unread notification count from the counter row; cheap enough for every page view"""
+    denied = notification_access_error(user_id)
+    if denied:
+        return denied
+
+    try:
+        conn = get_db_connection(use_cism=True)
+        cursor = conn.cursor()
+        last_read_id, unread = get_notification_state(cursor, user_id)
+        conn.commit()
+        return jsonify({"unread": unread, "last_read_id": last_read_id}), 200
+    except Exception as e:
+        logging.error(f"Error retrieving unread count: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+@app.route('/api/notifications/<int:user_id>/read', methods=['POST'])
+@query_budget(8)
+@role_required(['admin', 'student', 'technician'])
+def api_mark_notifications_read(user_id):
+    """Mark notifications read up to the given ID, or all of them when up_to is omitted"""
+    denied = notification_access_error(user_id)
+    if denied:
+        return denied
+
+    data = request.get_json(silent=True) or {}
+    up_to = data.get('up_to')
+    if up_to is not None:
+        if isinstance(up_to, bool) or not str(up_to).isdigit():
+            return jsonify({"error": "up_to must be a notification ID (a non-negative integer)"}), 400
+        up_to = int(up_to)
+
+    try:
+        conn = get_db_connection(use_cism=True)
+        cursor = conn.cursor()
+        last_read_id, unread = get_notification_state(cursor, user_id, for_update=True)
+
+        if up_to is None:
+            cursor.execute("SELECT MAX(Notification_ID) FROM cs432cims.G6_notifications WHERE Student_ID = %s", (user_id,))
+            up_to = cursor.fetchone()[0] or 0
+
+        if up_to > last_read_id:
+            # Only the newly read range is counted, never the whole history
+            cursor.execute("""
+                SELECT COUNT(*) FROM cs432cims.G6_notifications
+                WHERE Student_ID = %s AND Notification_ID > %s AND Notification_ID <= %s
+            """, (user_id, last_read_id, up_to))
+            unread = max(unread - cursor.fetchone()[0], 0)
+            last_read_id = up_to
+            cursor.execute(f"""
+                UPDATE {project_table('notification_state')}
+                SET Last_Read_ID = %s, Unread = %s
+                WHERE Student_ID = %s
+            """, (last_read_id, unread, user_id))
+            bump_change_versions(cursor, f"notifications:{user_id}")
+        conn.commit()
+
+        events.publish(f"user:{user_id}", 'notifications_read', {"Last_Read_ID": last_read_id, "Unread": unread})
+        return jsonify({"unread": unread, "last_read_id": last_read_id}), 200
+
+    except Exception as e:
+        logging.error(f"Error marking notifications read: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+# ----------------------- BROADCASTS -----------------------
+
+app.config.setdefault('BROADCAST_CHUNK_SIZE', 500)
+app.config.setdefault('BROADCAST_CHUNK_PAUSE', 0.05)  # seconds
+
+# Each query returns the next chunk of target Student_IDs after a given ID.
+# A building is the part of a request's Location before the first comma.
+BROADCAST_AUDIENCES = {
+    'all': """
+        SELECT Student_ID FROM students
+        WHERE Student_ID > %(after)s
+        ORDER BY Student_ID LIMIT %(limit)s
+    """,
+    'building': """
+        SELECT DISTINCT Student_ID FROM maintenance_requests
+        WHERE SUBSTRING_INDEX(Location, ',', 1) = %(building)s AND Student_ID > %(after)s
+        ORDER BY Student_ID LIMIT %(limit)s
+    """,
+    'open_requests': """
+        SELECT DISTINCT Student_ID FROM maintenance_requests
+        WHERE Status IN ('submitted', 'in_progress') AND Student_ID > %(after)s
+        ORDER BY Student_ID LIMIT %(limit)s
+    """,
+}
+
+app.config.setdefault('BROADCAST_STALE_AFTER', 60)  # seconds without progress before another worker resumes it
+
+# Each broadcast's progress and the last Student_ID sent, committed together
+# with each chunk, so any worker can report progress and a broadcast whose
+# worker stopped resumes from its last chunk. Claim identifies the run that
+# currently owns it.
+_broadcasts_table_ready = False
+
+def ensure_broadcasts_table():
+    """Create the broadcasts table once per process"""
+    global _broadcasts_table_ready
+    if _broadcasts_table_ready:
+        return
+
+    # DDL commits implicitly, so it runs on its own connection
+    conn = get_db_connection(use_cism=False)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS broadcasts (
+                Broadcast_ID VARCHAR(12) PRIMARY KEY,
+                Audience VARCHAR(20) NOT NULL,
+                Building VARCHAR(100),
+                Message TEXT NOT NULL,
+                Status ENUM('running', 'completed', 'failed') NOT NULL DEFAULT 'running',
+                Last_Student_ID INT NOT NULL DEFAULT 0,
+                Sent INT NOT NULL DEFAULT 0,
+                Chunks INT NOT NULL DEFAULT 0,
+                Error TEXT,
+                Claim CHAR(32) NOT NULL,
+                Heartbeat_At DATETIME NOT NULL,
+                Started_At DATETIME NOT NULL,
+                Finished_At DATETIME,
+                INDEX idx_broadcasts_status (Status, Heartbeat_At)
+            )
+        """)
+        conn.commit()
+        _broadcasts_table_ready = True
+    finally:
+        cursor.close()
+        conn.close()
+
+def claim_broadcast(cursor, broadcast_id):
+    """Take over a running broadcast with no progress for BROADCAST_STALE_AFTER seconds; returns the new claim or None"""
+    claim = uuid.uuid4().hex
+    cursor.execute("""
+        UPDATE broadcasts SET Claim = %s, Heartbeat_At = NOW()
+        WHERE Broadcast_ID = %s AND Status = 'running' AND Heartbeat_At < NOW() - INTERVAL %s SECOND
+    """, (claim, broadcast_id, app.config['BROADCAST_STALE_AFTER']))
+    return claim if cursor.rowcount == 1 else None
+
+def start_broadcast(broadcast_id, claim):
+    threading.Thread(target=run_broadcast, args=(broadcast_id, claim), daemon=True).start()
+
+def resume_broadcasts():
+    """Resume the broadcasts whose worker stopped; returns how many this process took over"""
+    ensure_broadcasts_table()
+    conn = get_db_connection(use_cism=False)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT Broadcast_ID FROM broadcasts
+            WHERE Status = 'running' AND Heartbeat_At < NOW() - INTERVAL %s SECOND
+        """, (app.config['BROADCAST_STALE_AFTER'],))
+        claimed = []
+        for (broadcast_id,) in cursor.fetchall():
+            claim = claim_broadcast(cursor, broadcast_id)
+            if claim:
+                claimed.append((broadcast_id, claim))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    for broadcast_id, claim in claimed:
+        logging.info(f"Resuming broadcast {broadcast_id}")
+        start_broadcast(broadcast_id, claim)
+    return len(claimed)
+
+def send_broadcast_chunk(cursor, student_ids, message):
+    """Insert one notification per student with a single multi-row INSERT; returns the new IDs"""
+    if notification_ids_auto_increment():
+        cursor.execute(f"""
+            INSERT INTO cs432cims.G6_notifications
+            (Student_ID, Message)
+            VALUES {', '.join(['(%s, %s)'] * len(student_ids))}
+        """, tuple(value for student_id in student_ids for value in (student_id, message)))
+        # A multi-row insert reports the ID of its first row; the rest follow in order
+        notification_ids = [cursor.lastrowid + i for i in range(len(student_ids))]
+    else:
+        # The caller commits and then releases the ID lock
+        notification_ids = reserve_notification_ids(cursor, len(student_ids))
+        cursor.execute(f"""
+            INSERT INTO cs432cims.G6_notifications
+            (Notification_ID, Student_ID, Message)
+            VALUES {', '.join(['(%s, %s, %s)'] * len(student_ids))}
+        """, tuple(value for row in zip(notification_ids, student_ids) for value in (row[0], row[1], message)))
+
+    # Students without a state row are counted in full when it is first created
+    placeholders = ', '.join(['%s'] * len(student_ids))
+    cursor.execute(f"""
+        UPDATE {project_table('notification_state')} SET Unread = Unread + 1
+        WHERE Student_ID IN ({placeholders})
+    """, tuple(student_ids))
+    bump_change_versions(cursor, *[f"notifications:{student_id}" for student_id in student_ids])
+    return notification_ids
+
+def run_broadcast(broadcast_id, claim):
+    """
+    Send a broadcast in chunks of BROADCAST_CHUNK_SIZE students from its last
+    committed chunk. Each chunk commits with the broadcast's progress; if
+    another run has claimed the broadcast since, this one stops instead.
+    """
+    try:
+        ensure_notification_tables()
+        conn = get_db_connection(use_cism=False)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT Audience, Building, Message, Last_Student_ID FROM broadcasts WHERE Broadcast_ID = %s
+        """, (broadcast_id,))
+        audience, building, message, after = cursor.fetchone()
+        sent = 0
+        while True:
+            cursor.execute(BROADCAST_AUDIENCES[audience], {
+                "after": after, "building": building, "limit": app.config['BROADCAST_CHUNK_SIZE']
+            })
+            student_ids = [row[0] for row in cursor.fetchall()]
+            if not student_ids:
+                break
+
+            # Locks the broadcast row until commit, so a concurrent takeover waits for this chunk
+            cursor.execute("""
+                UPDATE broadcasts
+                SET Last_Student_ID = %s, Sent = Sent + %s, Chunks = Chunks + 1, Heartbeat_At = NOW()
+                WHERE Broadcast_ID = %s AND Claim = %s AND Status = 'running'
+            """, (student_ids[-1], len(student_ids), broadcast_id, claim))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                logging.info(f"Broadcast {broadcast_id} was taken over by another worker")
+                return
+
+            notification_ids = send_broadcast_chunk(cursor, student_ids, message)
+            conn.commit()
+            if not notification_ids_auto_increment():
+                release_notification_ids(cursor)
+            for student_id, notification_id in zip(student_ids, notification_ids):
+                events.publish(f"user:{student_id}", 'notification', {
+                    "Notification_ID": notification_id,
+                    "Student_ID": student_id,
+                    "Message": message,
+                    "Sent_At": datetime.datetime.now()
+                })
+
+            after, sent = student_ids[-1], sent + len(student_ids)
+            time.sleep(app.config['BROADCAST_CHUNK_PAUSE'])
+
+        cursor.execute("""
+            UPDATE broadcasts SET Status = 'completed', Finished_At = NOW()
+            WHERE Broadcast_ID = %s AND Claim = %s
+        """, (broadcast_id, claim))
+        conn.commit()
+        logging.info(f"Broadcast {broadcast_id} sent to {sent} students by this worker")
+    except Exception as e:
+        logging.error(f"Error sending broadcast {broadcast_id}: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+            try:
+                cursor.execute("""
+                    UPDATE broadcasts SET Status = 'failed', Error = %s, Finished_At = NOW()
+                    WHERE Broadcast_ID = %s AND Claim = %s
+                """, (str(e), broadcast_id, claim))
+                conn.commit()
+            except Exception as update_error:
+                # Left running, so it resumes once BROADCAST_STALE_AFTER passes
+                logging.error(f"Could not record the failure of broadcast {broadcast_id}: {str(update_error)}")
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+@app.route('/api/admin/notifications/broadcast', methods=['POST'])
+@role_required(['admin'])
+def api_broadcast_notification():
+    """
+    Notify a set of students: audience is 'all', 'building' (with building, e.g. "Hostel A")
+    or 'open_requests'. Runs in the background; poll the returned progress URL.
+    """
+    data = request.get_json(silent=True) or {}
+    message, audience, building = data.get('message'), data.get('audience'), data.get('building')
+    if not message:
+        return jsonify({"error": "Missing required field: message"}), 400
+    if audience not in BROADCAST_AUDIENCES:
+        return jsonify({"error": f"Invalid audience. Must be one of: {', '.join(BROADCAST_AUDIENCES)}"}), 400
+    if audience == 'building' and not building:
+        return jsonify({"error": "Missing required field: building"}), 400
+
+    broadcast_id, claim = uuid.uuid4().hex[:12], uuid.uuid4().hex
+    try:
+        ensure_broadcasts_table()
+        conn = get_db_connection(use_cism=False)
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO broadcasts (Broadcast_ID, Audience, Building, Message, Claim, Heartbeat_At, Started_At)
+            VALUES (%s, %s, %s, %s, %s, NOW(), NOW())
+        """, (broadcast_id, audience, building, message, claim))
+        conn.commit()
+    except Exception as e:
+        logging.error(f"Error starting broadcast: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+    start_broadcast(broadcast_id, claim)
+    logging.info(f"Broadcast {broadcast_id} to {audience} started by {request.user['user']}")
+    return jsonify({
+        "broadcast_id": broadcast_id,
+        "progress_url": f"/api/admin/notifications/broadcast/{broadcast_id}"
+    }), 202
+
+@app.route('/api/admin/notifications/broadcast/<string:broadcast_id>', methods=['GET'])
+@role_required(['admin'])
+def api_broadcast_progress(broadcast_id):
+    """Progress from the broadcasts table; a broadcast whose worker stopped is resumed here"""
+    try:
+        ensure_broadcasts_table()
+        conn = get_db_connection(use_cism=False)
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT *, Status = 'running' AND Heartbeat_At < NOW() - INTERVAL %s SECOND AS Stalled
+            FROM broadcasts WHERE Broadcast_ID = %s
+        """, (app.config['BROADCAST_STALE_AFTER'], broadcast_id))
+        progress = cursor.fetchone()
+        if not progress:
+            return jsonify({"error": "Broadcast not found"}), 404
+        if progress['Stalled']:
+            claim = claim_broadcast(cursor, broadcast_id)
+            conn.commit()
+            if claim:
+                logging.info(f"Resuming broadcast {broadcast_id}")
+                start_broadcast(broadcast_id, claim)
+    except Exception as e:
+        logging.error(f"Error fetching broadcast {broadcast_id}: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+    return jsonify({
+        "broadcast_id": progress['Broadcast_ID'],
+        "audience": progress['Audience'],
+        "building": progress['Building'],
+        "message": progress['Message'],
+        "status": progress['Status'],
+        "sent": progress['Sent'],
+        "chunks": progress['Chunks'],
+        "error": progress['Error'],
+        "started_at": progress['Started_At'],
+        "finished_at": progress['Finished_At']
+    }), 200
+
+@app.route('/api/events/<int:user_id>', methods=['GET'])
+@role_required(['admin', 'student', 'technician'])
+def api_event_stream(user_id):
+    """Server-Sent Events: the user's notifications and request status changes"""
+    if str(user_id) != str(request.user.get('session_id', user_id)) and request.user['role'] != 'admin':
+        return jsonify({"error": "You can only follow your own events"}), 403
+
+    channels = [f"user:{user_id}"]
+    if request.user['role'] in ['admin', 'technician']:
+        channels.append('staff')
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    response = app.response_class(events.stream(channels, last_event_id), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Keeps reverse proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 # ----------------------- ADMIN DASHBOARD -----------------------
 
 @app.route('/api/admin/dashboard', methods=['GET'])
@@ -1387,6 +2411,8 @@ def api_delete_g6_user(role, user_id):
 
         # Delete the user from the appropriate table
         cursor.execute(f"DELETE FROM {table} WHERE {id_field} = %s", (user_id,))
+        if role == 'student':
+            bump_change_versions(cursor, 'students', 'maintenance_requests', f"student:{user_id}")
         conn.commit()
 
         # Check if user exists in CIMS database and delete if found
@@ -1611,6 +2637,7 @@ def api_add_student():
                     SET Name = %s, Email = %s, Contact_Number = %s, Age = %s
                     WHERE Student_ID = %s
                 """, (name, email, contact_number, age, student_id))
+                bump_change_versions(cursor, 'students', f"student:{student_id}")
                 conn.commit()
                 return jsonify({
                     "message": "Student updated successfully",
@@ -1643,6 +2670,7 @@ def api_add_student():
             """, (name, email, contact_number, age))
 
         student_id = student_id or cursor.lastrowid
+        bump_change_versions(cursor, 'students', f"student:{student_id}")
         conn.commit()
 
         return jsonify({
@@ -1742,9 +2770,97 @@ def api_view_security_logs():
         logging.error(f"Error retrieving security logs: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/admin/compression-stats', methods=['GET'])
+@role_required(['admin'])
+def api_compression_stats():
+    return jsonify({
+        "encodings": compression.available_encodings(),
+        "min_size": app.config['COMPRESS_MIN_SIZE'],
+        "stats": compression.snapshot()
+    }), 200
+
+@app.route('/api/admin/request-stats', methods=['GET'])
+@role_required(['admin'])
+def api_request_stats():
+    """Per-route latency and database time histograms, with query and row counts"""
+    return jsonify({
+        "buckets_ms": list(LATENCY_BUCKETS_MS),
+        "routes": instrumentation.route_stats()
+    }), 200
+
+@app.route('/api/admin/slow-queries', methods=['GET'])
+@role_required(['admin'])
+def api_slow_queries():
+    """Slow statements by fingerprint, slowest in total first, and the most recent slow executions"""
+    report = slow_queries.report()
+    report['threshold_ms'] = app.config['SLOW_QUERY_MS']
+    return jsonify(report), 200
+
+@app.route('/api/admin/profiles', methods=['GET'])
+@role_required(['admin'])
+def api_list_profiles():
+    """Stored request profiles, newest first"""
+    return jsonify({"profiles": profiler.captures()}), 200
+
+@app.route('/api/admin/profiles/<string:profile_id>', methods=['GET'])
+@role_required(['admin'])
+def api_download_profile(profile_id):
+    """Download a profile as collapsed stacks (flamegraph.pl, speedscope) or speedscope JSON"""
+    capture = profiler.find(profile_id)
+    if capture is None:
+        return jsonify({"error": "Profile not found"}), 404
+    path, profile_format = capture
+    mimetype = 'application/json' if profile_format == 'speedscope' else 'text/plain'
+    return send_file(path, mimetype=mimetype, as_attachment=True, download_name=os.path.basename(path))
+
+@app.route('/api/admin/memory', methods=['GET'])
+@role_required(['admin'])
+def api_memory_status():
+    """Tracing state, kept snapshots and per-route allocations since tracing started"""
+    status = allocations.status()
+    status['routes'] = allocations.route_stats()
+    return jsonify(status), 200
+
+@app.route('/api/admin/memory/start', methods=['POST'])
+@role_required(['admin'])
+def api_memory_start():
+    data = request.get_json(silent=True) or {}
+    try:
+        frames = int(data.get('frames') or 0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "frames must be an integer"}), 400
+    return jsonify(allocations.start(frames)), 200
+
+@app.route('/api/admin/memory/stop', methods=['POST'])
+@role_required(['admin'])
+def api_memory_stop():
+    return jsonify(allocations.stop()), 200
+
+@app.route('/api/admin/memory/snapshot', methods=['POST'])
+@role_required(['admin'])
+def api_memory_snapshot():
+    data = request.get_json(silent=True) or {}
+    try:
+        return jsonify(allocations.snapshot(data.get('name'))), 200
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+
+@app.route('/api/admin/memory/diff', methods=['GET'])
+@role_required(['admin'])
+def api_memory_diff():
+    """Top allocation sites by growth between snapshots ?from= and ?to="""
+    old_name, new_name = request.args.get('from'), request.args.get('to')
+    if not old_name or not new_name:
+        return jsonify({"error": "from and to snapshot names are required"}), 400
+    try:
+        return jsonify(allocations.diff(old_name, new_name)), 200
+    except KeyError as e:
+        return jsonify({"error": f"Snapshot not found: {e.args[0]}"}), 404
+
 # ----------------------- USER PROFILES -----------------------
 
 @app.route('/api/user-profile/<string:role>/<string:username>', methods=['GET'])
+@query_budget(15)
 def api_get_user_profile(role, username):
     """Get user profile data from G6 database based on role and username"""
     # For backward compatibility, check if username is actually a numeric ID
@@ -1821,9 +2937,9 @@ def api_get_user_profile(role, username):
             try:
                 cursor.execute("""
                     SELECT * FROM notifications
-                    WHERE Student_ID = %s
+                    WHERE Student_ID = %s AND Sent_At >= %s
                     ORDER BY Sent_At DESC
-                """, (user_data['Student_ID'],))
+                """, (user_data['Student_ID'], notification_window_start()))
                 notifications = cursor.fetchall()
                 user_data['notifications'] = notifications
             except Exception as e:
@@ -1837,13 +2953,11 @@ def api_get_user_profile(role, username):
                     cursor_cims = conn_cims.cursor(dictionary=True)
                     cursor_cims.execute("""
                         SELECT * FROM G6_notifications
-                        WHERE Student_ID = %s
+                        WHERE Student_ID = %s AND Sent_At >= %s
                         ORDER BY Sent_At DESC
-                    """, (user_data['Student_ID'],))
+                    """, (user_data['Student_ID'], notification_window_start()))
                     notifications = cursor_cims.fetchall()
                     user_data['notifications'] = notifications
-                    cursor_cims.close()
-                    conn_cims.close()
                 except Exception as e:
                     logging.warning(f"Could not get notifications from CIMS database: {str(e)}")
 
@@ -1910,21 +3024,714 @@ def api_get_user_profile(role, username):
             conn_cims.close()
 
 @app.route('/api/student/<int:student_id>', methods=['GET'])
+@conditional_get(lambda student_id: with_notification_window([f"student:{student_id}", f"notifications:{student_id}", 'students'], str(student_id)))
 def api_get_student_details(student_id):
     """Legacy endpoint for backward compatibility"""
     return api_get_user_profile('student', str(student_id))
 
-# ----------------------- APPLICATION STARTUP -----------------------
+# ----------------------- PAGE BOOTSTRAP -----------------------
+
+# Tables the frontend pages read, in foreign key order
+PROJECT_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS students (
+        Student_ID INT AUTO_INCREMENT PRIMARY KEY,
+        Name VARCHAR(100) NOT NULL,
+        Email VARCHAR(100) UNIQUE NOT NULL,
+        Contact_Number VARCHAR(20),
+        Age INT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS technicians (
+        Technician_ID INT AUTO_INCREMENT PRIMARY KEY,
+        Name VARCHAR(100) NOT NULL,
+        Email VARCHAR(100) UNIQUE NOT NULL,
+        Contact_Number VARCHAR(20),
+        Specialization VARCHAR(100)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS administrators (
+        Admin_ID INT AUTO_INCREMENT PRIMARY KEY,
+        Name VARCHAR(100) NOT NULL,
+        Email VARCHAR(100) UNIQUE NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS maintenance_requests (
+        Request_ID INT AUTO_INCREMENT PRIMARY KEY,
+        Student_ID INT NOT NULL,
+        Issue_Description TEXT NOT NULL,
+        Location VARCHAR(100) NOT NULL,
+        Priority ENUM('Low', 'Medium', 'High') DEFAULT 'Medium',
+        Submission_Date DATETIME DEFAULT CURRENT_TIMESTAMP,
+        Status ENUM('submitted', 'in_progress', 'completed', 'rejected') DEFAULT 'submitted',
+        FOREIGN KEY (Student_ID) REFERENCES students(Student_ID) ON DELETE CASCADE
+    )
+    """,
+]
+_project_tables_ready = False
+
+def ensure_project_tables():
+    """Create any missing page tables; checked once per process instead of on every request"""
+    global _project_tables_ready
+    if _project_tables_ready:
+        return
+
+    # DDL commits implicitly, so it runs on its own connection
+    conn = get_db_connection(use_cism=False)
+    cursor = conn.cursor()
+    try:
+        for ddl in PROJECT_TABLES:
+            cursor.execute(ddl)
+        conn.commit()
+        _project_tables_ready = True
+    finally:
+        cursor.close()
+        conn.close()
+
+def ensure_role_record(cursor, claims):
+    """Return the G6 record for the session user, creating a default one if it is missing"""
+    role, username, user_id = claims['role'], claims['user'], claims.get('session_id')
+    email = f"{username}@example.com"
+
+    if role == 'student':
+        cursor.execute("SELECT * FROM students WHERE Student_ID = %s", (user_id,))
+        record = cursor.fetchone()
+        if record:
+            return record
+
+        # Email is unique; fall back to the ID-based default when the username's is taken
+        cursor.execute("SELECT Student_ID FROM students WHERE Email = %s", (email,))
+        if cursor.fetchone():
+            email = f"student_{user_id}@example.com"
+        cursor.execute("""
+            INSERT INTO students
+            (Student_ID, Name, Email, Contact_Number, Age)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (user_id, username, email, "N/A", 20))
+        bump_change_versions(cursor, 'students', f"student:{user_id}")
+        logging.info(f"Created student record for {username} (ID {user_id})")
+        cursor.execute("SELECT * FROM students WHERE Student_ID = %s", (user_id,))
+        return cursor.fetchone()
+
+    if role == 'technician':
+        cursor.execute("SELECT * FROM technicians WHERE Name = %s OR Email = %s", (username, username))
+        record = cursor.fetchone()
+        if not record:
+            cursor.execute("""
+                INSERT INTO technicians
+                (Name, Email, Contact_Number, Specialization)
+                VALUES (%s, %s, %s, %s)
+            """, (username, email, "N/A", "General"))
+            logging.info(f"Created technician record for {username}")
+            cursor.execute("SELECT * FROM technicians WHERE Technician_ID = %s", (cursor.lastrowid,))
+            record = cursor.fetchone()
+        return record
+
+    if role == 'admin':
+        cursor.execute("SELECT * FROM administrators WHERE Name = %s OR Email = %s", (username, username))
+        record = cursor.fetchone()
+        if not record:
+            cursor.execute("""
+                INSERT INTO administrators
+                (Name, Email)
+                VALUES (%s, %s)
+            """, (username, email))
+            logging.info(f"Created administrator record for {username}")
+            cursor.execute("SELECT * FROM administrators WHERE Admin_ID = %s", (cursor.lastrowid,))
+            record = cursor.fetchone()
+        return record
+
+    return None
+
+PAGES = ['maintenance-requests', 'profile']
+
+def page_scopes(page):
+    role, user_id = request.user['role'], request.user.get('session_id')
+    # The payload echoes the session, so the variant is per user
+    variant = f"{page}:{request.user['user']}:{role}"
+    if page == 'maintenance-requests':
+        if role in ['admin', 'technician']:
+            return ['maintenance_requests', 'students'], variant
+        return [f"student:{user_id}", 'students'], variant
+    if page == 'profile' and role == 'student':
+        return with_notification_window([f"student:{user_id}", f"notifications:{user_id}", 'students'], variant)
+    # Technician and admin profiles read tables without change versions
+    return None
+
+@app.route('/api/pages/<string:page>', methods=['GET'])
+@query_budget(12)
+@role_required(['admin', 'student', 'technician'])
+@conditional_get(page_scopes)
+def api_page_bootstrap(page):
+    """Everything a frontend page needs in one round trip: session, role record and page data"""
+    if page not in PAGES:
+        return jsonify({"error": "Unknown page"}), 404
+
+    claims = request.user
+    role = claims['role']
+    try:
+        ensure_project_tables()
+
+        conn = get_db_connection(use_cism=False)
+        cursor = conn.cursor(dictionary=True)
+        record = ensure_role_record(cursor, claims)
+        conn.commit()
+
+        page_data = {
+            "session": {
+                "user_id": claims.get('session_id'),
+                "username": claims['user'],
+                "role": role
+            },
+            "record": record
+        }
+
+        if page == 'maintenance-requests':
+            page_data['requests'] = fetch_maintenance_requests(cursor, role, claims.get('session_id'))
+        elif page == 'profile':
+            # Students are looked up by ID, which is how their record was created
+            identifier = str(claims['session_id']) if role == 'student' else claims['user']
+            profile_response, status_code = api_get_user_profile(role, identifier)
+            if status_code != 200:
+                return profile_response, status_code
+            page_data['profile'] = profile_response.get_json()
+
+        return jsonify(page_data), 200
+
+    except Exception as e:
+        logging.error(f"Error loading {page} page data: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+# ----------------------- DATA RETENTION -----------------------
+
+app.config.setdefault('NOTIFICATION_RETENTION_DAYS', 180)
+# 'archive' keeps expired notifications in notifications_archive, 'delete' drops them
+app.config.setdefault('NOTIFICATION_RETENTION_MODE', 'archive')
+app.config.setdefault('LOG_RETENTION_DAYS', 90)
+
+RETENTION_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS notifications_archive (
+        Notification_ID INT NOT NULL,
+        Student_ID INT NOT NULL,
+        Message TEXT NOT NULL,
+        Sent_At DATETIME,
+        Archived_At DATETIME DEFAULT CURRENT_TIMESTAMP,
+        INDEX (Student_ID, Notification_ID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS maintenance_log_rollups (
+        Request_ID INT PRIMARY KEY,
+        Entries INT NOT NULL,
+        First_Update DATETIME,
+        Last_Update DATETIME,
+        History MEDIUMTEXT NOT NULL,
+        Rolled_Up_At DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # Expired partitions whose unread notifications were already taken off the counters
+    """
+    CREATE TABLE IF NOT EXISTS counted_partitions (
+        Table_Name VARCHAR(100) NOT NULL,
+        Partition_Name VARCHAR(20) NOT NULL,
+        Counted_At DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (Table_Name, Partition_Name)
+    )
+    """,
+]
+_retention_tables_ready = False
+
+def ensure_retention_tables():
+    """Create the archive and rollup tables once per process"""
+    global _retention_tables_ready
+    if _retention_tables_ready:
+        return
+
+    # DDL commits implicitly, so it runs on its own connection
+    conn = get_db_connection(use_cism=False)
+    cursor = conn.cursor()
+    try:
+        for ddl in RETENTION_TABLES:
+            cursor.execute(ddl)
+        conn.commit()
+        _retention_tables_ready = True
+    finally:
+        cursor.close()
+        conn.close()
+
+@maintenance.job('notifications')
+def expire_notifications(cursor, batch_size):
+    """Archive or delete one batch of notifications older than NOTIFICATION_RETENTION_DAYS"""
+    if app.config['NOTIFICATION_PARTITIONING']:
+        # Expired months are dropped whole by the notification_partitions job
+        return 0
+    ensure_retention_tables()
+    ensure_notification_tables()
+    cursor.execute("""
+        SELECT Notification_ID, Student_ID, Message, Sent_At
+        FROM cs432cims.G6_notifications
+        WHERE Sent_At < NOW() - INTERVAL %s DAY
+        ORDER BY Sent_At
+        LIMIT %s
+        FOR UPDATE
+    """, (app.config['NOTIFICATION_RETENTION_DAYS'], batch_size))
+    rows = cursor.fetchall()
+    if not rows:
+        return 0
+
+    if app.config['NOTIFICATION_RETENTION_MODE'] == 'archive':
+        cursor.executemany("""
+            INSERT INTO notifications_archive
+            (Notification_ID, Student_ID, Message, Sent_At)
+            VALUES (%s, %s, %s, %s)
+        """, rows)
+
+    # Once partitioned, G6_notifications' key is (Notification_ID, Sent_At), so
+    # Notification_ID alone is not enforced unique; the student narrows the match
+    keys = [value for row in rows for value in row[:2]]
+    placeholders = ', '.join(['(%s, %s)'] * len(rows))
+    cursor.execute(f"""
+        DELETE FROM cs432cims.G6_notifications
+        WHERE (Notification_ID, Student_ID) IN ({placeholders})
+    """, tuple(keys))
+    reclaimed = cursor.rowcount
+
+    # Expired notifications the student never read no longer count as unread
+    student_ids = sorted({row[1] for row in rows})
+    placeholders = ', '.join(['%s'] * len(student_ids))
+    cursor.execute(f"""
+        SELECT Student_ID, Last_Read_ID FROM {project_table('notification_state')}
+        WHERE Student_ID IN ({placeholders})
+        FOR UPDATE
+    """, tuple(student_ids))
+    for student_id, last_read_id in cursor.fetchall():
+        expired_unread = sum(1 for row in rows if row[1] == student_id and row[0] > last_read_id)
+        if expired_unread:
+            cursor.execute(f"""
+                UPDATE {project_table('notification_state')}
+                SET Unread = GREATEST(Unread - %s, 0)
+                WHERE Student_ID = %s
+            """, (expired_unread, student_id))
+    bump_change_versions(cursor, *[f"notifications:{student_id}" for student_id in student_ids])
+    return reclaimed
+
+app.config.setdefault('NOTIFICATION_KEY_DAYS', 30)
+
+@maintenance.job('notification_keys')
+def expire_notification_keys(cursor, batch_size):
+    """Delete one batch of idempotency keys older than NOTIFICATION_KEY_DAYS and of finished coalescing windows"""
+    ensure_notification_tables()
+    cursor.execute(f"""
+        DELETE FROM {project_table('notification_keys')}
+        WHERE Created_At < NOW() - INTERVAL %s DAY
+        ORDER BY Created_At
+        LIMIT %s
+    """, (app.config['NOTIFICATION_KEY_DAYS'], batch_size))
+    reclaimed = cursor.rowcount
+    cursor.execute(f"""
+        DELETE FROM {project_table('notification_threads')}
+        WHERE Updated_At < NOW() - INTERVAL %s SECOND
+        LIMIT %s
+    """, (app.config['NOTIFICATION_COALESCE_WINDOW'], batch_size))
+    return reclaimed + cursor.rowcount
+
+@maintenance.job('maintenance_logs')
+def roll_up_maintenance_logs(cursor, batch_size):
+    """
+    Fold the logs of up to batch_size closed requests, idle for LOG_RETENTION_DAYS,
+    into one maintenance_log_rollups row per request and delete the originals
+    """
+    ensure_retention_tables()
+    cursor.execute("""
+        SELECT ml.Request_ID
+        FROM maintenance_logs ml
+        JOIN maintenance_requests r ON r.Request_ID = ml.Request_ID
+        WHERE r.Status IN ('completed', 'rejected')
+        GROUP BY ml.Request_ID
+        HAVING MAX(ml.Updated_At) < NOW() - INTERVAL %s DAY
+        ORDER BY ml.Request_ID
+        LIMIT %s
+    """, (app.config['LOG_RETENTION_DAYS'], batch_size))
+    request_ids = [row[0] for row in cursor.fetchall()]
+    if not request_ids:
+        return 0
+
+    placeholders = ', '.join(['%s'] * len(request_ids))
+    cursor.execute(f"""
+        SELECT Request_ID, History FROM maintenance_log_rollups
+        WHERE Request_ID IN ({placeholders})
+        FOR UPDATE
+    """, tuple(request_ids))
+    histories = {request_id: app.json.loads(history) for request_id, history in cursor.fetchall()}
+
+    cursor.execute(f"""
+        SELECT ml.Log_ID, ml.Request_ID, ml.Technician_ID, t.Name, ml.Status_Update, ml.Updated_At
+        FROM maintenance_logs ml
+        LEFT JOIN technicians t ON ml.Technician_ID = t.Technician_ID
+        WHERE ml.Request_ID IN ({placeholders})
+        ORDER BY ml.Request_ID, ml.Updated_At, ml.Log_ID
+    """, tuple(request_ids))
+    logs = cursor.fetchall()
+    for log_id, request_id, technician_id, technician_name, status_update, updated_at in logs:
+        # Same keys as the detail endpoint's log rows
+        histories.setdefault(request_id, []).append({
+            "Log_ID": log_id,
+            "Request_ID": request_id,
+            "Technician_ID": technician_id,
+            "TechnicianName": technician_name,
+            "Status_Update": status_update,
+            "Updated_At": updated_at
+        })
+
+    cursor.executemany("""
+        INSERT INTO maintenance_log_rollups
+        (Request_ID, Entries, First_Update, Last_Update, History, Rolled_Up_At)
+        VALUES (%s, %s, %s, %s, %s, NOW())
+        ON DUPLICATE KEY UPDATE
+            Entries = VALUES(Entries), First_Update = VALUES(First_Update),
+            Last_Update = VALUES(Last_Update), History = VALUES(History), Rolled_Up_At = NOW()
+    """, [
+        (request_id, len(history), history[0]['Updated_At'], history[-1]['Updated_At'], app.json.dumps(history))
+        for request_id, history in histories.items()
+    ])
+
+    # Deleted by ID so entries written since the SELECT stay for the next run
+    log_ids = [log[0] for log in logs]
+    cursor.execute(f"DELETE FROM maintenance_logs WHERE Log_ID IN ({', '.join(['%s'] * len(log_ids))})", tuple(log_ids))
+    return cursor.rowcount
+
+# Monthly partitions on Sent_At replace row-by-row notification retention when enabled
+app.config.setdefault('NOTIFICATION_PARTITIONING', False)
+app.config.setdefault('NOTIFICATION_PARTITIONS_AHEAD', 3)  # months
+
+# The project database's notifications table is left out: partitioned InnoDB
+# tables cannot have foreign keys, and its Student_ID key cascades deletes
+NOTIFICATION_PARTITIONS = [
+    MonthlyPartitions('cs432cims.G6_notifications', 'Sent_At'),
+]
+
+@maintenance.job('notification_partitions', commits=True)
+def manage_notification_partitions(conn, cursor, batch_size):
+    """
+    Partition the tables in NOTIFICATION_PARTITIONS by month on first run, then keep
+    NOTIFICATION_PARTITIONS_AHEAD months created ahead and drop months past
+    NOTIFICATION_RETENTION_DAYS. Returns the number of partitions changed.
+    """
+    if not app.config['NOTIFICATION_PARTITIONING']:
+        return 0
+    ensure_notification_tables()
+    ensure_retention_tables()
+    months_ahead = app.config['NOTIFICATION_PARTITIONS_AHEAD']
+    cutoff = notification_window_start().date()
+
+    changed = 0
+    for partitions in NOTIFICATION_PARTITIONS:
+        if not partitions.exists(cursor):
+            continue
+        try:
+            if partitions.partition_table(cursor, months_ahead):
+                logging.info(f"Partitioned {partitions.table} by month")
+                changed += 1
+        except ValueError as e:
+            # Schema changes to the shared database are left to its owners
+            logging.warning(f"Not partitioning {partitions.table}: {str(e)}")
+            continue
+        changed += partitions.add_future(cursor, months_ahead)
+
+        expired = partitions.expired(cursor, cutoff)
+        counted = partitions.table == 'cs432cims.G6_notifications'
+        if expired and counted:
+            # A run that stopped before its DROP has already counted these months
+            placeholders = ', '.join(['%s'] * len(expired))
+            cursor.execute(f"""
+                SELECT Partition_Name FROM counted_partitions
+                WHERE Table_Name = %s AND Partition_Name IN ({placeholders})
+            """, (partitions.table, *expired))
+            already_counted = {row[0] for row in cursor.fetchall()}
+            uncounted = [name for name in expired if name not in already_counted]
+            if uncounted:
+                # Unread notifications in the dropped months no longer count
+                cursor.execute(f"""
+                    SELECT n.Student_ID, SUM(n.Notification_ID > COALESCE(s.Last_Read_ID, n.Notification_ID))
+                    FROM cs432cims.G6_notifications PARTITION ({', '.join(uncounted)}) n
+                    LEFT JOIN {project_table('notification_state')} s ON s.Student_ID = n.Student_ID
+                    GROUP BY n.Student_ID
+                """)
+                counts = cursor.fetchall()
+                for student_id, expired_unread in counts:
+                    if expired_unread:
+                        cursor.execute(f"""
+                            UPDATE {project_table('notification_state')}
+                            SET Unread = GREATEST(Unread - %s, 0)
+                            WHERE Student_ID = %s
+                        """, (int(expired_unread), student_id))
+                bump_change_versions(cursor, *[f"notifications:{student_id}" for student_id, _ in counts])
+                cursor.executemany(
+                    "INSERT IGNORE INTO counted_partitions (Table_Name, Partition_Name) VALUES (%s, %s)",
+                    [(partitions.table, name) for name in uncounted]
+                )
+                # The counters and their markers commit together, before the DROP
+                conn.commit()
+        dropped = partitions.drop(cursor, expired)
+        if dropped:
+            logging.info(f"Dropped {dropped} expired partitions of {partitions.table}")
+            if counted:
+                placeholders = ', '.join(['%s'] * len(expired))
+                cursor.execute(f"""
+                    DELETE FROM counted_partitions
+                    WHERE Table_Name = %s AND Partition_Name IN ({placeholders})
+                """, (partitions.table, *expired))
+        changed += dropped
+    return changed
+
+app.config.setdefault('REQUEST_ARCHIVE_DAYS', 365)
+
+# Closed requests move to <table>_archive together with the rows that reference
+# them; children are listed before maintenance_requests so they move first
+ARCHIVED_TABLES = ['technician_assignments', 'work_orders', 'maintenance_logs', 'feedback', 'maintenance_requests']
+_archive_tables_ready = False
+
+def ensure_archive_tables():
+    """Create an archive table with the same columns and indexes for each archived table, once per process"""
+    global _archive_tables_ready
+    if _archive_tables_ready:
+        return
+
+    # DDL commits implicitly, so it runs on its own connection
+    conn = get_db_connection(use_cism=False)
+    cursor = conn.cursor()
+    try:
+        for table in ARCHIVED_TABLES:
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {table}_archive LIKE {table}")
+        conn.commit()
+        _archive_tables_ready = True
+    finally:
+        cursor.close()
+        conn.close()
+
+def archive_horizon():
+    """Requests submitted before this date may be in the archive"""
+    return datetime.date.today() - datetime.timedelta(days=app.config['REQUEST_ARCHIVE_DAYS'])
+
+def range_reaches_archive(date_from, date_to):
+    # Unbounded listings stay on the live table; an explicit range opts in
+    if not date_from and not date_to:
+        return False
+    return date_from is None or date_from < archive_horizon()
+
+@maintenance.job('maintenance_requests')
+def archive_maintenance_requests(cursor, batch_size):
+    """
+    Move up to batch_size completed or rejected requests older than REQUEST_ARCHIVE_DAYS,
+    with their assignments, work orders, logs and feedback, to the archive tables
+    """
+    ensure_archive_tables()
+    cursor.execute("""
+        SELECT r.Request_ID, r.Student_ID
+        FROM maintenance_requests r
+        WHERE r.Status IN ('completed', 'rejected')
+        AND r.Submission_Date < %s
+        AND NOT EXISTS (
+            SELECT 1 FROM maintenance_logs ml
+            WHERE ml.Request_ID = r.Request_ID AND ml.Updated_At >= %s
+        )
+        ORDER BY r.Request_ID
+        LIMIT %s
+        FOR UPDATE
+    """, (archive_horizon(), archive_horizon(), batch_size))
+    rows = cursor.fetchall()
+    if not rows:
+        return 0
+
+    request_ids = tuple(row[0] for row in rows)
+    placeholders = ', '.join(['%s'] * len(request_ids))
+    moved = 0
+    for table in ARCHIVED_TABLES:
+        cursor.execute(f"INSERT INTO {table}_archive SELECT * FROM {table} WHERE Request_ID IN ({placeholders})", request_ids)
+        cursor.execute(f"DELETE FROM {table} WHERE Request_ID IN ({placeholders})", request_ids)
+        moved += cursor.rowcount
+
+    bump_change_versions(cursor, 'maintenance_requests', *[f"student:{row[1]}" for row in rows])
+    return moved
+
+@app.route('/api/admin/maintenance', methods=['GET'])
+@role_required(['admin'])
+def api_maintenance_status():
+    """Registered jobs, retention settings and the report of each job's last run"""
+    with maintenance.lock:
+        reports = dict(maintenance.reports)
+    return jsonify({
+        "jobs": list(maintenance.jobs),
+        "settings": {key: app.config[key] for key in [
+            'MAINTENANCE_INTERVAL', 'MAINTENANCE_BATCH_SIZE', 'MAINTENANCE_BATCH_PAUSE',
+            'NOTIFICATION_RETENTION_DAYS', 'NOTIFICATION_RETENTION_MODE', 'LOG_RETENTION_DAYS',
+            'NOTIFICATION_PARTITIONING', 'NOTIFICATION_PARTITIONS_AHEAD', 'NOTIFICATION_KEY_DAYS',
+            'NOTIFICATION_COALESCE_WINDOW', 'REQUEST_ARCHIVE_DAYS'
+        ]},
+        "reports": reports
+    }), 200
+
+@app.route('/api/admin/maintenance/run', methods=['POST'])
+@role_required(['admin'])
+def api_run_maintenance():
+    """Run maintenance jobs now; reports rows reclaimed and time per batch"""
+    data = request.get_json(silent=True) or {}
+    names = data.get('jobs') or None
+    unknown = [name for name in names or [] if name not in maintenance.jobs]
+    if unknown:
+        return jsonify({"error": f"Unknown jobs: {', '.join(unknown)}"}), 400
+    if not app.config['MAINTENANCE_ENABLED']:
+        return jsonify({"error": "Maintenance jobs are disabled; set MAINTENANCE_ENABLED to run them"}), 409
+
+    try:
+        reports = maintenance.run(names)
+    except Exception as e:
+        logging.error(f"Error running maintenance jobs: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    if reports is None:
+        return jsonify({"error": "A maintenance run is already in progress"}), 409
+    return jsonify({"reports": reports}), 200
+
+# ----------------------- HEALTH -----------------------
+
+# Filled by warm_up() before the process takes traffic
+_warmup = {"done": False, "seconds": None, "errors": [], "schema_version": None}
+
+def schema_version(cursor):
+    """Fingerprint of the columns of both databases, so workers on different schemas can be told apart"""
+    cursor.execute("""
+        SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, COLUMN_TYPE FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA IN (%s, %s)
+        ORDER BY TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION
+    """, (project_db_config['database'], cism_db_config['database']))
+    return hashlib.sha1(repr(cursor.fetchall()).encode()).hexdigest()[:12]
+
+def warm_up():
+    """
+    Prepare this process for traffic: open the connection pools, create or
+    check the tables the routes expect, fingerprint the schema and find out
+    whether any users exist. Returns True when every step succeeded.
+    """
+    started = time.perf_counter()
+    errors = []
+    steps = [
+        ('connection pools', lambda: [get_db_connection(use_cism).close() for use_cism in (True, False)]),
+        ('change_versions', ensure_change_versions_table),
+        ('notification tables', ensure_notification_tables),
+        ('notification IDs', notification_ids_auto_increment),
+        ('broadcasts table', ensure_broadcasts_table),
+        ('project tables', ensure_project_tables),
+        ('retention tables', ensure_retention_tables),
+        ('archive tables', ensure_archive_tables),
+        ('users', any_users_exist),
+    ]
+    for name, step in steps:
+        try:
+            step()
+        except Exception as e:
+            errors.append(f"{name}: {str(e)}")
 
-if __name__ == '__main__':
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT DATABASE()")
-        logging.info(f"Connected to database: {cursor.fetchone()[0]}")
+        _warmup['schema_version'] = schema_version(cursor)
         cursor.close()
         conn.close()
     except Exception as e:
-        logging.error(f"DB connection failed on startup: {e}")
+        errors.append(f"schema: {str(e)}")
+
+    _warmup.update(done=not errors, seconds=round(time.perf_counter() - started, 3), errors=errors)
+    if errors:
+        logging.error(f"Warm-up incomplete: {'; '.join(errors)}")
+    else:
+        logging.info(f"Warm-up done in {_warmup['seconds']} s, schema {_warmup['schema_version']}")
+    return not errors
+
+@app.route('/api/health/live', methods=['GET'])
+def api_health_live():
+    """Liveness: the process is up and serving requests; never touches the database"""
+    return jsonify({"status": "alive"}), 200
 
-    app.run(host='0.0.0.0', debug=True)
+@app.route('/api/health/ready', methods=['GET'])
+def api_health_ready():
+    """
+    Readiness: warm-up finished. Reports pool saturation, the schema
+    fingerprint and which per-process caches are filled, all from memory, so
+    probes never open connections.
+    """
+    pools = pool_status()
+    for pool in pools.values():
+        pool['saturation'] = round(pool['in_use'] / pool['size'], 2) if pool['size'] else None
+    ready = _warmup['done']
+    return jsonify({
+        "status": "ready" if ready else "warming_up",
+        "warm_up": {"seconds": _warmup['seconds'], "errors": _warmup['errors']},
+        "schema_version": _warmup['schema_version'],
+        "pools": pools,
+        "connections": {"open": instrumentation.connections_open, "waiting": instrumentation.connecting},
+        "caches": {
+            "change_versions": bool(_change_versions_ready),
+            "notification_tables": _notification_tables_ready,
+            "notification_ids": _notification_ids_auto is not None,
+            "project_tables": _project_tables_ready,
+            "retention_tables": _retention_tables_ready,
+            "archive_tables": _archive_tables_ready,
+            "users_exist": _users_exist
+        }
+    }), 200 if ready else 503
+
+# ----------------------- APPLICATION STARTUP -----------------------
+
+_app_created = False
+
+def create_app(config=None):
+    """
+    Configure this module's app for the process, start its background work
+    and return it. Settings come from CS432_-prefixed environment variables
+    (values parsed as JSON, e.g. CS432_PROJECT_DB='{"host": "..."}'), then
+    from config. There is one app per process, so a second call raises
+    rather than reconfiguring the app and databases under the first.
+    Multi-worker servers call this in each worker after forking, so
+    per-process state such as the connection pools, retention scheduler,
+    event subscribers and metric files belongs to that worker. The process
+    is warmed up before it is returned; with REQUIRE_DATABASE set, a failed
+    warm-up raises instead of serving errors.
+    """
+    global _app_created
+    if _app_created:
+        raise RuntimeError("create_app has already configured the backend in this process")
+    if _db_pools:
+        # Pools are keyed by database name and opened with the settings in force at the time
+        raise RuntimeError("Database connections were opened before create_app configured them")
+    _app_created = True
+
+    app.config.from_prefixed_env('CS432')
+    app.config.update(config or {})
+    project_db_config.update(app.config.get('PROJECT_DB') or {})
+    cism_db_config.update(app.config.get('CISM_DB') or {})
+
+    if not warm_up() and app.config.get('REQUIRE_DATABASE'):
+        raise RuntimeError(f"Warm-up failed: {'; '.join(_warmup['errors'])}")
+    # Only with MAINTENANCE_ENABLED and MAINTENANCE_AUTOSTART
+    maintenance.start()
+    try:
+        # Broadcasts left by a worker that was restarted mid-way
+        resume_broadcasts()
+    except Exception as e:
+        logging.error(f"Could not resume broadcasts: {str(e)}")
+    return app
+
+if __name__ == '__main__':
+    # The reloader restarts the whole process on every file change; opt in with FLASK_DEBUG=1
+    create_app().run(host='0.0.0.0', debug=os.environ.get('FLASK_DEBUG') == '1')
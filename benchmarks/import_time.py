@@ -0,0 +1,73 @@
+"""
+Import-time budget for the backend, the frontend and the trace waterfall CLI.
+
+Imports each one in a fresh interpreter under `python -X importtime`,
+takes the best of several runs, and prints the heaviest direct imports.
+Exits with status 1 when an import exceeds its budget or loads a module
+that should only be loaded on demand. tests/test_import_time.py runs the
+lazy-module check in the test suite, and the timing budgets as well with
+IMPORT_BUDGET_TIMING=1:
+
+    python benchmarks/import_time.py [runs]
+
+Budgets can be scaled for slower machines with IMPORT_BUDGET_SCALE=1.5.
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCALE = float(os.environ.get('IMPORT_BUDGET_SCALE', '1'))
+
+# (name, working directory, module, budget in ms, modules that must not be loaded)
+TARGETS = [
+    ('backend', ROOT, 'app', 400, ('psycopg2', 'bcrypt', 'requests', 'argparse')),
+    ('frontend', os.path.join(ROOT, 'frontend'), 'app', 350, ('psycopg2', 'bcrypt', 'mysql', 'argparse')),
+    ('waterfall', ROOT, 'TraceWaterfall', 60, ('flask', 'mysql', 'requests')),
+]
+
+def import_times(cwd, module):
+    """[(self_us, cumulative_us, depth, name)] in import order"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+def measure(cwd, module, runs):
+    best = None
+    for _ in range(runs):
+        rows = import_times(cwd, module)
+        total = next(row[1] for row in rows if row[3] == module and row[2] == 0)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    return best
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    failed = False
+    for name, cwd, module, budget_ms, lazy in TARGETS:
+        total_us, rows = measure(cwd, module, runs)
+        total_ms, budget_ms = total_us / 1000, budget_ms * SCALE
+        loaded = {row[3].split('.')[0] for row in rows}
+        eager = sorted(set(lazy) & loaded)
+        ok = total_ms <= budget_ms and not eager
+        failed = failed or not ok
+
+        print(f"{name:<12} {total_ms:8.1f} ms  budget {budget_ms:6.0f} ms  {'ok' if ok else 'FAIL'}")
+        if eager:
+            print(f"  loaded at import but should be lazy: {', '.join(eager)}")
+        # The target's own imports are the depth-1 rows listed since the previous top-level import
+        end = next(i for i, row in enumerate(rows) if row[3] == module and row[2] == 0)
+        start = max((i for i, row in enumerate(rows[:end]) if row[2] == 0), default=-1) + 1
+        direct = sorted((row for row in rows[start:end] if row[2] == 1), key=lambda row: row[1], reverse=True)
+        for self_us, cumulative_us, _, imported in direct[:8]:
+            print(f"  {cumulative_us / 1000:8.1f} ms  {imported}")
+    sys.exit(1 if failed else 0)
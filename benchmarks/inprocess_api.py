@@ -0,0 +1,76 @@
+"""
+Benchmark: frontend-to-backend calls over loopback HTTP against in-process
+dispatch (Config.API_MODE = 'inprocess').
+
+Measures the /api/status frontend page (two backend calls) and a backend
+call returning maintenance_requests rows. No database is needed; the rows
+come from a route registered on the backend only for this benchmark.
+
+Run from the project root:
+    python benchmarks/inprocess_api.py [rows] [repeats]
+"""
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'frontend'))
+sys.path.insert(1, os.path.join(ROOT, 'benchmarks'))
+
+from werkzeug.serving import make_server
+import app as frontend
+from InProcess import load_backend_app
+from json_provider import make_rows
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def use_mode(mode, base_url):
+    frontend.Config.API_MODE = mode
+    frontend.Config.API_BASE_URL = base_url
+    frontend._api_session = None
+
+def measure(label, func, repeats):
+    # Warm up once so connection setup and first-call overhead are not measured
+    func()
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<36} median {statistics.median(samples):8.2f} ms   p90 {sorted(samples)[int(repeats * 0.9) - 1]:8.2f} ms")
+    return statistics.median(samples)
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    backend = load_backend_app()
+    rows = make_rows(count)
+    backend.add_url_rule('/bench/requests', 'bench_requests', lambda: (backend.json.response(rows), 200))
+
+    port = free_port()
+    server = make_server('127.0.0.1', port, backend, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = frontend.app.test_client()
+    page = lambda: client.get('/api/status')
+    rows_call = lambda: frontend.api_request('get', '/bench/requests')
+
+    print(f"{repeats} iterations, {count}-row payload")
+    results = {}
+    for mode in ['http', 'inprocess']:
+        use_mode(mode, f"http://127.0.0.1:{port}")
+        results[mode] = (
+            measure(f"{mode}: /api/status page", page, repeats),
+            measure(f"{mode}: {count} rows call", rows_call, repeats),
+        )
+
+    server.shutdown()
+    print(f"speed-up: page {results['http'][0] / results['inprocess'][0]:.1f}x, "
+          f"rows call {results['http'][1] / results['inprocess'][1]:.1f}x")
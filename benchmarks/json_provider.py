@@ -0,0 +1,66 @@
+"""
+Micro-benchmark: Flask's default JSON provider against FastJSONProvider on a
+10k-row maintenance_requests payload shaped like the dictionary-cursor rows
+returned by /api/maintenance/requests.
+
+Run from the project root:
+    python benchmarks/json_provider.py [rows] [repeats]
+"""
+import datetime
+import decimal
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+import JsonProvider
+from JsonProvider import FastJSONProvider
+
+def make_rows(count):
+    start = datetime.datetime(2025, 1, 1, 9, 30)
+    priorities = ['Low', 'Medium', 'High']
+    statuses = ['submitted', 'in_progress', 'completed', 'rejected']
+    return [{
+        'Request_ID': i,
+        'Student_ID': 221100000 + i % 500,
+        'Issue_Description': f"Leaking tap in washroom near room {i % 300}",
+        'Location': f"Hostel {chr(65 + i % 8)}, Room {i % 300}",
+        'Priority': priorities[i % 3],
+        'Submission_Date': start + datetime.timedelta(minutes=i),
+        'Status': statuses[i % 4],
+        'StudentName': f"Student {i % 500}",
+        'Cost': decimal.Decimal('150.50'),
+    } for i in range(count)]
+
+def bench(label, provider, rows, repeats):
+    app = Flask(__name__)
+    app.json = provider(app)
+    with app.app_context():
+        # Warm up once so first-call overhead is not measured
+        app.json.response(rows)
+        seconds = min(timeit.repeat(lambda: app.json.response(rows), number=1, repeat=repeats))
+        size = len(app.json.response(rows).get_data())
+    print(f"{label:<28} {seconds * 1000:9.2f} ms   {size / 1024:9.1f} KiB")
+    return seconds
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    rows = make_rows(count)
+
+    print(f"{count} maintenance_requests rows, best of {repeats}")
+    baseline = bench('DefaultJSONProvider', DefaultJSONProvider, rows, repeats)
+
+    orjson = JsonProvider.orjson
+    JsonProvider.orjson = None
+    bench('FastJSONProvider (stdlib)', FastJSONProvider, rows, repeats)
+    JsonProvider.orjson = orjson
+
+    if orjson is not None:
+        fast = bench('FastJSONProvider (orjson)', FastJSONProvider, rows, repeats)
+        print(f"speed-up: {baseline / fast:.1f}x")
+    else:
+        print("orjson is not installed; install it to measure the accelerated encoder")
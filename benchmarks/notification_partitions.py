@@ -0,0 +1,135 @@
+"""
+Benchmark: a notifications table with monthly partitions on Sent_At against
+the same table unpartitioned, at 10M rows by default.
+
+Loads both tables with rows spread over the last 24 months, then measures
+  - a student's notifications within the retention window (the query shape
+    of /api/notifications/<id> and the profile page),
+  - expiring the oldest month: batched DELETE against DROP PARTITION.
+EXPLAIN's partitions column is printed to show which partitions are read.
+
+Needs a scratch MySQL database; the tables are dropped afterwards:
+    BENCH_DB_HOST=127.0.0.1 BENCH_DB_USER=root BENCH_DB_PASSWORD= BENCH_DB_NAME=cs432_bench \\
+    python benchmarks/notification_partitions.py [rows] [queries]
+"""
+import datetime
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+from Partitions import MonthlyPartitions, add_months, month_start
+
+DB_CONFIG = {
+    "host": os.environ.get('BENCH_DB_HOST', '127.0.0.1'),
+    "user": os.environ.get('BENCH_DB_USER', 'root'),
+    "password": os.environ.get('BENCH_DB_PASSWORD', ''),
+    "database": os.environ.get('BENCH_DB_NAME', 'cs432_bench'),
+}
+STUDENTS = 5000
+MONTHS = 24
+RETENTION_DAYS = 180
+LOAD_CHUNK = 10000
+DELETE_BATCH = 5000
+
+def create_table(cursor, name):
+    cursor.execute(f"DROP TABLE IF EXISTS {name}")
+    cursor.execute(f"""
+        CREATE TABLE {name} (
+            Notification_ID INT NOT NULL,
+            Student_ID INT NOT NULL,
+            Message TEXT NOT NULL,
+            Sent_At DATETIME NOT NULL,
+            PRIMARY KEY (Notification_ID),
+            INDEX (Student_ID, Sent_At)
+        )
+    """)
+
+def load(conn, cursor, tables, count):
+    start = datetime.datetime.combine(add_months(month_start(datetime.date.today()), -MONTHS + 1), datetime.time())
+    span = (datetime.datetime.now() - start).total_seconds()
+    rng = random.Random(432)
+    for offset in range(0, count, LOAD_CHUNK):
+        rows = [(
+            i + 1,
+            rng.randrange(STUDENTS),
+            f"Your maintenance request {i} has been updated.",
+            start + datetime.timedelta(seconds=span * i / count)
+        ) for i in range(offset, min(offset + LOAD_CHUNK, count))]
+        for table in tables:
+            cursor.executemany(f"INSERT INTO {table} VALUES (%s, %s, %s, %s)", rows)
+        conn.commit()
+        print(f"\rloaded {offset + len(rows):,} / {count:,}", end='', flush=True)
+    print()
+
+def recent_query(table, student_id):
+    window_start = datetime.datetime.now() - datetime.timedelta(days=RETENTION_DAYS)
+    sql = f"SELECT * FROM {table} WHERE Student_ID = %s AND Sent_At >= %s ORDER BY Sent_At DESC"
+    return sql, (student_id, window_start)
+
+def measure_queries(cursor, table, queries):
+    samples = []
+    for student_id in random.Random(6).sample(range(STUDENTS), queries):
+        sql, params = recent_query(table, student_id)
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), sorted(samples)[int(queries * 0.9) - 1]
+
+def explain_partitions(cursor, table):
+    sql, params = recent_query(table, 1)
+    cursor.execute(f"EXPLAIN {sql}", params)
+    columns = [column[0] for column in cursor.description]
+    return dict(zip(columns, cursor.fetchone())).get('partitions')
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    flat, partitioned = 'bench_notifications_flat', 'bench_notifications_partitioned'
+    try:
+        for table in [flat, partitioned]:
+            create_table(cursor, table)
+        manager = MonthlyPartitions(f"{DB_CONFIG['database']}.{partitioned}", 'Sent_At')
+        load(conn, cursor, [flat, partitioned], count)
+
+        started = time.perf_counter()
+        # The scratch table is ours, so its key can take Sent_At
+        manager.extend_primary_key(cursor)
+        manager.partition_table(cursor, months_ahead=3)
+        print(f"partitioning {count:,} rows (one-off): {time.perf_counter() - started:.1f} s")
+        for table in [flat, partitioned]:
+            cursor.execute(f"ANALYZE TABLE {table}")
+            cursor.fetchall()
+
+        print(f"\n{queries} student queries bounded to the last {RETENTION_DAYS} days")
+        for table in [flat, partitioned]:
+            median, p90 = measure_queries(cursor, table, queries)
+            print(f"{table:<34} median {median:8.2f} ms   p90 {p90:8.2f} ms   partitions read: {explain_partitions(cursor, table)}")
+
+        oldest = manager.months(cursor)[0]
+        month_end = datetime.datetime.combine(add_months(oldest, 1), datetime.time())
+        print(f"\nexpiring {oldest:%Y-%m}")
+        started, deleted = time.perf_counter(), 0
+        while True:
+            cursor.execute(f"DELETE FROM {flat} WHERE Sent_At < %s LIMIT {DELETE_BATCH}", (month_end,))
+            conn.commit()
+            deleted += cursor.rowcount
+            if cursor.rowcount < DELETE_BATCH:
+                break
+        print(f"{flat:<34} batched DELETE of {deleted:,} rows: {time.perf_counter() - started:8.2f} s")
+        started = time.perf_counter()
+        manager.drop(cursor, [f"p{oldest:%Y%m}"])
+        print(f"{partitioned:<34} DROP PARTITION:{'':>18} {time.perf_counter() - started:8.2f} s")
+    finally:
+        for table in [flat, partitioned]:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.close()
+        conn.close()
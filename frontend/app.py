@@ -3,16 +3,77 @@
 # It connects to the backend API for all data operations
 
 from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, make_response
+import os
+import re
+import sys
+import time
 import requests
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from functools import wraps
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Modules shared with the backend live in the project root; appended so this
+# directory's own modules keep precedence
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Compression import Compression
+from InProcess import InProcessAdapter, load_backend_app
+from JsonProvider import FastJSONProvider
+from Metrics import Metrics
+from Tracing import Tracer
 
 app = Flask(__name__)
 app.secret_key = 'CS432_secret_key'  # Change this to a random secret key in production
+app.json = FastJSONProvider(app)
+
+# Negotiated gzip/br/zstd compression for rendered pages and JSON
+compression = Compression(app)
+
+# Prometheus metrics at /metrics; request rate and latency by route and status are built in
+metrics = Metrics(app, prefix='cs432_frontend')
+BACKEND_CALLS = metrics.counter('backend_calls_total', 'Calls to the backend API', ['method', 'endpoint', 'status'])
+BACKEND_CALL_LATENCY = metrics.histogram('backend_call_duration_seconds', 'Backend API call latency', ['method', 'endpoint'])
+CACHE_LOOKUPS = metrics.counter('cache_lookups_total', 'Frontend cache lookups by cache and outcome', ['cache', 'result'])
+
+# Starts a trace per page when tracing is on; backend calls carry it in a traceparent header
+tracer = Tracer(app, service='frontend')
 
 # Configuration
 class Config:
     # API base URL - change this to your actual backend API URL
     API_BASE_URL = 'http://localhost:5000'  # Default local development URL
+    # 'http' calls a separately running backend; 'inprocess' loads the backend
+    # into this process and serves API_BASE_URL without touching the network
+    API_MODE = os.environ.get('API_MODE', 'http')
+    # Number of GET responses kept for revalidation with ETag / Last-Modified
+    VALIDATOR_CACHE_SIZE = 256
+    # Number of logged-in tokens whose identity is kept server-side
+    IDENTITY_CACHE_SIZE = 1024
+    # Keep-alive connection pool shared by all calls to the backend API
+    API_POOL_SIZE = 20
+    API_CONNECT_TIMEOUT = 3.05  # seconds
+    API_READ_TIMEOUT = 15  # seconds
+    # Retries apply to connection failures and, for idempotent methods, to
+    # read failures and 502/503/504 responses
+    API_MAX_RETRIES = 2
+    API_RETRY_BACKOFF = 0.2  # seconds, doubled on every retry
+    # Independent backend calls of one page run in parallel within one deadline
+    API_FANOUT_WORKERS = 8
+    API_FANOUT_DEADLINE = 10  # seconds
+    # Keep-alive connections to the backend opened by warm-up before taking traffic
+    API_WARM_CONNECTIONS = 4
+    # Notifications shown per page, and how long the navbar's unread count is reused
+    NOTIFICATIONS_PAGE_SIZE = 20
+    UNREAD_COUNT_TTL = 30  # seconds
+    # The backend sends a heartbeat every 15 seconds on event streams
+    EVENTS_READ_TIMEOUT = 45  # seconds
+    # Each relayed stream holds a server thread; beyond this many (0 for no limit)
+    # a browser is asked to reconnect after EVENTS_BUSY_RETRY seconds instead
+    EVENTS_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', 0))
+    EVENTS_BUSY_RETRY = 30  # seconds
 
 
 @app.route('/')
@@ -49,8 +110,228 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Validators and payloads of GET responses, keyed by token, endpoint and query
+# parameters, so an unchanged payload costs the backend a 304 instead of a query
+_validator_cache = OrderedDict()
+_validator_cache_lock = threading.Lock()
+
+def get_cached_validators(cache_key):
+    with _validator_cache_lock:
+        cached = _validator_cache.get(cache_key)
+        if cached:
+            _validator_cache.move_to_end(cache_key)
+        return cached
+
+def store_validators(cache_key, response, payload):
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if not etag and not last_modified:
+        return
+    with _validator_cache_lock:
+        _validator_cache[cache_key] = (etag, last_modified, payload)
+        _validator_cache.move_to_end(cache_key)
+        while len(_validator_cache) > Config.VALIDATOR_CACHE_SIZE:
+            _validator_cache.popitem(last=False)
+
+# Identity (user ID, username, role) of each logged-in token. It is filled at
+# login, kept until the token expires and dropped when the backend answers 401
+_identity_cache = OrderedDict()
+_identity_cache_lock = threading.Lock()
+
+def remember_identity(token, identity, expires_at):
+    with _identity_cache_lock:
+        _identity_cache[token] = (identity, expires_at)
+        _identity_cache.move_to_end(token)
+        while len(_identity_cache) > Config.IDENTITY_CACHE_SIZE:
+            _identity_cache.popitem(last=False)
+
+def forget_identity(token):
+    with _identity_cache_lock:
+        _identity_cache.pop(token, None)
+
+def cached_identity(token):
+    with _identity_cache_lock:
+        cached = _identity_cache.get(token)
+        if cached and cached[1] > time.time():
+            _identity_cache.move_to_end(token)
+            CACHE_LOOKUPS.labels('identity', 'hit').inc()
+            return cached[0]
+    CACHE_LOOKUPS.labels('identity', 'miss').inc()
+    return None
+
+def identity_from_status(token, data, status_code):
+    """Cache the identity in an /api/auth/status answer"""
+    if status_code != 200 or not data.get('session_id'):
+        return None
+    identity = {
+        'user_id': data['session_id'],
+        'username': data['username'],
+        'role': data['role']
+    }
+    remember_identity(token, identity, data['expiry'])
+    return identity
+
+def resolve_identity(token):
+    """Ask the backend who a token belongs to and cache the answer"""
+    _, data, status_code = api_request('get', '/api/auth/status', token=token)
+    return identity_from_status(token, data, status_code)
+
+def get_identity():
+    """Identity of the current session's token; only a cache miss reaches the backend"""
+    token = get_session_token()
+    if not token:
+        return None
+
+    identity = cached_identity(token) or resolve_identity(token)
+    if identity:
+        session['user_id'] = identity['user_id']
+    return identity
+
+# Unread notification count per user for the navbar. Live changes reach the
+# open page over the event stream, so a short-lived copy is enough here
+_unread_counts = {}
+_unread_counts_lock = threading.Lock()
+
+def get_unread_count():
+    token = get_session_token()
+    identity = cached_identity(token) if token else None
+    if not identity:
+        return None
+
+    user_id = identity['user_id']
+    with _unread_counts_lock:
+        cached = _unread_counts.get(user_id)
+    if cached and cached[1] > time.time():
+        CACHE_LOOKUPS.labels('unread_count', 'hit').inc()
+        return cached[0]
+
+    CACHE_LOOKUPS.labels('unread_count', 'miss').inc()
+    _, data, status_code = api_request('get', f"/api/notifications/{user_id}/unread-count", token=token)
+    if status_code != 200:
+        return None
+    with _unread_counts_lock:
+        _unread_counts[user_id] = (data['unread'], time.time() + Config.UNREAD_COUNT_TTL)
+    return data['unread']
+
+def forget_unread_count(user_id):
+    with _unread_counts_lock:
+        _unread_counts.pop(user_id, None)
+
+@app.context_processor
+def inject_unread_count():
+    if 'username' not in session:
+        return {}
+    return {'unread_notifications': get_unread_count()}
+
+# Shared HTTP session for backend calls
+_api_session = None
+_api_session_lock = threading.Lock()
+
+def create_api_session():
+    """Build a keep-alive session with a sized connection pool and bounded retries"""
+    api_session = requests.Session()
+    # The session is shared by every user, so it must never remember cookies
+    api_session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    retry = Retry(
+        total=Config.API_MAX_RETRIES,
+        backoff_factor=Config.API_RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.API_POOL_SIZE,
+                          max_retries=retry, pool_block=False)
+    api_session.mount('http://', adapter)
+    api_session.mount('https://', adapter)
+    if Config.API_MODE == 'inprocess':
+        # The longer prefix takes precedence over the HTTP adapter
+        api_session.mount(Config.API_BASE_URL, InProcessAdapter(load_backend_app()))
+    return api_session
+
+def get_api_session():
+    global _api_session
+    if _api_session is None:
+        with _api_session_lock:
+            if _api_session is None:
+                _api_session = create_api_session()
+    return _api_session
+
+# Worker threads for api_gather; api_request touches no request or session
+# state, so calls run without copying the Flask context (only the trace span)
+_api_executor = ThreadPoolExecutor(max_workers=Config.API_FANOUT_WORKERS, thread_name_prefix='api-fanout')
+
+def api_gather(*calls, deadline=None):
+    """
+    Run independent (method, endpoint, kwargs) backend calls in parallel and
+    return their api_request results in order. The calls share one deadline;
+    a call still running when it passes comes back as a 504 error.
+    """
+    deadline_at = time.monotonic() + (deadline or Config.API_FANOUT_DEADLINE)
+    futures = []
+    for method, endpoint, kwargs in calls:
+        remaining = max(deadline_at - time.monotonic(), 0.01)
+        kwargs = dict(kwargs, timeout=(min(Config.API_CONNECT_TIMEOUT, remaining), remaining))
+        futures.append(_api_executor.submit(tracer.wrap(api_request), method, endpoint, **kwargs))
+
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result(timeout=max(deadline_at - time.monotonic(), 0)))
+        except FutureTimeoutError:
+            future.cancel()
+            results.append((None, {'error': 'Connection error: deadline exceeded'}, 504))
+    return results
+
+# Latency of backend calls per endpoint template (IDs and usernames collapsed)
+API_LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+_api_call_stats = {}
+_api_call_stats_lock = threading.Lock()
+_ENDPOINT_PATTERNS = [
+    (re.compile(r'^/api/user-profile/[^/]+/[^/]+$'), '/api/user-profile/<role>/<username>'),
+    (re.compile(r'/\d+(?=/|$)'), '/<id>'),
+]
+
+def endpoint_template(endpoint):
+    path = endpoint.split('?', 1)[0]
+    for pattern, replacement in _ENDPOINT_PATTERNS:
+        path = pattern.sub(replacement, path)
+    return path
+
+def record_api_call(method, endpoint, status_code, seconds):
+    template = endpoint_template(endpoint)
+    BACKEND_CALLS.labels(method.upper(), template, str(status_code) if status_code else 'error').inc()
+    BACKEND_CALL_LATENCY.labels(method.upper(), template).observe(seconds)
+    key = f"{method.upper()} {template}"
+    elapsed_ms = seconds * 1000
+    with _api_call_stats_lock:
+        entry = _api_call_stats.setdefault(key, {
+            'count': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            'buckets': [0] * (len(API_LATENCY_BUCKETS_MS) + 1)
+        })
+        entry['count'] += 1
+        if status_code is None or status_code >= 500:
+            entry['errors'] += 1
+        entry['total_ms'] += elapsed_ms
+        entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+        bucket = next((i for i, bound in enumerate(API_LATENCY_BUCKETS_MS) if elapsed_ms <= bound),
+                      len(API_LATENCY_BUCKETS_MS))
+        entry['buckets'][bucket] += 1
+
+def api_call_stats():
+    with _api_call_stats_lock:
+        stats = {key: dict(entry, buckets=list(entry['buckets'])) for key, entry in _api_call_stats.items()}
+    for entry in stats.values():
+        entry['avg_ms'] = round(entry['total_ms'] / entry['count'], 3)
+    return stats
+
+def api_error_message(data, status_code, default='Unknown error'):
+    """Pick the error message out of a parsed backend error response"""
+    if isinstance(data, dict):
+        return data.get('error', data.get('message', default))
+    return f"Server error (Status code: {status_code})"
+
 # API request helper
-def api_request(method, endpoint, data=None, token=None):
+def api_request(method, endpoint, data=None, token=None, timeout=None):
     """Make an API request with proper error handling"""
     url = f"{Config.API_BASE_URL}{endpoint}"
     headers = {}
@@ -58,23 +339,56 @@ def api_request(method, endpoint, data=None, token=None):
     if token:
         headers['Authorization'] = f'Bearer {token}'
 
+    # Revalidate previously seen GET payloads instead of downloading them again
+    cache_key = None
+    cached = None
+    if method.lower() == 'get':
+        cache_key = (token, endpoint, tuple(sorted((data or {}).items())))
+        cached = get_cached_validators(cache_key)
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+    if method.lower() not in ['get', 'post', 'put', 'delete']:
+        return None, {'error': 'Invalid request method'}, 400
+
+    response = None
+    span = tracer.start_span(f"{method.upper()} {endpoint_template(endpoint)}", kind='client')
+    tracer.inject(headers)
+    started = time.perf_counter()
     try:
-        if method.lower() == 'get':
-            response = requests.get(url, headers=headers, params=data)
-        elif method.lower() == 'post':
-            response = requests.post(url, headers=headers, json=data)
-        elif method.lower() == 'put':
-            response = requests.put(url, headers=headers, json=data)
-        elif method.lower() == 'delete':
-            response = requests.delete(url, headers=headers)
-        else:
-            return None, {'error': 'Invalid request method'}, 400
+        response = get_api_session().request(
+            method.upper(),
+            url,
+            headers=headers,
+            params=data if method.lower() == 'get' else None,
+            json=data if method.lower() != 'get' else None,
+            timeout=timeout or (Config.API_CONNECT_TIMEOUT, Config.API_READ_TIMEOUT)
+        )
 
-        return response, response.json() if response.content else {}, response.status_code
+        if cached:
+            CACHE_LOOKUPS.labels('validators', 'hit' if response.status_code == 304 else 'miss').inc()
+        if response.status_code == 304 and cached:
+            return response, cached[2], 200
+        if response.status_code == 401 and token:
+            # Resolve the identity again on next use
+            forget_identity(token)
+
+        payload = app.json.loads(response.content) if response.content else {}
+        if cache_key and response.status_code == 200:
+            store_validators(cache_key, response, payload)
+        return response, payload, response.status_code
     except requests.exceptions.RequestException as e:
         return None, {'error': f'Connection error: {str(e)}'}, 500
     except ValueError as e:
         return response, {'error': 'Invalid response format'}, response.status_code
+    finally:
+        status_code = response.status_code if response is not None else None
+        record_api_call(method, endpoint, status_code, time.perf_counter() - started)
+        tracer.end_span(span, status=status_code)
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -85,54 +399,42 @@ def login():
         username = request.form['username']
         password = request.form['password']
 
-        try:
-            # Make a direct request to the backend for better cookie handling
-            response = requests.post(f"{Config.API_BASE_URL}/api/auth/login", json={
-                "user": username,
-                "password": password
-            }, allow_redirects=False)
-
-            if response.status_code == 200:
-                data = response.json()
-
-                # Store user information in session
-                session['username'] = data.get('username', username)
-                session['role'] = data.get('role', 'member')
-
-                # Store token in session for API calls
-                if 'session_token' in response.cookies:
-                    session['session_token'] = response.cookies.get('session_token')
-                elif 'session_token' in data:
-                    session['session_token'] = data['session_token']
-
-                # Store user ID if available
-                if 'session_id' in data:
-                    session['user_id'] = data['session_id']
-
-                # Get user details from the token
-                try:
-                    token = session.get('session_token')
-                    if token:
-                        # Decode the token to get user information
-                        import jwt
-                        decoded = jwt.decode(token, options={"verify_signature": False})
-                        if 'session_id' in decoded and 'session_id' not in session:
-                            session['user_id'] = decoded['session_id']
-                except Exception as e:
-                    print(f"Error decoding token: {str(e)}")
-
-                flash('Login successful!', 'success')
-                return redirect(url_for('dashboard'))
-            else:
-                try:
-                    error_data = response.json()
-                    error_msg = error_data.get('error', 'Invalid credentials')
-                except:
-                    error_msg = f"Server error (Status code: {response.status_code})"
-
-                flash(f'Login failed: {error_msg}', 'danger')
-        except requests.exceptions.RequestException as e:
-            flash(f'Error connecting to the server: {str(e)}', 'danger')
+        # The response object is kept for its cookies
+        response, data, status_code = api_request('post', '/api/auth/login', data={
+            "user": username,
+            "password": password
+        })
+
+        if status_code == 200:
+            # Store user information in session
+            session['username'] = data.get('username', username)
+            session['role'] = data.get('role', 'member')
+
+            # Store token in session for API calls
+            if 'session_token' in response.cookies:
+                session['session_token'] = response.cookies.get('session_token')
+            elif 'session_token' in data:
+                session['session_token'] = data['session_token']
+
+            # Resolve the identity once; routes read it from the cache afterwards
+            token = session.get('session_token')
+            if token and 'session_id' in data:
+                identity = {
+                    'user_id': data['session_id'],
+                    'username': session['username'],
+                    'role': session['role']
+                }
+                remember_identity(token, identity, time.time() + data.get('max_age', 3600))
+                session['user_id'] = data['session_id']
+            elif token:
+                get_identity()
+
+            flash('Login successful!', 'success')
+            return redirect(url_for('dashboard'))
+        elif response is None:
+            flash(f"Error connecting to the server: {data['error']}", 'danger')
+        else:
+            flash(f"Login failed: {api_error_message(data, status_code, 'Invalid credentials')}", 'danger')
 
     return render_template('login.html')
 
@@ -149,57 +451,35 @@ def register():
         dob = request.form['dob']
 
         # For registration, we need to use the admin endpoint
-        try:
-            # Get admin token if user is already logged in as admin
-            admin_token = None
-            if 'username' in session and session.get('role') == 'admin':
-                admin_token = get_session_token()
-
-            # Prepare headers with admin token if available
-            headers = {}
-            if admin_token:
-                headers['Authorization'] = f'Bearer {admin_token}'
-
-            # Call the add-user API - our backend will handle first user case
-            response = requests.post(
-                f"{Config.API_BASE_URL}/api/admin/add-user",
-                json={
-                    "username": username,
-                    "password": password,
-                    "role": "member",  # Backend will override this for first user
-                    "email": email,
-                    "DoB": dob,
-                    "session_id": ""
-                },
-                headers=headers
-            )
-
-            print(f"Registration response: {response.status_code}")
-            if response.status_code == 200:
-                try:
-                    # Check if the response indicates this was the first user
-                    data = response.json()
-                    if data.get('is_first_user', False):
-                        flash('Admin account created successfully! Please login.', 'success')
-                    else:
-                        flash('Registration successful! Please login.', 'success')
-                except:
-                    # If we can't parse the response, just show a generic success message
-                    flash('Registration successful! Please login.', 'success')
-                return redirect(url_for('login'))
+        # Get admin token if user is already logged in as admin
+        admin_token = None
+        if 'username' in session and session.get('role') == 'admin':
+            admin_token = get_session_token()
+
+        # Call the add-user API - our backend will handle first user case
+        response, data, status_code = api_request('post', '/api/admin/add-user', data={
+            "username": username,
+            "password": password,
+            "role": "member",  # Backend will override this for first user
+            "email": email,
+            "DoB": dob,
+            "session_id": ""
+        }, token=admin_token)
+
+        print(f"Registration response: {status_code}")
+        if status_code == 200:
+            # Check if the response indicates this was the first user
+            if isinstance(data, dict) and data.get('is_first_user', False):
+                flash('Admin account created successfully! Please login.', 'success')
             else:
-                try:
-                    error_data = response.json()
-                    error_msg = error_data.get('error', error_data.get('message', 'Unknown error'))
-                    print(f"Error data: {error_data}")
-                except Exception as e:
-                    print(f"Error parsing response: {str(e)}")
-                    error_msg = f"Server error (Status code: {response.status_code})"
-
-                flash(f'Registration failed: {error_msg}', 'danger')
-        except requests.exceptions.RequestException as e:
-            print(f"Request exception: {str(e)}")
-            flash(f'Error connecting to the server: {str(e)}', 'danger')
+                flash('Registration successful! Please login.', 'success')
+            return redirect(url_for('login'))
+        elif response is None:
+            print(f"Request exception: {data['error']}")
+            flash(f"Error connecting to the server: {data['error']}", 'danger')
+        else:
+            print(f"Error data: {data}")
+            flash(f'Registration failed: {api_error_message(data, status_code)}', 'danger')
 
     return render_template('register.html')
 
@@ -213,35 +493,35 @@ def dashboard():
     # Get user data if available
     user_data = {}
 
-    try:
-        # Try to get user profile data
-        if 'user_id' in session:
-            response = requests.get(
-                f"{Config.API_BASE_URL}/api/student/{session['user_id']}",
-                headers={'Authorization': f'Bearer {token}'} if token else {}
-            )
-
-            if response.status_code == 200:
-                user_data = response.json()
-            elif response.status_code == 401:
-                # Token might be expired, clear session
-                flash('Your session has expired. Please login again.', 'warning')
-                return redirect(url_for('logout'))
-
-        # If no user_id or failed to get data, try to get status
-        if not user_data and token:
-            status_response = requests.get(
-                f"{Config.API_BASE_URL}/api/auth/status",
-                headers={'Authorization': f'Bearer {token}'} if token else {}
-            )
-
-            if status_response.status_code == 200:
-                status_data = status_response.json()
-                if 'session_id' in status_data and 'session_id' not in session:
-                    session['user_id'] = status_data['session_id']
-    except requests.exceptions.RequestException:
-        # Silently fail - we'll just show the basic dashboard
-        pass
+    # Connection errors come back as a 500 and simply leave the basic dashboard
+    # Try to get user profile data
+    profile_data, status_code = {}, None
+    identity = cached_identity(token) if token else None
+    if not identity and token and 'user_id' in session:
+        # The ID stored at login lets the profile load alongside the identity check
+        (_, status_data, auth_status_code), (_, profile_data, status_code) = api_gather(
+            ('get', '/api/auth/status', {'token': token}),
+            ('get', f"/api/student/{session['user_id']}", {'token': token})
+        )
+        identity = identity_from_status(token, status_data, auth_status_code)
+        if auth_status_code == 401:
+            status_code = 401
+        elif identity and identity['user_id'] != session['user_id']:
+            # Fetched for the wrong user; load the right profile below
+            session['user_id'] = identity['user_id']
+            status_code = None
+    elif not identity:
+        identity = get_identity()
+
+    if identity and status_code is None:
+        _, profile_data, status_code = api_request('get', f"/api/student/{identity['user_id']}", token=token)
+
+    if status_code == 200:
+        user_data = profile_data
+    elif status_code == 401:
+        # Token might be expired, clear session
+        flash('Your session has expired. Please login again.', 'warning')
+        return redirect(url_for('logout'))
 
     return render_template('dashboard.html',
                            username=username,
@@ -252,155 +532,31 @@ def dashboard():
 @login_required
 def profile():
     token = get_session_token()
-    user_id = session.get('user_id')
-    user_role = session.get('role', 'student')  # Default to student if role not found
 
     if not token:
         flash('Your session has expired. Please login again.', 'warning')
         return redirect(url_for('logout'))
 
-    if not user_id:
-        # Try to get user ID from token
-        try:
-            import jwt
-            decoded = jwt.decode(token, options={"verify_signature": False})
-            if 'session_id' in decoded:
-                user_id = decoded['session_id']
-                session['user_id'] = user_id
-        except Exception as e:
-            print(f"Error decoding token: {str(e)}")
-
-        # If still no user_id, try to get it from auth status
-        if not user_id:
-            try:
-                status_response = requests.get(
-                    f"{Config.API_BASE_URL}/api/auth/status",
-                    headers={'Authorization': f'Bearer {token}'}
-                )
-
-                if status_response.status_code == 200:
-                    status_data = status_response.json()
-                    if 'session_id' in status_data:
-                        user_id = status_data['session_id']
-                        session['user_id'] = user_id
-            except requests.exceptions.RequestException as e:
-                print(f"Error getting auth status: {str(e)}")
-
-    if not user_id:
-        flash('User profile not found. Please try logging in again.', 'warning')
-        return redirect(url_for('dashboard'))
-
-    # First, check if the database tables are set up correctly
-    try:
-        print("Checking database tables")
-        db_check_response = requests.get(
-            f"{Config.API_BASE_URL}/api/db/check-tables"
-        )
-        print(f"Database check response: {db_check_response.status_code}")
-
-        # Get user profile data based on role and username
-        username = session.get('username', '')
-        print(f"Fetching profile for {user_role} with username: {username}")
-        response = requests.get(
-            f"{Config.API_BASE_URL}/api/user-profile/{user_role}/{username}",
-            headers={'Authorization': f'Bearer {token}'}
-        )
+    # The backend resolves the session, creates a missing role record and
+    # returns the profile in one call
+    response, page_data, status_code = api_request('get', '/api/pages/profile', token=token)
+
+    if status_code == 200:
+        session['user_id'] = page_data['session']['user_id']
+        profile_data = page_data['profile']
+        print(f"Profile data keys: {profile_data.keys() if profile_data else 'None'}")
+        return render_template('profile.html', profile=profile_data, username=session.get('username', ''))
+    elif response is None:
+        print(f"Request exception: {page_data['error']}")
+        flash(f"Error connecting to the server: {page_data['error']}", 'danger')
+    elif status_code == 401:
+        flash('Your session has expired. Please login again.', 'warning')
+        return redirect(url_for('logout'))
+    else:
+        print(f"Error data: {page_data}")
+        flash(f'Error loading profile: {api_error_message(page_data, status_code)}', 'danger')
 
-        if response.status_code == 200:
-            profile_data = response.json()
-            print(f"Profile data keys: {profile_data.keys() if profile_data else 'None'}")
-            return render_template('profile.html', profile=profile_data, username=session.get('username', ''))
-        elif response.status_code == 401:
-            flash('Your session has expired. Please login again.', 'warning')
-            return redirect(url_for('logout'))
-        elif response.status_code == 404:
-            # User doesn't exist, we need to create a record first based on role
-            print(f"{user_role.capitalize()} with ID {user_id} doesn't exist, creating record")
-
-            # Get user information from session
-            username = session.get('username', '')
-            email = session.get('email', f"{username}@example.com")
-
-            if user_role == 'student':
-                # Create a student record
-                user_response = requests.post(
-                    f"{Config.API_BASE_URL}/api/admin/add-student",
-                    json={
-                        "name": username,
-                        "email": email,
-                        "contact_number": "N/A",  # Default contact
-                        "age": 20  # Default age
-                    }
-                )
-                print(f"Student creation response: {user_response.status_code}")
-
-            elif user_role == 'technician':
-                # Create a technician record
-                # Try to get specialization from session or use default
-                specialization = session.get('specialization', 'General')
-                user_response = requests.post(
-                    f"{Config.API_BASE_URL}/api/admin/add-technician",
-                    json={
-                        "name": username,
-                        "email": email,
-                        "contact_number": "N/A",  # Default contact
-                        "specialization": specialization
-                    }
-                )
-                print(f"Technician creation response: {user_response.status_code}")
-
-            elif user_role == 'admin':
-                # Create an admin record
-                user_response = requests.post(
-                    f"{Config.API_BASE_URL}/api/admin/add-admin",
-                    json={
-                        "name": username,
-                        "email": email
-                    }
-                )
-                print(f"Admin creation response: {user_response.status_code}")
-
-            if user_response.status_code in [200, 201]:
-                print(f"{user_role.capitalize()} record created successfully")
-                # Now try to get the profile again
-                username = session.get('username', '')
-                response = requests.get(
-                    f"{Config.API_BASE_URL}/api/user-profile/{user_role}/{username}",
-                    headers={'Authorization': f'Bearer {token}'}
-                )
-
-                if response.status_code == 200:
-                    profile_data = response.json()
-                    print(f"Profile data keys: {profile_data.keys() if profile_data else 'None'}")
-                    return render_template('profile.html', profile=profile_data, username=session.get('username', ''))
-
-            # If we get here, something went wrong
-            try:
-                error_data = response.json()
-                error_msg = error_data.get('error', 'Unknown error')
-                print(f"Error data: {error_data}")
-            except Exception as e:
-                error_msg = f"Server error (Status code: {response.status_code})"
-                print(f"Error parsing response: {str(e)}")
-
-            flash(f'Error loading profile: {error_msg}', 'danger')
-            return redirect(url_for('dashboard'))
-        else:
-            # Handle other errors
-            try:
-                error_data = response.json()
-                error_msg = error_data.get('error', 'Unknown error')
-                print(f"Error data: {error_data}")
-            except Exception as e:
-                error_msg = f"Server error (Status code: {response.status_code})"
-                print(f"Error parsing response: {str(e)}")
-
-            flash(f'Error loading profile: {error_msg}', 'danger')
-            return redirect(url_for('dashboard'))
-    except requests.exceptions.RequestException as e:
-        print(f"Request exception: {str(e)}")
-        flash(f'Error connecting to the server: {str(e)}', 'danger')
-        return redirect(url_for('dashboard'))
+    return redirect(url_for('dashboard'))
 
 @app.route('/admin/users')
 @login_required
@@ -413,33 +569,21 @@ def admin_users():
         return redirect(url_for('logout'))
 
     # Get all users (students, technicians, and administrators)
-    try:
-        print("Fetching all users for admin view")
-        response = requests.get(
-            f"{Config.API_BASE_URL}/api/admin/all-users",
-            headers={'Authorization': f'Bearer {token}'}
-        )
-
-        if response.status_code == 200:
-            users_data = response.json()
-            print(f"Retrieved {len(users_data) if users_data else 0} users")
-        elif response.status_code == 401:
-            flash('Your session has expired. Please login again.', 'warning')
-            return redirect(url_for('logout'))
-        else:
-            try:
-                error_data = response.json()
-                error_msg = error_data.get('error', 'Unknown error')
-                print(f"Error data: {error_data}")
-            except Exception as e:
-                error_msg = f"Server error (Status code: {response.status_code})"
-                print(f"Error parsing response: {str(e)}")
-
-            flash(f'Error loading users: {error_msg}', 'danger')
-            users_data = []
-    except requests.exceptions.RequestException as e:
-        print(f"Request exception: {str(e)}")
-        flash(f'Error connecting to the server: {str(e)}', 'danger')
+    print("Fetching all users for admin view")
+    response, users_data, status_code = api_request('get', '/api/admin/all-users', token=token)
+
+    if status_code == 200:
+        print(f"Retrieved {len(users_data) if users_data else 0} users")
+    elif response is None:
+        print(f"Request exception: {users_data['error']}")
+        flash(f"Error connecting to the server: {users_data['error']}", 'danger')
+        users_data = []
+    elif status_code == 401:
+        flash('Your session has expired. Please login again.', 'warning')
+        return redirect(url_for('logout'))
+    else:
+        print(f"Error data: {users_data}")
+        flash(f'Error loading users: {api_error_message(users_data, status_code)}', 'danger')
         users_data = []
 
     return render_template('admin_users.html', users=users_data)
@@ -454,31 +598,20 @@ def admin_delete_user(role, user_id):
         flash('Your session has expired. Please login again.', 'warning')
         return redirect(url_for('logout'))
 
-    try:
-        print(f"Deleting {role} with ID: {user_id}")
-        response = requests.delete(
-            f"{Config.API_BASE_URL}/api/admin/g6-user/{role}/{user_id}",
-            headers={'Authorization': f'Bearer {token}'}
-        )
+    print(f"Deleting {role} with ID: {user_id}")
+    response, data, status_code = api_request('delete', f"/api/admin/g6-user/{role}/{user_id}", token=token)
 
-        if response.status_code == 200:
-            flash('User deleted successfully!', 'success')
-        elif response.status_code == 401:
-            flash('Your session has expired. Please login again.', 'warning')
-            return redirect(url_for('logout'))
-        else:
-            try:
-                error_data = response.json()
-                error_msg = error_data.get('error', 'Unknown error')
-                print(f"Error data: {error_data}")
-            except Exception as e:
-                error_msg = f"Server error (Status code: {response.status_code})"
-                print(f"Error parsing response: {str(e)}")
-
-            flash(f'Failed to delete user: {error_msg}', 'danger')
-    except requests.exceptions.RequestException as e:
-        print(f"Request exception: {str(e)}")
-        flash(f'Error connecting to the server: {str(e)}', 'danger')
+    if status_code == 200:
+        flash('User deleted successfully!', 'success')
+    elif response is None:
+        print(f"Request exception: {data['error']}")
+        flash(f"Error connecting to the server: {data['error']}", 'danger')
+    elif status_code == 401:
+        flash('Your session has expired. Please login again.', 'warning')
+        return redirect(url_for('logout'))
+    else:
+        print(f"Error data: {data}")
+        flash(f'Failed to delete user: {api_error_message(data, status_code)}', 'danger')
 
     return redirect(url_for('admin_users'))
 
@@ -513,75 +646,56 @@ def admin_add_user():
             print(f"No role-specific data provided or role doesn't require it. Form has student_id: {'student_id' in request.form}, specialization: {'specialization' in request.form}")
 
         token = get_session_token()
-        user_id = session.get('user_id')
+        identity = get_identity()
 
         if not token:
             flash('Your session has expired. Please login again.', 'warning')
             return redirect(url_for('logout'))
 
-        if not user_id:
-            # Try to get user ID from token
-            try:
-                import jwt
-                decoded = jwt.decode(token, options={"verify_signature": False})
-                if 'session_id' in decoded:
-                    user_id = decoded['session_id']
-                    session['user_id'] = user_id
-            except Exception as e:
-                print(f"Error decoding token: {str(e)}")
-
-        try:
-            # Make a direct request to the backend
-            print(f"Adding new user with role: {role}")
-            # Prepare request data
-            request_data = {
-                "username": username,
-                "password": password,
-                "role": role,
-                "email": email,
-                "DoB": dob,
-                "contact_number": contact_number,
-                "session_id": user_id or ''
-            }
-
-            # Add student_id if provided and role is student
-            if role == 'student' and student_id:
-                request_data["student_id"] = student_id
-
-            # Add specialization if provided and role is technician
+        if not identity:
+            flash('User ID not found. Please try logging in again.', 'warning')
+            return redirect(url_for('dashboard'))
+        user_id = identity['user_id']
+
+        print(f"Adding new user with role: {role}")
+        # Prepare request data
+        request_data = {
+            "username": username,
+            "password": password,
+            "role": role,
+            "email": email,
+            "DoB": dob,
+            "contact_number": contact_number,
+            "session_id": user_id
+        }
+
+        # Add student_id if provided and role is student
+        if role == 'student' and student_id:
+            request_data["student_id"] = student_id
+
+        # Add specialization if provided and role is technician
+        if role == 'technician' and specialization:
+            request_data["specialization"] = specialization
+
+        response, data, status_code = api_request('post', '/api/admin/add-user', data=request_data, token=token)
+
+        print(f"Add user response: {status_code}")
+        if status_code == 200:
+            # If adding a technician, store the specialization in the session
             if role == 'technician' and specialization:
-                request_data["specialization"] = specialization
-
-            response = requests.post(
-                f"{Config.API_BASE_URL}/api/admin/add-user",
-                json=request_data,
-                headers={'Authorization': f'Bearer {token}'}
-            )
-
-            print(f"Add user response: {response.status_code}")
-            if response.status_code == 200:
-                # If adding a technician, store the specialization in the session
-                if role == 'technician' and specialization:
-                    session['specialization'] = specialization
-                    print(f"Stored specialization in session: {specialization}")
-                flash('User added successfully!', 'success')
-                return redirect(url_for('admin_users'))
-            elif response.status_code == 401:
-                flash('Your session has expired. Please login again.', 'warning')
-                return redirect(url_for('logout'))
-            else:
-                try:
-                    error_data = response.json()
-                    error_msg = error_data.get('error', error_data.get('message', 'Unknown error'))
-                    print(f"Error data: {error_data}")
-                except Exception as e:
-                    error_msg = f"Server error (Status code: {response.status_code})"
-                    print(f"Error parsing response: {str(e)}")
-
-                flash(f'Failed to add user: {error_msg}', 'danger')
-        except requests.exceptions.RequestException as e:
-            print(f"Request exception: {str(e)}")
-            flash(f'Error connecting to the server: {str(e)}', 'danger')
+                session['specialization'] = specialization
+                print(f"Stored specialization in session: {specialization}")
+            flash('User added successfully!', 'success')
+            return redirect(url_for('admin_users'))
+        elif response is None:
+            print(f"Request exception: {data['error']}")
+            flash(f"Error connecting to the server: {data['error']}", 'danger')
+        elif status_code == 401:
+            flash('Your session has expired. Please login again.', 'warning')
+            return redirect(url_for('logout'))
+        else:
+            print(f"Error data: {data}")
+            flash(f'Failed to add user: {api_error_message(data, status_code)}', 'danger')
 
     return render_template('admin_add_user.html')
 
@@ -589,16 +703,10 @@ def admin_add_user():
 def logout():
     token = get_session_token()
 
-    # Try to call the backend logout endpoint if available
+    # Try to call the backend logout endpoint if available; errors are ignored
     if token:
-        try:
-            requests.post(
-                f"{Config.API_BASE_URL}/api/auth/logout",
-                headers={'Authorization': f'Bearer {token}'}
-            )
-        except:
-            # Ignore errors during logout
-            pass
+        api_request('post', '/api/auth/logout', token=token)
+        forget_identity(token)
 
     # Clear all session data
     session.clear()
@@ -615,131 +723,29 @@ def logout():
 @login_required
 def maintenance_requests():
     token = get_session_token()
-    user_id = session.get('user_id')
 
     if not token:
         flash('Your session has expired. Please login again.', 'warning')
         return redirect(url_for('logout'))
 
-    if not user_id:
-        # Try to get user ID from token
-        try:
-            import jwt
-            decoded = jwt.decode(token, options={"verify_signature": False})
-            if 'session_id' in decoded:
-                user_id = decoded['session_id']
-                session['user_id'] = user_id
-        except Exception as e:
-            print(f"Error decoding token: {str(e)}")
-
-        # If still no user_id, try to get it from auth status
-        if not user_id:
-            try:
-                status_response = requests.get(
-                    f"{Config.API_BASE_URL}/api/auth/status",
-                    headers={'Authorization': f'Bearer {token}'}
-                )
-
-                if status_response.status_code == 200:
-                    status_data = status_response.json()
-                    if 'session_id' in status_data:
-                        user_id = status_data['session_id']
-                        session['user_id'] = user_id
-            except requests.exceptions.RequestException as e:
-                print(f"Error getting auth status: {str(e)}")
-
-    if not user_id:
-        flash('User ID not found. Please try logging in again.', 'warning')
-        return redirect(url_for('dashboard'))
-
-    # First, check if the database tables are set up correctly
-    try:
-        print("Checking database tables")
-        db_check_response = requests.get(
-            f"{Config.API_BASE_URL}/api/db/check-tables"
-        )
-        print(f"Database check response: {db_check_response.status_code}")
-
-        # Only check for student record if the user is a student
-        user_role = session.get('role', 'student')
-        if user_role == 'student':
-            # Check if the student exists in the database
-            print(f"Checking if student with ID {user_id} exists")
-            check_response = requests.get(
-                f"{Config.API_BASE_URL}/api/student/{user_id}",
-                headers={'Authorization': f'Bearer {token}'}
-            )
-
-            if check_response.status_code != 200:
-                # Student doesn't exist, we need to create a student record first
-                print(f"Student with ID {user_id} doesn't exist, creating student record")
-
-                # Get user information from session
-                username = session.get('username', '')
-
-                # Create a student record
-                # Use email from session if available
-                email = session.get('email', f"{username}@example.com")
-                student_response = requests.post(
-                    f"{Config.API_BASE_URL}/api/admin/add-student",
-                    json={
-                        "name": username,
-                        "email": email,
-                        "contact_number": "N/A",  # Default contact
-                        "age": 20  # Default age
-                    }
-                )
-
-                print(f"Student creation response: {student_response.status_code}")
-                if student_response.status_code not in [200, 201]:
-                    print(f"Failed to create student record: {student_response.status_code}")
-                    try:
-                        error_data = student_response.json()
-                        print(f"Error data: {error_data}")
-                    except Exception as e:
-                        print(f"Error parsing response: {str(e)}")
-                    flash('Failed to create student record. Please contact an administrator.', 'danger')
-                    return redirect(url_for('dashboard'))
-
-                print("Student record created successfully")
-
-        # Get maintenance requests based on user role
-        user_role = session.get('role', 'student')
-        print(f"Fetching maintenance requests for {user_role} with ID: {user_id}")
-
-        # For admin and technician, we don't need to specify student_id
-        if user_role in ['admin', 'technician']:
-            response = requests.get(
-                f"{Config.API_BASE_URL}/api/maintenance/requests",
-                headers={'Authorization': f'Bearer {token}'}
-            )
-        else:
-            # For students, fetch only their requests
-            response = requests.get(
-                f"{Config.API_BASE_URL}/api/maintenance/requests?student_id={user_id}",
-                headers={'Authorization': f'Bearer {token}'}
-            )
-
-        if response.status_code == 200:
-            data = response.json()
-            print(f"Retrieved {len(data) if data else 0} maintenance requests")
-        elif response.status_code == 401:
-            flash('Your session has expired. Please login again.', 'warning')
-            return redirect(url_for('logout'))
-        else:
-            try:
-                error_data = response.json()
-                error_msg = error_data.get('error', 'Unknown error')
-                print(f"Error data: {error_data}")
-            except Exception as e:
-                error_msg = f"Server error (Status code: {response.status_code})"
-                print(f"Error parsing response: {str(e)}")
-
-            flash(f'Error loading maintenance requests: {error_msg}', 'danger')
-            data = []
-    except requests.exceptions.RequestException as e:
-        print(f"Request exception: {str(e)}")
-        flash(f'Error connecting to the server: {str(e)}', 'danger')
+    # Session, student record and the requests visible to this role in one call
+    print(f"Fetching maintenance requests for {session.get('role')}")
+    response, page_data, status_code = api_request('get', '/api/pages/maintenance-requests', token=token)
+
+    if status_code == 200:
+        session['user_id'] = page_data['session']['user_id']
+        data = page_data['requests']
+        print(f"Retrieved {len(data) if data else 0} maintenance requests")
+    elif response is None:
+        print(f"Request exception: {page_data['error']}")
+        flash(f"Error connecting to the server: {page_data['error']}", 'danger')
+        data = []
+    elif status_code == 401:
+        flash('Your session has expired. Please login again.', 'warning')
+        return redirect(url_for('logout'))
+    else:
+        print(f"Error data: {page_data}")
+        flash(f'Error loading maintenance requests: {api_error_message(page_data, status_code)}', 'danger')
         data = []
 
     return render_template('maintenance_requests.html', requests=data, Config=Config)
@@ -750,7 +756,8 @@ def maintenance_requests():
 def assign_maintenance_request(request_id):
     token = get_session_token()
     user_role = session.get('role')
-    user_id = session.get('user_id')
+    identity = get_identity()
+    user_id = identity['user_id'] if identity else None
 
     print(f"Assign request route called for request_id: {request_id}")
     print(f"User role: {user_role}, User ID: {user_id}")
@@ -764,54 +771,25 @@ def assign_maintenance_request(request_id):
         flash('User ID not found. Please try logging in again.', 'warning')
         return redirect(url_for('dashboard'))
 
-    try:
-        # Get technician ID from the database
-        tech_response = requests.get(
-            f"{Config.API_BASE_URL}/api/user-profile/technician/{session.get('username')}",
-            headers={'Authorization': f'Bearer {token}'}
-        )
-
-        technician_id = user_id  # Default to user_id
-
-        if tech_response.status_code == 200:
-            tech_data = tech_response.json()
-            if 'Technician_ID' in tech_data:
-                technician_id = tech_data['Technician_ID']
-                print(f"Found technician ID from profile: {technician_id}")
-
-        # Call the API to assign the technician
-        print(f"Sending request to assign technician with ID: {technician_id} to request: {request_id}")
-        response = requests.post(
-            f"{Config.API_BASE_URL}/api/maintenance/assign-technician",
-            json={
-                "request_id": request_id,
-                "technician_id": technician_id
-            },
-            headers={'Authorization': f'Bearer {token}'}
-        )
-
-        print(f"Assign technician response: {response.status_code}")
-        # Even if there's an error in the response, if the status code is 200 or 500 with a specific error message,
-        # we'll consider it a success since the database operation might have succeeded
-        if response.status_code == 200 or (response.status_code == 500 and "1364" in response.text and "Notification_ID" in response.text):
-            flash('Request assigned successfully!', 'success')
-        else:
-            try:
-                error_data = response.json()
-                error_msg = error_data.get('error', 'Unknown error')
-                print(f"Error data: {error_data}")
-
-                # If the error is about Notification_ID, it's actually a success
-                if "1364" in error_msg and "Notification_ID" in error_msg:
-                    flash('Request assigned successfully!', 'success')
-                    return redirect(url_for('maintenance_requests'))
-            except Exception as e:
-                error_msg = f"Server error (Status code: {response.status_code})"
-                print(f"Error parsing response: {str(e)}")
-            flash(f'Failed to assign request: {error_msg}', 'danger')
-    except requests.exceptions.RequestException as e:
-        print(f"Request exception: {str(e)}")
-        flash(f'Error connecting to the server: {str(e)}', 'danger')
+    # The backend looks up the technician record of the logged-in account,
+    # so assigning takes one call
+    print(f"Sending request to assign technician {session.get('username')} to request: {request_id}")
+    response, data, status_code = api_request('post', '/api/maintenance/assign-technician', data={
+        "request_id": request_id
+    }, token=token)
+
+    print(f"Assign technician response: {status_code}")
+    error_msg = api_error_message(data, status_code)
+    # Even if there's an error in the response, if the status code is 200 or 500 with a specific error message,
+    # we'll consider it a success since the database operation might have succeeded
+    if status_code == 200 or (status_code == 500 and "1364" in error_msg and "Notification_ID" in error_msg):
+        flash('Request assigned successfully!', 'success')
+    elif response is None:
+        print(f"Request exception: {data['error']}")
+        flash(f"Error connecting to the server: {data['error']}", 'danger')
+    else:
+        print(f"Error data: {data}")
+        flash(f'Failed to assign request: {error_msg}', 'danger')
 
     return redirect(url_for('maintenance_requests'))
 
@@ -832,26 +810,17 @@ def update_maintenance_request_status(request_id):
             flash('Status is required', 'danger')
             return redirect(url_for('maintenance_requests'))
 
-        try:
-            # Call the API to update the request status
-            response = requests.put(
-                f"{Config.API_BASE_URL}/api/maintenance/request/{request_id}",
-                json={"status": status},
-                headers={'Authorization': f'Bearer {token}'}
-            )
-
-            print(f"Update status response: {response.status_code}")
-            if response.status_code == 200:
-                flash('Request status updated successfully!', 'success')
-            else:
-                try:
-                    error_data = response.json()
-                    error_msg = error_data.get('error', 'Unknown error')
-                except:
-                    error_msg = f"Server error (Status code: {response.status_code})"
-                flash(f'Failed to update request status: {error_msg}', 'danger')
-        except requests.exceptions.RequestException as e:
-            flash(f'Error connecting to the server: {str(e)}', 'danger')
+        # Call the API to update the request status
+        response, data, status_code = api_request('put', f"/api/maintenance/request/{request_id}",
+                                                  data={"status": status}, token=token)
+
+        print(f"Update status response: {status_code}")
+        if status_code == 200:
+            flash('Request status updated successfully!', 'success')
+        elif response is None:
+            flash(f"Error connecting to the server: {data['error']}", 'danger')
+        else:
+            flash(f'Failed to update request status: {api_error_message(data, status_code)}', 'danger')
 
     return redirect(url_for('maintenance_requests'))
 
@@ -867,235 +836,308 @@ def new_maintenance_request():
         description = request.form['description']
         location = request.form['location']
         priority = request.form['priority']
-        user_id = session.get('user_id')
         token = get_session_token()
 
         if not token:
             flash('Your session has expired. Please login again.', 'warning')
             return redirect(url_for('logout'))
 
-        if not user_id:
-            # Try to get user ID from token
-            try:
-                import jwt
-                decoded = jwt.decode(token, options={"verify_signature": False})
-                if 'session_id' in decoded:
-                    user_id = decoded['session_id']
-                    session['user_id'] = user_id
-            except Exception as e:
-                print(f"Error decoding token: {str(e)}")
-
-            # If still no user_id, try to get it from auth status
-            if not user_id:
-                try:
-                    status_response = requests.get(
-                        f"{Config.API_BASE_URL}/api/auth/status",
-                        headers={'Authorization': f'Bearer {token}'}
-                    )
-
-                    if status_response.status_code == 200:
-                        status_data = status_response.json()
-                        if 'session_id' in status_data:
-                            user_id = status_data['session_id']
-                            session['user_id'] = user_id
-                except requests.exceptions.RequestException as e:
-                    print(f"Error getting auth status: {str(e)}")
-
-        if not user_id:
+        identity = get_identity()
+        if not identity:
             flash('User ID not found. Please try logging in again.', 'warning')
             return redirect(url_for('dashboard'))
 
-        # First, check if the database tables are set up correctly
-        try:
-            print("Checking database tables")
-            db_check_response = requests.get(
-                f"{Config.API_BASE_URL}/api/db/check-tables"
-            )
-            print(f"Database check response: {db_check_response.status_code}")
-
-            # Now, check if the student exists in the database
-            print(f"Checking if student with ID {user_id} exists")
-            check_response = requests.get(
-                f"{Config.API_BASE_URL}/api/student/{user_id}",
-                headers={'Authorization': f'Bearer {token}'}
-            )
-
-            if check_response.status_code != 200:
-                # Student doesn't exist, we need to create a student record first
-                print(f"Student with ID {user_id} doesn't exist, creating student record")
-
-                # Get user information from session
-                username = session.get('username', '')
-
-                # Create a student record
-                student_response = requests.post(
-                    f"{Config.API_BASE_URL}/api/admin/add-student",
-                    json={
-                        "student_id": user_id,
-                        "name": username,
-                        "email": f"{username}@example.com",  # Default email
-                        "contact_number": "N/A",  # Default contact
-                        "age": 20  # Default age
-                    }
-                )
-
-                print(f"Student creation response: {student_response.status_code}")
-                if student_response.status_code not in [200, 201]:
-                    print(f"Failed to create student record: {student_response.status_code}")
-                    try:
-                        error_data = student_response.json()
-                        print(f"Error data: {error_data}")
-                    except Exception as e:
-                        print(f"Error parsing response: {str(e)}")
-                    flash('Failed to create student record. Please contact an administrator.', 'danger')
-                    return redirect(url_for('dashboard'))
-
-                print("Student record created successfully")
-
-            # Now call the create request API
-            print(f"Creating maintenance request for user ID: {user_id}")
-            response = requests.post(
-                f"{Config.API_BASE_URL}/api/maintenance/request",
-                json={
-                    "student_id": user_id,
-                    "issue_description": description,
-                    "location": location,
-                    "priority": priority
-                },
-                headers={'Authorization': f'Bearer {token}'}
-            )
-
-            print(f"Create request response: {response.status_code}")
-            if response.status_code in [200, 201]:  # Accept both 200 and 201 status codes
-                flash('Maintenance request created successfully!', 'success')
-                return redirect(url_for('maintenance_requests'))
-            elif response.status_code == 401:
-                flash('Your session has expired. Please login again.', 'warning')
-                return redirect(url_for('logout'))
-            else:
-                try:
-                    error_data = response.json()
-                    error_msg = error_data.get('error', error_data.get('message', 'Unknown error'))
-                    print(f"Error data: {error_data}")
-                except Exception as e:
-                    error_msg = f"Server error (Status code: {response.status_code})"
-                    print(f"Error parsing response: {str(e)}")
-
-                flash(f'Failed to create request: {error_msg}', 'danger')
-        except requests.exceptions.RequestException as e:
-            print(f"Request exception: {str(e)}")
-            flash(f'Error connecting to the server: {str(e)}', 'danger')
+        # The backend creates the student record on first use
+        print(f"Creating maintenance request for user ID: {identity['user_id']}")
+        request_data = {
+            "student_id": identity['user_id'],
+            "issue_description": description,
+            "location": location,
+            "priority": priority
+        }
+        response, data, status_code = api_request('post', '/api/maintenance/request', data=request_data, token=token)
+
+        print(f"Create request response: {status_code}")
+        if status_code in [200, 201]:  # Accept both 200 and 201 status codes
+            flash('Maintenance request created successfully!', 'success')
+            return redirect(url_for('maintenance_requests'))
+        elif response is None:
+            print(f"Request exception: {data['error']}")
+            flash(f"Error connecting to the server: {data['error']}", 'danger')
+        elif status_code == 401:
+            flash('Your session has expired. Please login again.', 'warning')
+            return redirect(url_for('logout'))
+        else:
+            print(f"Error data: {data}")
+            flash(f'Failed to create request: {api_error_message(data, status_code)}', 'danger')
 
     return render_template('new_maintenance_request.html')
 
 # API endpoint to check if the backend is available
 @app.route('/api/status', methods=['GET'])
 def api_status():
-    try:
-        # Try to connect to the backend API
-        response = requests.get(f"{Config.API_BASE_URL}/")
-
-        if response.status_code == 200:
-            # Also check authentication status if a token is available
-            token = get_session_token()
-            auth_status = "Not authenticated"
-            user_info = {}
-
-            if token:
-                try:
-                    auth_response = requests.get(
-                        f"{Config.API_BASE_URL}/api/auth/status",
-                        headers={'Authorization': f'Bearer {token}'}
-                    )
-
-                    if auth_response.status_code == 200:
-                        auth_data = auth_response.json()
-                        auth_status = "Authenticated"
-                        user_info = auth_data
-                except:
-                    pass
-
-            return jsonify({
-                "status": "ok",
-                "message": "Backend API is running",
-                "api_url": Config.API_BASE_URL,
-                "auth_status": auth_status,
-                "user_info": user_info
-            }), 200
+    # Try to connect to the backend API, checking the token alongside
+    token = get_session_token()
+    calls = [('get', '/', {})]
+    if token:
+        calls.append(('get', '/api/auth/status', {'token': token}))
+    results = api_gather(*calls)
+    response, data, status_code = results[0]
 
+    if response is None:
         return jsonify({
             "status": "error",
-            "message": f"Backend API returned status code: {response.status_code}"
-        }), response.status_code
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": f"Error connecting to backend: {str(e)}"
+            "message": f"Error connecting to backend: {data['error']}"
         }), 500
 
+    if status_code == 200:
+        # Also report authentication status if a token is available
+        auth_status = "Not authenticated"
+        user_info = {}
+
+        if token:
+            _, auth_data, auth_status_code = results[1]
+            if auth_status_code == 200:
+                auth_status = "Authenticated"
+                user_info = auth_data
+
+        return jsonify({
+            "status": "ok",
+            "message": "Backend API is running",
+            "api_url": Config.API_BASE_URL,
+            "auth_status": auth_status,
+            "user_info": user_info
+        }), 200
+
+    return jsonify({
+        "status": "error",
+        "message": f"Backend API returned status code: {status_code}"
+    }), status_code
+
+@app.route('/admin/api-client-stats', methods=['GET'])
+@login_required
+@admin_required
+def admin_api_client_stats():
+    """Latency of frontend-to-backend calls per endpoint"""
+    return jsonify({
+        "buckets_ms": list(API_LATENCY_BUCKETS_MS),
+        "pool_size": Config.API_POOL_SIZE,
+        "endpoints": api_call_stats()
+    }), 200
+
+@app.route('/admin/compression-stats', methods=['GET'])
+@login_required
+@admin_required
+def admin_compression_stats():
+    return jsonify({
+        "encodings": compression.available_encodings(),
+        "min_size": app.config['COMPRESS_MIN_SIZE'],
+        "stats": compression.snapshot()
+    }), 200
+
+_open_event_streams = 0
+_open_event_streams_lock = threading.Lock()
+
+# Live updates: relays the backend's Server-Sent Events for the logged-in user
+@app.route('/events')
+@login_required
+def live_events():
+    global _open_event_streams
+    token = get_session_token()
+    identity = get_identity()
+
+    if not token or not identity:
+        return jsonify({"error": "Authentication required"}), 401
+
+    with _open_event_streams_lock:
+        busy = 0 < Config.EVENTS_MAX_STREAMS <= _open_event_streams
+        if not busy:
+            _open_event_streams += 1
+    if busy:
+        # The browser resumes from its Last-Event-ID when it reconnects
+        response = app.response_class(f"retry: {Config.EVENTS_BUSY_RETRY * 1000}\n\n", mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def release():
+        global _open_event_streams
+        with _open_event_streams_lock:
+            _open_event_streams -= 1
+
+    headers = {'Authorization': f'Bearer {token}'}
+    if request.headers.get('Last-Event-ID'):
+        headers['Last-Event-ID'] = request.headers['Last-Event-ID']
+
+    try:
+        upstream = get_api_session().get(
+            f"{Config.API_BASE_URL}/api/events/{identity['user_id']}",
+            headers=headers,
+            stream=True,
+            timeout=(Config.API_CONNECT_TIMEOUT, Config.EVENTS_READ_TIMEOUT)
+        )
+    except requests.exceptions.RequestException as e:
+        release()
+        return jsonify({"error": f"Connection error: {str(e)}"}), 502
+
+    if upstream.status_code != 200:
+        upstream.close()
+        release()
+        return jsonify({"error": f"Event stream unavailable (Status code: {upstream.status_code})"}), upstream.status_code
+
+    def relay():
+        try:
+            for chunk in upstream.iter_content(chunk_size=None):
+                yield chunk
+        except requests.exceptions.RequestException as e:
+            # The browser reconnects and resumes from its Last-Event-ID
+            print(f"Event stream closed: {str(e)}")
+        finally:
+            upstream.close()
+
+    response = app.response_class(relay(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    # Runs when the server is done with the response, even if it was never sent
+    response.call_on_close(release)
+    return response
+
 # Route for user notifications
 @app.route('/notifications')
 @login_required
 def notifications():
     token = get_session_token()
-    user_id = session.get('user_id')
+    identity = get_identity()
 
     if not token:
         flash('Your session has expired. Please login again.', 'warning')
         return redirect(url_for('logout'))
 
-    if not user_id:
+    if not identity:
         flash('User ID not found. Please try logging in again.', 'warning')
         return redirect(url_for('dashboard'))
-
-    try:
-        # Get notifications from the CIMS database
-        response = requests.get(
-            f"{Config.API_BASE_URL}/api/notifications/{user_id}",
-            headers={'Authorization': f'Bearer {token}'}
-        )
-
-        print(f"Notifications response: {response.status_code}")
-        if response.status_code == 200:
-            notifications_data = response.json()
-            print(f"Retrieved {len(notifications_data) if notifications_data else 0} notifications")
-        elif response.status_code == 401:
-            flash('Your session has expired. Please login again.', 'warning')
-            return redirect(url_for('logout'))
-        else:
-            try:
-                error_data = response.json()
-                error_msg = error_data.get('error', 'Unknown error')
-                print(f"Error data: {error_data}")
-            except Exception as e:
-                error_msg = f"Server error (Status code: {response.status_code})"
-                print(f"Error parsing response: {str(e)}")
-
-            flash(f'Error loading notifications: {error_msg}', 'danger')
-            notifications_data = []
-    except requests.exceptions.RequestException as e:
-        print(f"Request exception: {str(e)}")
-        flash(f'Error connecting to the server: {str(e)}', 'danger')
-        notifications_data = []
-
-    return render_template('notifications.html', notifications=notifications_data)
+    user_id = identity['user_id']
+
+    # One page of the feed, newest first; older pages are reached with ?before=<id>
+    params = {'limit': Config.NOTIFICATIONS_PAGE_SIZE}
+    if request.args.get('before', type=int):
+        params['before'] = request.args.get('before', type=int)
+    response, feed, status_code = api_request('get', f"/api/notifications/{user_id}/feed", data=params, token=token)
+
+    print(f"Notifications response: {status_code}")
+    if status_code == 200:
+        notifications_data = feed['notifications']
+        print(f"Retrieved {len(notifications_data)} notifications")
+
+        # Viewing the newest page marks everything on it as read
+        if 'before' not in params and notifications_data and feed['unread']:
+            api_request('post', f"/api/notifications/{user_id}/read",
+                        data={'up_to': notifications_data[0]['Notification_ID']}, token=token)
+            forget_unread_count(user_id)
+    elif response is None:
+        print(f"Request exception: {feed['error']}")
+        flash(f"Error connecting to the server: {feed['error']}", 'danger')
+        notifications_data, feed = [], {}
+    elif status_code == 401:
+        flash('Your session has expired. Please login again.', 'warning')
+        return redirect(url_for('logout'))
+    else:
+        print(f"Error data: {feed}")
+        flash(f'Error loading notifications: {api_error_message(feed, status_code)}', 'danger')
+        notifications_data, feed = [], {}
+
+    return render_template('notifications.html',
+                           notifications=notifications_data,
+                           next_before=feed.get('next_before') if feed.get('has_more') else None)
+
+def check_backend():
+    """Startup check: is the backend API answering?"""
+    print(f"API URL: {Config.API_BASE_URL} ({Config.API_MODE})")
+    response, data, status_code = api_request('get', '/', timeout=2)
+    if response is None:
+        print(f"⚠️ Backend API is not available: {data['error']}")
+        print("   Registration and login may not work until the backend is running.")
+    elif status_code == 200:
+        print("✅ Backend API is available")
+    else:
+        print(f"⚠️ Backend API returned status code: {status_code}")
+    return status_code == 200
+
+# Filled by warm_up() before the process takes traffic
+_warmup = {"done": False, "seconds": None, "backend_ready": None}
+
+def pooled_connections():
+    """Idle keep-alive connections to the backend in the shared session's pools"""
+    adapter = get_api_session().get_adapter(Config.API_BASE_URL)
+    if not isinstance(adapter, HTTPAdapter):
+        return None
+    pools = [adapter.poolmanager.pools[key] for key in adapter.poolmanager.pools.keys()]
+    return sum(1 for pool in pools for conn in list(pool.pool.queue) if conn is not None)
+
+def warm_up():
+    """
+    Prepare this process for traffic: check the backend, then open
+    API_WARM_CONNECTIONS keep-alive connections to it with parallel readiness
+    calls. An in-process backend is warmed up first. Returns True when the
+    backend answered ready.
+    """
+    started = time.perf_counter()
+    if Config.API_MODE == 'inprocess':
+        # The backend shares this process; its create_app() warms it up
+        load_backend_app()
+    backend_up = check_backend()
+    results = api_gather(*[('get', '/api/health/ready', {})] * Config.API_WARM_CONNECTIONS)
+    backend_ready = any(status_code == 200 for _, _, status_code in results)
+    _warmup.update(done=True, seconds=round(time.perf_counter() - started, 3), backend_ready=backend_ready)
+    return backend_up and backend_ready
+
+@app.route('/health/live')
+def health_live():
+    """Liveness: the process is up and serving requests; never calls the backend"""
+    return jsonify({"status": "alive"}), 200
+
+@app.route('/health/ready')
+def health_ready():
+    """Readiness: warm-up finished; reports the backend connection pool and cache fill from memory"""
+    with _validator_cache_lock, _identity_cache_lock, _unread_counts_lock:
+        caches = {
+            "validators": len(_validator_cache),
+            "identities": len(_identity_cache),
+            "unread_counts": len(_unread_counts)
+        }
+    ready = _warmup['done']
+    return jsonify({
+        "status": "ready" if ready else "warming_up",
+        "warm_up": _warmup,
+        "backend_pool": {"size": Config.API_POOL_SIZE, "idle": pooled_connections()},
+        "caches": caches
+    }), 200 if ready else 503
+
+def create_app(config=None):
+    """
+    Configure the frontend for this process. Settings come from
+    CS432_-prefixed environment variables, then from config; names matching
+    a Config attribute (e.g. CS432_API_BASE_URL) override it. Multi-worker
+    servers call this in each worker after forking, so the backend
+    connection pool and caches are built, and warmed up, per worker.
+    """
+    app.config.from_prefixed_env('CS432')
+    app.config.update(config or {})
+    for name in vars(Config):
+        if name.isupper() and name in app.config:
+            setattr(Config, name, app.config[name])
+
+    if not warm_up() and app.config.get('REQUIRE_BACKEND'):
+        raise RuntimeError("Backend API unavailable or not ready at startup")
+    return app
 
 if __name__ == '__main__':
     print("\n=== CS432 Project Frontend ===")
-    print(f"API URL: {Config.API_BASE_URL}")
     print("Running on http://localhost:8000")
 
-    # Check if backend is available
-    try:
-        response = requests.get(f"{Config.API_BASE_URL}/", timeout=2)
-        if response.status_code == 200:
-            print("✅ Backend API is available")
-        else:
-            print(f"⚠️ Backend API returned status code: {response.status_code}")
-    except Exception as e:
-        print(f"⚠️ Backend API is not available: {str(e)}")
-        print("   Registration and login may not work until the backend is running.")
+    # Applies CS432_ settings, checks that the backend is available and warms up
+    create_app()
 
     print("===========================\n")
 
-    app.run(host='0.0.0.0', debug=True, port=8000)
+    # The reloader restarts the whole process on every file change; opt in with FLASK_DEBUG=1
+    app.run(host='0.0.0.0', debug=os.environ.get('FLASK_DEBUG') == '1', port=8000)
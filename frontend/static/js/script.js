@@ -41,3 +41,112 @@ document.addEventListener('DOMContentLoaded', function() {
         parentDiv.appendChild(toggleBtn);
     });
 });
+
+// Live notifications and request status changes over Server-Sent Events.
+// EventSource reconnects on its own and resumes from the last event ID.
+document.addEventListener('DOMContentLoaded', function() {
+    const eventsUrl = document.body.dataset.eventsUrl;
+    if (!eventsUrl || !window.EventSource) {
+        return;
+    }
+
+    const statusClasses = {
+        'submitted': 'bg-primary',
+        'completed': 'bg-success'
+    };
+
+    function showNotice(html, category) {
+        const container = document.querySelector('body > .container');
+        const notice = document.createElement('div');
+        notice.className = `alert alert-${category || 'info'} alert-dismissible`;
+        notice.innerHTML = html + '<button type="button" class="btn-close" data-bs-dismiss="alert"></button>';
+        container.insertBefore(notice, container.firstChild);
+    }
+
+    function showRefreshNotice(message) {
+        if (document.getElementById('live-refresh')) {
+            return;
+        }
+        showNotice(`<span id="live-refresh">${message}</span> <a href="${window.location.href}" class="alert-link">Refresh</a>`);
+    }
+
+    function escapeHtml(text) {
+        const span = document.createElement('span');
+        span.textContent = text;
+        return span.innerHTML;
+    }
+
+    function setUnreadBadge(count) {
+        const badge = document.getElementById('notification-badge');
+        if (badge && count !== undefined) {
+            badge.textContent = count || '';
+            badge.hidden = !count;
+        }
+    }
+
+    const source = new EventSource(eventsUrl);
+
+    source.addEventListener('notification', function(e) {
+        const notification = JSON.parse(e.data);
+        setUnreadBadge(notification.Unread);
+        const list = document.getElementById('notifications');
+        if (!list) {
+            showNotice(`<i class="bi bi-bell"></i> ${escapeHtml(notification.Message)}`);
+            return;
+        }
+
+        let group = list.querySelector('.list-group');
+        if (!group) {
+            list.innerHTML = '<div class="list-group"></div>';
+            group = list.querySelector('.list-group');
+        }
+        // A coalesced update comes with a new ID and the ID of the notification it replaces
+        const previous = group.querySelector(`[data-notification-id="${notification.Replaces || notification.Notification_ID}"]`);
+        if (previous) {
+            previous.remove();
+        }
+        const item = document.createElement('div');
+        item.className = 'list-group-item list-group-item-action';
+        item.dataset.notificationId = notification.Notification_ID;
+        item.innerHTML = `
+            <div class="d-flex w-100 justify-content-between">
+                <h5 class="mb-1">${escapeHtml(notification.Message)}</h5>
+                <small class="text-muted">${escapeHtml(notification.Sent_At || '')}</small>
+            </div>
+            <small class="text-muted">Notification ID: ${notification.Notification_ID}</small>`;
+        group.insertBefore(item, group.firstChild);
+    });
+
+    source.addEventListener('notifications_read', function(e) {
+        setUnreadBadge(JSON.parse(e.data).Unread);
+    });
+
+    source.addEventListener('request_status', function(e) {
+        const change = JSON.parse(e.data);
+        const row = document.querySelector(`tr[data-request-id="${change.Request_ID}"]`);
+        if (!row) {
+            return;
+        }
+        const badge = row.querySelector('.request-status');
+        badge.textContent = change.Status;
+        badge.className = `badge request-status ${statusClasses[change.Status] || 'bg-warning'}`;
+        // The technician's buttons depend on the status
+        if (row.querySelector('.request-actions')) {
+            showRefreshNotice(`Request ${change.Request_ID} is now ${escapeHtml(change.Status)}.`);
+        }
+    });
+
+    source.addEventListener('request_created', function(e) {
+        if (document.getElementById('maintenance-requests')) {
+            const created = JSON.parse(e.data);
+            showRefreshNotice(`New request ${created.Request_ID} at ${escapeHtml(created.Location)}.`);
+        }
+    });
+
+    source.addEventListener('resync', function() {
+        // Events were missed while disconnected
+        if (document.getElementById('maintenance-requests') || document.getElementById('notifications')) {
+            showRefreshNotice('This page may be out of date.');
+        }
+    });
+});
@@ -0,0 +1,5 @@
+# Frontend entry point for a WSGI server, run from this directory:
+# gunicorn -c ../gunicorn.conf.py -b 0.0.0.0:8000 wsgi:app
+from app import create_app
+
+app = create_app()
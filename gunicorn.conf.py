@@ -0,0 +1,34 @@
+# gunicorn settings shared by the backend and the frontend; see README "Production Serving"
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from Metrics import mark_process_dead
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# Threads per worker. Each open event stream holds one, so at most
+# SSE_MAX_STREAMS of them (three quarters by default) serve streams and
+# the rest stay free for ordinary requests
+threads = int(os.environ.get('WEB_THREADS', 16))
+worker_class = 'gthread'
+os.environ.setdefault('SSE_MAX_STREAMS', str(threads * 3 // 4))
+# Workers only share live events through the database relay
+if workers > 1:
+    os.environ.setdefault('SSE_RELAY', '1')
+timeout = int(os.environ.get('WEB_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+# Restart workers now and then so slow leaks cannot accumulate
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 5000))
+max_requests_jitter = max_requests // 10
+accesslog = '-'
+
+# Each worker imports the app after forking, so create_app() builds its
+# connection pool, caches, metric files and background threads per worker
+preload_app = False
+
+def child_exit(server, worker):
+    # Live gauges of the exited worker no longer count towards /metrics
+    mark_process_dead(worker.pid)
@@ -1,2 +0,0 @@
-# This file is created to resolve circular imports
-from app import log_cims_database_change
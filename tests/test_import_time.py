@@ -0,0 +1,28 @@
+"""Import-time budgets from benchmarks/import_time.py, measured under python -X importtime."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+import import_time  # noqa: E402
+
+TARGET_IDS = [target[0] for target in import_time.TARGETS]
+
+
+@pytest.mark.parametrize('name, cwd, module, budget_ms, lazy', import_time.TARGETS, ids=TARGET_IDS)
+def test_lazy_modules_not_loaded(name, cwd, module, budget_ms, lazy):
+    rows = import_time.import_times(cwd, module)
+    loaded = {row[3].split('.')[0] for row in rows}
+    assert not set(lazy) & loaded, f"{name} loads {sorted(set(lazy) & loaded)} at import"
+
+
+# Wall-clock budgets depend on the machine, so they only run when asked for
+@pytest.mark.skipif(os.environ.get('IMPORT_BUDGET_TIMING') != '1',
+                    reason="set IMPORT_BUDGET_TIMING=1 to check import-time budgets")
+@pytest.mark.parametrize('name, cwd, module, budget_ms, lazy', import_time.TARGETS, ids=TARGET_IDS)
+def test_import_within_budget(name, cwd, module, budget_ms, lazy):
+    # Best of three fresh interpreters, so one slow start does not fail the suite
+    total_us, _ = import_time.measure(cwd, module, 3)
+    assert total_us / 1000 <= budget_ms * import_time.SCALE, \
+        f"{name} imports in {total_us / 1000:.1f} ms, over its {budget_ms * import_time.SCALE:.0f} ms budget"
@@ -0,0 +1,116 @@
+"""Query budgets and N+1 detection in Instrumentation, with QUERY_BUDGET_MODE='raise'."""
+import pytest
+from flask import Flask, jsonify
+
+from Instrumentation import Instrumentation, QueryBudgetExceeded, query_budget
+
+
+class FakeCursor:
+    def __init__(self):
+        self.with_rows = False
+        self.rowcount = 0
+        self.rows = []
+
+    def execute(self, operation, params=None):
+        self.with_rows = operation.lstrip().upper().startswith('SELECT')
+        self.rows = [(1,)] if self.with_rows else []
+        self.rowcount = len(self.rows) if self.with_rows else 1
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def cursor(self, *args, **kwargs):
+        return FakeCursor()
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config.update(TESTING=True, QUERY_BUDGET_MODE='raise', QUERY_REPEAT_LIMIT=3)
+    instrumentation = Instrumentation(app)
+
+    def run(*statements):
+        conn = instrumentation.connect(FakeConnection)
+        cursor = conn.cursor()
+        for statement, params in statements:
+            cursor.execute(statement, params)
+            if cursor.with_rows:
+                cursor.fetchall()
+        cursor.close()
+        conn.close()
+        return jsonify({"queries": len(statements)})
+
+    @app.route('/within')
+    @query_budget(2)
+    def within():
+        return run(("SELECT * FROM students WHERE Student_ID = %s", (1,)),
+                   ("SELECT * FROM maintenance_requests WHERE Student_ID = %s", (1,)))
+
+    @app.route('/over')
+    @query_budget(2)
+    def over():
+        return run(("SELECT * FROM students", None),
+                   ("SELECT * FROM technicians", None),
+                   ("SELECT * FROM maintenance_requests", None))
+
+    @app.route('/per-row')
+    @query_budget(10)
+    def per_row():
+        # One lookup per request row: the N+1 shape the repeat limit catches
+        return run(*[("SELECT * FROM students WHERE Student_ID = %s", (student_id,)) for student_id in range(5)])
+
+    @app.route('/with-setup')
+    @query_budget(1)
+    def with_setup():
+        return run(("CREATE TABLE IF NOT EXISTS students (Student_ID INT PRIMARY KEY)", None),
+                   ("SHOW COLUMNS FROM students", None),
+                   ("ALTER TABLE students ADD COLUMN Age INT", None),
+                   ("SELECT * FROM students", None))
+
+    return app
+
+
+def test_route_within_budget_passes(app):
+    response = app.test_client().get('/within')
+    assert response.status_code == 200
+    assert 'X-Query-Budget' not in response.headers
+
+
+def test_route_over_budget_raises(app):
+    with pytest.raises(QueryBudgetExceeded, match=r"3 queries over a budget of 2"):
+        app.test_client().get('/over')
+
+
+def test_repeated_statement_shape_is_reported(app):
+    with pytest.raises(QueryBudgetExceeded) as raised:
+        app.test_client().get('/per-row')
+    # Within the budget of 10, but the same shape ran 5 times
+    assert "over a budget" not in str(raised.value)
+    assert "5 x select * from students where student_id = ?" in str(raised.value).lower()
+
+
+def test_setup_statements_are_not_charged(app):
+    response = app.test_client().get('/with-setup')
+    assert response.status_code == 200
+
+
+def test_warn_mode_reports_in_header(app):
+    app.config['QUERY_BUDGET_MODE'] = 'warn'
+    response = app.test_client().get('/over')
+    assert response.status_code == 200
+    assert response.headers['X-Query-Budget'] == "3 queries over a budget of 2"
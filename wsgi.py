@@ -0,0 +1,4 @@
+# Backend entry point for a WSGI server: gunicorn -c gunicorn.conf.py wsgi:app
+from app import create_app
+
+app = create_app()